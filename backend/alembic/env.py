@@ -11,7 +11,8 @@ from libs.common.database import engine as async_engine
 # IMPORTANT: import modules that define Base subclasses (services/*/models)
 from services.auth.models import user as auth_user
 from services.baggage.models import bag as bag_model
-from services.weather.models import prediction as pred_model
+from services.weather.models import weather as weather_model
+from services.orientation.models import orientation as orientation_model
 
 from libs.common.base import Base
 
@@ -0,0 +1,52 @@
+"""Journal des orientations (orientation_logs)
+
+Revision ID: 3f1c2a7b9d40
+Revises:
+Create Date: 2026-10-18 12:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "3f1c2a7b9d40"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# Types enum de services.orientation.models.orientation (noms des membres)
+NIVEAU_URGENCE = sa.Enum("FAIBLE", "MOYEN", "ELEVE", "CRITIQUE", name="niveauurgence")
+STATUT_BAGAGE = sa.Enum("ENREGISTRE", "EN_SOUTE", "MAL_ACHEMINE", "EN_VERIFICATION", name="statutbagage")
+
+
+def upgrade():
+    op.create_table(
+        "orientation_logs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("numero_vol", sa.String(), nullable=False),
+        sa.Column("id_bagage", sa.String(), nullable=False),
+        sa.Column("position_estimee", sa.String(), nullable=True),
+        sa.Column("niveau_urgence", NIVEAU_URGENCE, nullable=False),
+        sa.Column("instructions", sa.JSON(), nullable=False),
+        sa.Column("parcours", sa.JSON(), nullable=False),
+        sa.Column("alertes", sa.JSON(), nullable=True),
+        sa.Column("impact_meteo", sa.JSON(), nullable=True),
+        sa.Column("statut_bagage", STATUT_BAGAGE, nullable=True),
+        sa.Column("temps_disponible", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_orientation_logs_id"), "orientation_logs", ["id"], unique=False)
+    op.create_index(op.f("ix_orientation_logs_numero_vol"), "orientation_logs", ["numero_vol"], unique=False)
+    op.create_index(op.f("ix_orientation_logs_id_bagage"), "orientation_logs", ["id_bagage"], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f("ix_orientation_logs_id_bagage"), table_name="orientation_logs")
+    op.drop_index(op.f("ix_orientation_logs_numero_vol"), table_name="orientation_logs")
+    op.drop_index(op.f("ix_orientation_logs_id"), table_name="orientation_logs")
+    op.drop_table("orientation_logs")
+    bind = op.get_bind()
+    STATUT_BAGAGE.drop(bind, checkfirst=True)
+    NIVEAU_URGENCE.drop(bind, checkfirst=True)
@@ -0,0 +1,102 @@
+"""
+Contrôle d'admission: latence par priorité lors d'un afflux de requêtes.
+
+    python -m benchmarks.orientation.bench_admission [--requetes 4000] [--duree 1.0]
+
+Un afflux (arrivées de Poisson sur `duree` secondes, 10 % critiques, 20 %
+élevées, 70 % normales) frappe un calcul simulé dont la latence croît avec
+le nombre d'appels simultanés au-delà de la capacité des services amont.
+Sans contrôle, tout le monde ralentit; avec ControleAdmission, les
+critiques gardent une latence bornée et les normales sont délestées.
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from services.orientation.core.admission import CRITIQUE, ELEVEE, NOMS_PRIORITE, NORMALE, ControleAdmission, Surcharge
+
+
+class Amont:
+    """Service amont simulé: 20 ms, ralenti au-delà de `capacite` appels simultanés"""
+
+    def __init__(self, capacite=32, base_s=0.02):
+        self.capacite = capacite
+        self.base_s = base_s
+        self.en_cours = 0
+
+    async def appeler(self):
+        self.en_cours += 1
+        try:
+            await asyncio.sleep(self.base_s * max(1.0, self.en_cours / self.capacite))
+        finally:
+            self.en_cours -= 1
+
+
+def centile(valeurs, q):
+    if not valeurs:
+        return float("nan")
+    valeurs = sorted(valeurs)
+    return valeurs[min(int(q * len(valeurs)), len(valeurs) - 1)]
+
+
+async def scenario(arrivees, admission):
+    amont = Amont()
+    latences = {p: [] for p in (CRITIQUE, ELEVEE, NORMALE)}
+    delestees = {p: 0 for p in latences}
+
+    async def requete(priorite):
+        debut = time.perf_counter()
+        try:
+            if admission is None:
+                await amont.appeler()
+            else:
+                async with admission.admettre(priorite):
+                    await amont.appeler()
+        except Surcharge:
+            delestees[priorite] += 1
+            return
+        latences[priorite].append(time.perf_counter() - debut)
+
+    taches = []
+    origine = time.perf_counter()
+    for instant, priorite in arrivees:
+        attente = instant - (time.perf_counter() - origine)
+        if attente > 0:
+            await asyncio.sleep(attente)
+        taches.append(asyncio.create_task(requete(priorite)))
+    await asyncio.gather(*taches)
+    return latences, delestees
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requetes", type=int, default=4000)
+    parser.add_argument("--duree", type=float, default=1.0)
+    parser.add_argument("--concurrence", type=int, default=32)
+    parser.add_argument("--graine", type=int, default=5)
+    args = parser.parse_args()
+
+    aleatoire = random.Random(args.graine)
+    instant, arrivees = 0.0, []
+    for _ in range(args.requetes):
+        instant += aleatoire.expovariate(args.requetes / args.duree)
+        tirage = aleatoire.random()
+        arrivees.append((instant, CRITIQUE if tirage < 0.1 else ELEVEE if tirage < 0.3 else NORMALE))
+
+    print(f"{args.requetes} requêtes en {args.duree:.1f} s, capacité amont 32 appels simultanés")
+    print(f"{'':22} {'priorité':9} {'p50':>8} {'p99':>8} {'délestées':>10}")
+    for nom, admission in (
+        ("sans contrôle", None),
+        ("ControleAdmission", ControleAdmission(args.concurrence, 256, (2.0, 0.5, 0.1))),
+    ):
+        latences, delestees = asyncio.run(scenario(arrivees, admission))
+        for priorite in (CRITIQUE, ELEVEE, NORMALE):
+            print(
+                f"{nom:22} {NOMS_PRIORITE[priorite]:9} {centile(latences[priorite], 0.5) * 1e3:6.1f}ms "
+                f"{centile(latences[priorite], 0.99) * 1e3:6.1f}ms {delestees[priorite]:10d}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+"""
+Charge de l'API d'orientation contre des services amont simulés en mémoire.
+
+    python -m benchmarks.orientation.bench_charge [--requetes 5000] [--concurrence 50]
+        [--latence-meteo lognormal:20:0.5] [--latence-bagages uniforme:5:30]
+        [--latence-vols constante:15] [--erreurs-bagages 0.02] [--sortie resultats.json]
+
+L'application tourne via `ASGITransport` (sans réseau); les services météo,
+bagages et vols sont remplacés par des transports httpx qui répondent après
+une latence tirée selon la distribution demandée, avec un taux d'erreurs 503.
+Rapporte p50/p95/p99, requêtes/s et la répartition par étape (collecte des
+données amont, calcul de l'orientation, reste: validation, sérialisation,
+middleware et attente de la boucle d'événements), et écrit le tout en JSON
+avec `--sortie` pour comparer deux versions sur la même machine.
+
+Distributions (millisecondes): `constante:M`, `uniforme:MIN:MAX`,
+`lognormal:MEDIANE:SIGMA`, `zero`.
+"""
+import argparse
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List
+
+import httpx
+
+from services.orientation import pipeline
+from services.orientation.core.config import get_settings
+from services.orientation.dependencies.services import get_bagage_client, get_meteo_client, get_vol_client
+from services.orientation.main import app
+from services.orientation.routers import orientation as routes
+from services.orientation.services.baggage_client import BagageServiceClient
+from services.orientation.services.meteo_client import MeteoServiceClient
+from services.orientation.services.vol_client import VolServiceClient
+
+ETAPES = ("collecte", "calcul")
+
+
+def distribution(spec: str, aleatoire: random.Random) -> Callable[[], float]:
+    """Tirage d'une latence en secondes à partir de `nom:param...` (ms)"""
+    nom, *params = spec.split(":")
+    valeurs = [float(p) / 1000 for p in params]
+    if nom == "zero":
+        return lambda: 0.0
+    if nom == "constante":
+        return lambda: valeurs[0]
+    if nom == "uniforme":
+        return lambda: aleatoire.uniform(valeurs[0], valeurs[1])
+    if nom == "lognormal":
+        mediane, sigma = valeurs[0], float(params[1])
+        return lambda: mediane * aleatoire.lognormvariate(0, sigma)
+    raise ValueError(f"Distribution inconnue: {spec}")
+
+
+def service_simule(
+    repondre: Callable[[httpx.Request], httpx.Response],
+    latence: Callable[[], float],
+    taux_erreur: float,
+    aleatoire: random.Random,
+    appels: Dict[str, int],
+    nom: str
+) -> httpx.AsyncClient:
+    """Client httpx vers un service amont simulé (latence et erreurs injectées)"""
+    async def handler(request: httpx.Request) -> httpx.Response:
+        appels[nom] += 1
+        delai = latence()
+        if delai > 0:
+            await asyncio.sleep(delai)
+        if aleatoire.random() < taux_erreur:
+            return httpx.Response(503, request=request)
+        return repondre(request)
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def clients_simules(args, aleatoire: random.Random, appels: Dict[str, int]):
+    depart = {
+        f"AF{k:04d}": (datetime.now() + timedelta(minutes=aleatoire.randint(20, 240))).isoformat()
+        for k in range(args.vols)
+    }
+
+    def meteo(request):
+        return httpx.Response(200, json={"niveau_alerte": "faible", "impact": {"conditions": []}})
+
+    def bagage(request):
+        return httpx.Response(200, json={"id": request.url.path.rsplit("/", 1)[1], "statut": "EN_SOUTE"})
+
+    def vol(request):
+        numero = request.url.path.rsplit("/", 1)[1]
+        return httpx.Response(200, json={
+            "numero": numero, "heure_depart": depart[numero],
+            "porte_originale": "G20", "porte_actuelle": "G22", "terminal": "2"
+        })
+
+    settings = get_settings()
+    return (
+        MeteoServiceClient(
+            "http://meteo",
+            client=service_simule(meteo, distribution(args.latence_meteo, aleatoire), args.erreurs_meteo, aleatoire, appels, "meteo"),
+            cache_ttl_s=settings.METEO_CACHE_TTL_S
+        ),
+        BagageServiceClient(
+            "http://bagages",
+            client=service_simule(bagage, distribution(args.latence_bagages, aleatoire), args.erreurs_bagages, aleatoire, appels, "bagages")
+        ),
+        VolServiceClient(
+            "http://vols",
+            client=service_simule(vol, distribution(args.latence_vols, aleatoire), args.erreurs_vols, aleatoire, appels, "vols"),
+            cache_taille_max=settings.VOL_CACHE_TAILLE_MAX,
+            cache_ttl_s=settings.VOL_CACHE_TTL_S
+        )
+    )
+
+
+class Chronos:
+    """
+    Durées des étapes du pipeline, mesurées par requête.
+
+    ASGITransport exécute l'application dans la tâche de l'appelant: une
+    variable de contexte par travailleur suffit à séparer les requêtes.
+    """
+
+    def __init__(self):
+        self.courant: contextvars.ContextVar[Dict[str, float]] = contextvars.ContextVar("mesures")
+
+    def installer(self):
+        collecter, calculer = pipeline.collecter_donnees, pipeline.calculer_orientation
+
+        async def collecter_donnees(*args, **kwargs):
+            debut = time.perf_counter()
+            try:
+                return await collecter(*args, **kwargs)
+            finally:
+                self.courant.get({})["collecte"] = time.perf_counter() - debut
+
+        def calculer_orientation(*args, **kwargs):
+            debut = time.perf_counter()
+            try:
+                return calculer(*args, **kwargs)
+            finally:
+                self.courant.get({})["calcul"] = time.perf_counter() - debut
+
+        routes.collecter_donnees = collecter_donnees
+        routes.calculer_orientation = calculer_orientation
+
+
+def centile(valeurs: List[float], p: float) -> float:
+    if not valeurs:
+        return 0.0
+    valeurs = sorted(valeurs)
+    return valeurs[min(int(round(p / 100 * (len(valeurs) - 1))), len(valeurs) - 1)]
+
+
+def resume(valeurs_s: List[float]) -> Dict[str, float]:
+    ms = [v * 1000 for v in valeurs_s]
+    return {
+        "moyenne_ms": round(statistics.fmean(ms), 3) if ms else 0.0,
+        "p50_ms": round(centile(ms, 50), 3),
+        "p95_ms": round(centile(ms, 95), 3),
+        "p99_ms": round(centile(ms, 99), 3),
+        "max_ms": round(max(ms), 3) if ms else 0.0
+    }
+
+
+async def executer(args) -> Dict:
+    aleatoire = random.Random(args.graine)
+    appels = {"meteo": 0, "bagages": 0, "vols": 0}
+    clients = clients_simules(args, aleatoire, appels)
+    app.dependency_overrides[get_meteo_client] = lambda: clients[0]
+    app.dependency_overrides[get_bagage_client] = lambda: clients[1]
+    app.dependency_overrides[get_vol_client] = lambda: clients[2]
+    chronos = Chronos()
+    chronos.installer()
+
+    urls = [
+        f"/api/orientation/AF{aleatoire.randrange(args.vols):04d}/BAG{aleatoire.randrange(args.bagages):06d}"
+        f"?position_estimee={aleatoire.choice(['entree', 'securite', 'zone_embarquement'])}"
+        for _ in range(args.requetes)
+    ]
+    latences: List[float] = []
+    etapes: Dict[str, List[float]] = {etape: [] for etape in ETAPES + ("autre",)}
+    statuts: Dict[int, int] = {}
+    suivant = iter(urls)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def travailleur():
+            for url in suivant:
+                mesures: Dict[str, float] = {}
+                chronos.courant.set(mesures)
+                debut = time.perf_counter()
+                response = await client.get(url)
+                duree = time.perf_counter() - debut
+                latences.append(duree)
+                statuts[response.status_code] = statuts.get(response.status_code, 0) + 1
+                for etape in ETAPES:
+                    if etape in mesures:
+                        etapes[etape].append(mesures[etape])
+                etapes["autre"].append(duree - sum(mesures.values()))
+
+        # Préchauffage (caches, tables) hors mesure
+        for url in urls[:min(50, len(urls))]:
+            await client.get(url)
+        debut = time.perf_counter()
+        await asyncio.gather(*[travailleur() for _ in range(args.concurrence)])
+        duree_totale = time.perf_counter() - debut
+
+    for c in clients:
+        await c.close()
+    app.dependency_overrides.clear()
+
+    return {
+        "horodatage": datetime.now(timezone.utc).isoformat(),
+        "machine": {
+            "plateforme": platform.platform(),
+            "python": platform.python_version(),
+            "processeurs": os.cpu_count()
+        },
+        "parametres": {k: v for k, v in vars(args).items() if k != "sortie"},
+        "requetes": len(latences),
+        "duree_s": round(duree_totale, 3),
+        "requetes_par_s": round(len(latences) / duree_totale, 1),
+        "statuts": {str(k): v for k, v in sorted(statuts.items())},
+        "latence": resume(latences),
+        "etapes": {etape: resume(valeurs) for etape, valeurs in etapes.items()},
+        "appels_amont": appels
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requetes", type=int, default=5000)
+    parser.add_argument("--concurrence", type=int, default=50)
+    parser.add_argument("--vols", type=int, default=200)
+    parser.add_argument("--bagages", type=int, default=20000)
+    parser.add_argument("--latence-meteo", default="lognormal:20:0.5")
+    parser.add_argument("--latence-bagages", default="lognormal:15:0.5")
+    parser.add_argument("--latence-vols", default="lognormal:15:0.5")
+    parser.add_argument("--erreurs-meteo", type=float, default=0.0)
+    parser.add_argument("--erreurs-bagages", type=float, default=0.0)
+    parser.add_argument("--erreurs-vols", type=float, default=0.0)
+    parser.add_argument("--graine", type=int, default=7)
+    parser.add_argument("--sortie", help="Fichier JSON des résultats")
+    args = parser.parse_args()
+    # Les erreurs injectées sont journalisées par les clients: comptées via les statuts
+    logging.disable(logging.CRITICAL)
+
+    resultats = asyncio.run(executer(args))
+
+    latence = resultats["latence"]
+    print(f"{resultats['requetes']} requêtes, concurrence {args.concurrence}: {resultats['requetes_par_s']} req/s")
+    print(f"statuts: {resultats['statuts']}")
+    print(f"{'':10} {'p50':>9} {'p95':>9} {'p99':>9}  (ms)")
+    print(f"{'total':10} {latence['p50_ms']:9.2f} {latence['p95_ms']:9.2f} {latence['p99_ms']:9.2f}")
+    for etape, r in resultats["etapes"].items():
+        print(f"{etape:10} {r['p50_ms']:9.2f} {r['p95_ms']:9.2f} {r['p99_ms']:9.2f}")
+    print(f"appels amont: {resultats['appels_amont']}")
+    if args.sortie:
+        with open(args.sortie, "w", encoding="utf-8") as f:
+            json.dump(resultats, f, indent=2, ensure_ascii=False)
+        print(f"résultats écrits dans {args.sortie}")
+
+
+if __name__ == "__main__":
+    main()
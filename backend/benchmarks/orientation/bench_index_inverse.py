@@ -0,0 +1,123 @@
+"""
+Index inverse des abonnements: mémoire et latence de diffusion d'un événement.
+
+    python -m benchmarks.orientation.bench_index_inverse [--passagers 50000] [--vols 600]
+
+Les passagers actifs sont indexés sous les entrées de leur orientation
+(vol, bagage, porte, zones traversées, contrôles candidats). Pour chaque type
+d'événement, on mesure la recherche des passagers concernés dans l'index et
+par balayage de tous les abonnements (référence), puis le recalcul en un lot
+des orientations concernées (calculer_orientation, données amont en mémoire).
+"""
+import argparse
+import gc
+import logging
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from services.orientation.core.config import Settings
+from services.orientation.core.decision_engine import DecisionEngine
+from services.orientation.core.index_inverse import CONTROLE, PORTE, VOL, ZONE, IndexInverse, dependances_orientation
+from services.orientation.pipeline import calculer_orientation
+
+
+def meilleur_temps(fonction, repetitions=5):
+    """Meilleur de `repetitions` appels (secondes) et le dernier résultat"""
+    meilleur = float("inf")
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        resultat = fonction()
+        meilleur = min(meilleur, time.perf_counter() - debut)
+    return meilleur, resultat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--passagers", type=int, default=50000)
+    parser.add_argument("--vols", type=int, default=600)
+    parser.add_argument("--graine", type=int, default=3)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    aleatoire = random.Random(args.graine)
+    engine = DecisionEngine(Settings())
+    portes = list(engine.topologie.zone_par_porte)
+    maintenant = datetime.now()
+    vols = {}
+    for k in range(args.vols):
+        porte = aleatoire.choice(portes)
+        vols[f"AF{k:04d}"] = {
+            "numero": f"AF{k:04d}",
+            "heure_depart": (maintenant + timedelta(minutes=aleatoire.randint(30, 300))).isoformat(),
+            "porte_originale": porte,
+            "porte_actuelle": porte,
+            "terminal": "2"
+        }
+    numeros = list(vols)
+    positions = [None, "entree", "securite", "zone_embarquement", "porte"]
+    abonnements = [
+        (aleatoire.choice(numeros), f"BAG{k:06d}", aleatoire.choice(positions))
+        for k in range(args.passagers)
+    ]
+    dependances = {
+        cle: dependances_orientation(engine, cle[0], cle[1], cle[2], vols[cle[0]])
+        for cle in abonnements
+    }
+
+    gc.collect()
+    tracemalloc.start()
+    debut = time.perf_counter()
+    index = IndexInverse()
+    for cle in abonnements:
+        index.indexer(cle, dependances[cle])
+    indexation_s = time.perf_counter() - debut
+    memoire, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    stats = index.statistiques()
+    print(
+        f"{args.passagers} passagers, {args.vols} vols: index {memoire / 2**20:.1f} Mio "
+        f"({stats['dependances']} dépendances, {stats['entrees']} entrées), "
+        f"indexation {indexation_s / args.passagers * 1e6:.2f} µs/passager"
+    )
+
+    # Réindexation après un changement de porte (seules les entrées modifiées bougent)
+    cle = abonnements[0]
+    vol_data = dict(vols[cle[0]], porte_actuelle=aleatoire.choice(portes))
+    debut = time.perf_counter()
+    for _ in range(1000):
+        index.indexer(cle, dependances_orientation(engine, cle[0], cle[1], cle[2], vol_data))
+        index.indexer(cle, dependances[cle])
+    print(f"réindexation d'un passager (dépendances recalculées) {(time.perf_counter() - debut) / 2000 * 1e6:.1f} µs")
+
+    meteo_data = {"niveau_alerte": "faible", "impact": {}}
+    bagage_data = {"statut": "EN_SOUTE"}
+    evenements = [
+        ("vol", [(VOL, numeros[0])]),
+        ("porte", [(PORTE, vols[numeros[1]]["porte_actuelle"])]),
+        ("contrôle C", [(CONTROLE, "C")]),
+        ("zone G", [(ZONE, "G")]),
+    ]
+    print(f"{'événement':12} {'concernés':>9} {'index':>10} {'balayage':>10} {'recalcul du lot':>16}")
+    gc.collect()
+    for nom, modifiees in evenements:
+        index_s, concernes = meilleur_temps(lambda: index.concernes(modifiees))
+        balayage_s, balayage = meilleur_temps(
+            lambda: [c for c in abonnements if any(d in dependances[c] for d in modifiees)]
+        )
+        assert len(balayage) == len(concernes)
+
+        debut = time.perf_counter()
+        for numero_vol, _, position in concernes:
+            calculer_orientation(engine, numero_vol, position, meteo_data, bagage_data, vols[numero_vol])
+        recalcul_s = time.perf_counter() - debut
+
+        print(
+            f"{nom:12} {len(concernes):9d} {index_s * 1e3:7.3f} ms {balayage_s * 1e3:7.2f} ms "
+            f"{recalcul_s * 1e3:10.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Débit du journal des orientations: une insertion par requête vs écrivain groupé.
+
+    python -m benchmarks.orientation.bench_journal [--orientations 20000] [--debit 5000]
+
+Base SQLite (aiosqlite) dans un fichier temporaire. L'écrivain groupé reçoit
+les orientations au rythme `--debit` par seconde, comme depuis les requêtes.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from services.orientation.core.config import Settings
+from services.orientation.core.decision_engine import DecisionEngine
+from services.orientation.journal import JournalOrientations
+from services.orientation.models.orientation import OrientationLog
+from services.orientation.pipeline import calculer_orientation
+
+
+async def _base(chemin):
+    moteur = create_async_engine(f"sqlite+aiosqlite:///{chemin}")
+    async with moteur.begin() as connexion:
+        await connexion.run_sync(OrientationLog.__table__.create)
+    return moteur
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--orientations", type=int, default=20000)
+    parser.add_argument("--unitaires", type=int, default=2000, help="Orientations pour le mode une insertion par requête")
+    parser.add_argument("--debit", type=float, default=5000, help="Orientations/s reçues par l'écrivain groupé")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    engine = DecisionEngine(Settings())
+    reponse = calculer_orientation(
+        engine, "AF1234", "entree", {"niveau_alerte": "faible", "impact": {}}, {"statut": "EN_SOUTE"},
+        {"numero": "AF1234", "heure_depart": (datetime.now() + timedelta(hours=2)).isoformat(),
+         "porte_originale": "G20", "porte_actuelle": "G22"}
+    )
+    meteo_data, bagage_data = {"impact": {"retard_moyen": 5}}, {"statut": "EN_SOUTE"}
+
+    with tempfile.TemporaryDirectory() as dossier:
+        # Une insertion (et une transaction) par orientation
+        moteur = await _base(os.path.join(dossier, "unitaire.db"))
+        sessions = async_sessionmaker(moteur, expire_on_commit=False)
+        journal = JournalOrientations(Settings(), sessions)
+        debut = time.perf_counter()
+        for i in range(args.unitaires):
+            journal.enregistrer("AF1234", f"BAG{i:06d}", "entree", reponse, meteo_data, bagage_data)
+            await journal._ecrire(journal._prendre_lot())
+        unitaire_s = time.perf_counter() - debut
+        await moteur.dispose()
+
+        # Écrivain groupé alimenté au débit cible
+        moteur = await _base(os.path.join(dossier, "groupe.db"))
+        journal = JournalOrientations(Settings(), async_sessionmaker(moteur, expire_on_commit=False))
+        journal.demarrer()
+        depot_s = 0.0
+        rafale = 100
+        debut = time.perf_counter()
+        for k in range(0, args.orientations, rafale):
+            t0 = time.perf_counter()
+            for i in range(k, min(k + rafale, args.orientations)):
+                journal.enregistrer("AF1234", f"BAG{i:06d}", "entree", reponse, meteo_data, bagage_data)
+            depot_s += time.perf_counter() - t0
+            await asyncio.sleep(max(debut + (k + rafale) / args.debit - time.perf_counter(), 0))
+        await journal.fermer()
+        groupe_s = time.perf_counter() - debut
+        await moteur.dispose()
+
+        # Capacité: file pré-remplie, vidée aussi vite que possible
+        moteur = await _base(os.path.join(dossier, "capacite.db"))
+        capacite_journal = JournalOrientations(
+            Settings(JOURNAL_FILE_MAX=args.orientations), async_sessionmaker(moteur, expire_on_commit=False)
+        )
+        for i in range(args.orientations):
+            capacite_journal.enregistrer("AF1234", f"BAG{i:06d}", "entree", reponse, meteo_data, bagage_data)
+        debut = time.perf_counter()
+        capacite_journal.demarrer()
+        await capacite_journal.fermer()
+        capacite = capacite_journal.ecrites / (time.perf_counter() - debut)
+        await moteur.dispose()
+
+    stats = journal.statistiques()
+    print(f"une insertion par requête : {args.unitaires / unitaire_s:8.0f} orientations/s")
+    print(
+        f"écrivain groupé           : {stats['ecrites'] / groupe_s:8.0f} orientations/s "
+        f"(cible {args.debit:.0f}/s, {stats['lots']} lots, {stats['abandonnees']} abandonnées)"
+    )
+    print(f"coût du dépôt en requête  : {depot_s / args.orientations * 1e6:8.1f} µs/orientation")
+    print(f"capacité de l'écrivain    : {capacite:8.0f} orientations/s (file pré-remplie)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
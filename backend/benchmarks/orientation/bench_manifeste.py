@@ -0,0 +1,98 @@
+"""
+Urgence de tous les passagers au départ: chemin scalaire vs mode vectoriel.
+
+    python -m benchmarks.orientation.bench_manifeste [--vols 200] [--passagers-par-vol 250]
+"""
+import argparse
+import gc
+import logging
+import random
+import time
+from datetime import datetime, timedelta
+
+from services.orientation.core.config import Settings
+from services.orientation.core.decision_engine import DecisionEngine
+from services.orientation.core.topologie import FICHIER_DEFAUT, Topologie
+from services.orientation.core.moteur_vectoriel import ManifesteVectoriel, NIVEAUX_URGENCE
+from services.orientation.utils import generer_alertes, generer_instructions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--vols", type=int, default=200)
+    parser.add_argument("--passagers-par-vol", type=int, default=250)
+    parser.add_argument("--graine", type=int, default=3)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    aleatoire = random.Random(args.graine)
+    portes = list(Topologie.depuis_fichier(FICHIER_DEFAUT).zone_par_porte)
+    maintenant = datetime.now()
+    vols = {}
+    for k in range(args.vols):
+        numero = f"AF{k:04d}"
+        porte = aleatoire.choice(portes)
+        vols[numero] = {
+            "numero": numero,
+            "heure_depart": (maintenant + timedelta(minutes=aleatoire.randint(5, 240), seconds=30)).isoformat(),
+            "porte_originale": porte,
+            "porte_actuelle": porte if aleatoire.random() > 0.1 else aleatoire.choice(portes),
+        }
+    statuts = ["EN_SOUTE"] * 18 + ["MAL_ACHEMINE", "EN_VERIFICATION"]
+    positions = [None, "entree", "securite", "zone_embarquement", "porte"]
+    passagers, bagages = [], {}
+    for numero in vols:
+        for k in range(args.passagers_par_vol):
+            id_bagage = f"BAG{numero}{k:04d}"
+            passagers.append((numero, id_bagage, aleatoire.choice(positions)))
+            bagages[id_bagage] = {"id": id_bagage, "statut": aleatoire.choice(statuts)}
+    meteo_data = {"niveau_alerte": "faible", "impact": {}}
+
+    engine = DecisionEngine(Settings())
+    debut = time.perf_counter()
+    scalaire = []
+    for numero, id_bagage, position in passagers:
+        situation = engine.analyser_situation(meteo_data, bagages[id_bagage], vols[numero])
+        scalaire.append({
+            "situation": situation,
+            "instructions": generer_instructions(engine, situation, position, vols[numero], bagages[id_bagage]),
+            "alertes": generer_alertes(situation, meteo_data, vols[numero])
+        })
+    scalaire_s = time.perf_counter() - debut
+
+    gc.collect()
+    manifeste = ManifesteVectoriel(engine, passagers)
+    manifeste.definir_bagages(bagages)
+    debut = time.perf_counter()
+    premier = manifeste.evaluer(meteo_data, vols)
+    premier_s = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    manifeste.evaluer(meteo_data, vols)
+    inchange_s = time.perf_counter() - debut
+
+    # Minute suivante: quelques changements de porte et de statut bagage
+    for numero in aleatoire.sample(list(vols), 3):
+        vols[numero] = dict(vols[numero], porte_actuelle=aleatoire.choice(portes))
+    for id_bagage in aleatoire.sample(list(bagages), 50):
+        manifeste.mettre_a_jour_bagage(id_bagage, {"statut": "MAL_ACHEMINE"})
+    debut = time.perf_counter()
+    suivant = manifeste.evaluer(meteo_data, vols)
+    suivant_s = time.perf_counter() - debut
+
+    identique = [str(NIVEAUX_URGENCE[u]) for u in premier["niveau_urgence"]] == [
+        orientation["situation"]["niveau_urgence"] for orientation in scalaire
+    ]
+    print(f"{len(passagers)} passagers, {len(vols)} vols")
+    print(f"chemin scalaire (tout matérialisé)  : {scalaire_s * 1000:8.1f} ms")
+    print(f"vectoriel, 1re évaluation (tout)     : {premier_s * 1000:8.1f} ms")
+    print(f"vectoriel, sans changement           : {inchange_s * 1000:8.1f} ms")
+    print(f"vectoriel, minute suivante           : {suivant_s * 1000:8.1f} ms"
+          f" ({len(suivant['modifies'])} passagers matérialisés)")
+    print(f"urgences identiques au chemin scalaire: {identique}")
+    if not identique:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
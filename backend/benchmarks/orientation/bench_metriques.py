@@ -0,0 +1,119 @@
+"""
+Instrumentation Prometheus: surcoût par orientation sur le chemin critique.
+
+    python -m benchmarks.orientation.bench_metriques [--iterations 200000]
+
+Une orientation observe neuf durées d'étape (DureeEtape, sans verrou),
+incrémente le compteur de son niveau d'urgence et lit l'horloge une
+douzaine de fois. On mesure ce surcoût seul, le même avec des Histogram de
+prometheus_client (référence), puis calculer_orientation avec et sans
+métriques (observations remplacées par des no-op), et le coût des deux
+anciens logs INFO par requête.
+"""
+import argparse
+import io
+import logging
+import time
+from datetime import datetime, timedelta
+
+from prometheus_client import CollectorRegistry, Histogram
+
+from services.orientation import pipeline
+from services.orientation.core.config import Settings
+from services.orientation.core.decision_engine import DecisionEngine
+from services.orientation.metrics import BORNES_ETAPE, ETAPES, compter_urgence
+
+
+class SansEffet:
+    def observe(self, valeur):
+        pass
+
+    def inc(self, valeur=1):
+        pass
+
+
+def par_iteration(fonction, iterations):
+    """Meilleur de 5 séries, en µs par itération"""
+    meilleur = float("inf")
+    for _ in range(5):
+        debut = time.perf_counter()
+        for _ in range(iterations):
+            fonction()
+        meilleur = min(meilleur, time.perf_counter() - debut)
+    return meilleur / iterations * 1e6
+
+
+def instrumentation(etapes):
+    def _requete():
+        horloge = time.perf_counter
+        debut = horloge()
+        for etape in ("validation", "amont_meteo", "amont_bagages", "amont_vols", "congestion",
+                      "situation", "parcours", "reponse", "serialisation"):
+            etapes[etape].observe(horloge() - debut)
+        horloge()
+        horloge()
+        compter_urgence("moyen")
+    return _requete
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=200000)
+    args = parser.parse_args()
+
+    engine = DecisionEngine(Settings())
+    vol_data = {
+        "numero": "AF1234",
+        "heure_depart": (datetime.now() + timedelta(minutes=90)).isoformat(),
+        "porte_originale": "G21",
+        "porte_actuelle": "G21",
+        "terminal": "2"
+    }
+    meteo_data = {"niveau_alerte": "moyen", "impact": {}}
+    bagage_data = {"statut": "EN_SOUTE"}
+
+    def orienter():
+        pipeline.calculer_orientation(engine, "AF1234", "entree", meteo_data, bagage_data, vol_data)
+
+    surcout = par_iteration(instrumentation(ETAPES), args.iterations)
+    histogramme = Histogram(
+        "bench_etape_duree_secondes", "", ["etape"], buckets=BORNES_ETAPE, registry=CollectorRegistry()
+    )
+    reference = par_iteration(
+        instrumentation({etape: histogramme.labels(etape) for etape in ETAPES}), args.iterations
+    )
+    iterations_calcul = max(args.iterations // 20, 1)
+    avec = par_iteration(orienter, iterations_calcul)
+    etapes, compteur = dict(ETAPES), pipeline.compter_urgence
+    ETAPES.update({etape: SansEffet() for etape in ETAPES})
+    pipeline.compter_urgence = lambda niveau: None
+    sans = par_iteration(orienter, iterations_calcul)
+    ETAPES.update(etapes)
+    pipeline.compter_urgence = compteur
+
+    # Anciens logs INFO par requête (f-string formatée, écrite sur un flux)
+    logger = logging.getLogger("bench.orientation")
+    logger.addHandler(logging.StreamHandler(io.StringIO()))
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    info = par_iteration(
+        lambda: (logger.info(f"Calcul orientation pour vol {'AF1234'}, bagage {'BAG123456'}"),
+                 logger.info(f"Orientation calculée - Vol: {'AF1234'}, Urgence: {'moyen'}")),
+        args.iterations // 10
+    )
+    debug = par_iteration(
+        lambda: (logger.debug("Calcul orientation pour vol %s, bagage %s", "AF1234", "BAG123456"),
+                 logger.debug("Orientation calculée - Vol: %s, Urgence: %s", "AF1234", "moyen")),
+        args.iterations
+    )
+
+    print(f"instrumentation seule (9 durées, 1 compteur)        {surcout:6.2f} µs/requête")
+    print(f"idem avec prometheus_client.Histogram              {reference:6.2f} µs/requête")
+    print(f"calculer_orientation avec métriques                {avec:6.2f} µs")
+    print(f"calculer_orientation sans métriques                {sans:6.2f} µs")
+    print(f"2 logs INFO par requête (avant)                    {info:6.2f} µs")
+    print(f"2 logs DEBUG désactivés (après)                    {debug:6.2f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Prévision de saturation: coût d'un pas de calcul selon le nombre de zones et de vols.
+
+    python -m benchmarks.orientation.bench_prevision [--zones 500] [--vols 10000] [--pas 200]
+
+Chaque pas intègre l'occupation de toutes les zones (niveau et tendance de
+Holt en vecteurs numpy), agrège les départs programmés par zone et par
+horizon, projette et extrait les alertes. La référence calcule la même
+chose zone par zone en Python pur.
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from services.orientation.core.prevision_saturation import PrevisionSaturation, sorties_programmees
+
+
+def reference(zones, capacites, horizons, vols):
+    """Holt amorti et départs, zone par zone (boucles Python)"""
+    alpha, beta, phi = 0.5, 0.2, 0.98
+    coefs = [sum(phi ** k for k in range(1, int(h) + 1)) for h in horizons]
+    niveau = {z: None for z in zones}
+    tendance = {z: 0.0 for z in zones}
+
+    def pas(occupation):
+        for z in zones:
+            y = occupation[z]
+            if niveau[z] is None:
+                niveau[z] = y
+                continue
+            nouveau = alpha * y + (1 - alpha) * (niveau[z] + phi * tendance[z])
+            tendance[z] = beta * (nouveau - niveau[z]) + (1 - beta) * phi * tendance[z]
+            niveau[z] = nouveau
+        sorties = {z: [0.0] * len(horizons) for z in zones}
+        for z, minutes, passagers in vols:
+            for k, h in enumerate(horizons):
+                if minutes <= h:
+                    sorties[z][k] += passagers
+        alertes = []
+        for z in zones:
+            for k, c in enumerate(coefs):
+                if max(niveau[z] + c * tendance[z] - sorties[z][k], 0.0) > capacites[z]:
+                    alertes.append(z)
+                    break
+        return alertes
+
+    return pas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--zones", type=int, default=500)
+    parser.add_argument("--vols", type=int, default=10000)
+    parser.add_argument("--pas", type=int, default=200)
+    parser.add_argument("--graine", type=int, default=7)
+    args = parser.parse_args()
+
+    aleatoire = random.Random(args.graine)
+    zones = [f"Z{k}" for k in range(args.zones)]
+    capacites = {z: aleatoire.randint(200, 800) for z in zones}
+    horizons = [15.0, 30.0, 45.0, 60.0]
+    vols = [
+        (aleatoire.randrange(args.zones), aleatoire.uniform(0, 180), aleatoire.randint(0, 200))
+        for _ in range(args.vols)
+    ]
+    series = [
+        {z: capacites[z] * (0.5 + 0.004 * t) + aleatoire.gauss(0, 10) for z in zones}
+        for t in range(args.pas)
+    ]
+
+    modele = PrevisionSaturation(zones, [capacites[z] for z in zones], horizons_min=horizons)
+    debut = time.perf_counter()
+    for occupation in series:
+        # Tableaux du programme reconstruits à chaque pas, comme le service
+        zone = np.fromiter((v[0] for v in vols), dtype=np.intp, count=len(vols))
+        minutes = np.fromiter((v[1] for v in vols), dtype=float, count=len(vols))
+        passagers = np.fromiter((v[2] for v in vols), dtype=float, count=len(vols))
+        modele.mettre_a_jour(np.fromiter((occupation[z] for z in zones), dtype=float, count=len(zones)))
+        prevision = modele.prevoir(sorties_programmees(len(zones), modele.horizons_min, zone, minutes, passagers))
+        alertes = modele.alertes(prevision)
+    vectorise_s = (time.perf_counter() - debut) / args.pas
+
+    pas = reference(zones, capacites, horizons, [(zones[z], m, p) for z, m, p in vols])
+    debut = time.perf_counter()
+    for occupation in series:
+        alertes_ref = pas(occupation)
+    reference_s = (time.perf_counter() - debut) / args.pas
+
+    print(f"{args.zones} zones, {args.vols} vols, {args.pas} pas")
+    print(f"numpy (Holt vectorisé)   {vectorise_s * 1e3:7.2f} ms/pas, {len(alertes)} zones en alerte")
+    print(f"référence (Python pur)   {reference_s * 1e3:7.2f} ms/pas, {len(alertes_ref)} zones en alerte")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Réparation incrémentale des tables de routage vs recalcul complet.
+
+    python -m benchmarks.orientation.bench_reroutage [--cote 55] [--sources 150] [--majs 200]
+"""
+import argparse
+import math
+import random
+import time
+
+from services.orientation.core.path_optimizer import GrapheTerminal, OptimiseurParcours
+
+
+def construire_grille(cote: int, aleatoire: random.Random) -> GrapheTerminal:
+    graphe = GrapheTerminal()
+    for x in range(cote):
+        for y in range(cote):
+            graphe.ajouter_noeud(f"{x}-{y}", "couloir", (x * 20.0, y * 20.0))
+    for x in range(cote):
+        for y in range(cote):
+            if x + 1 < cote:
+                graphe.ajouter_arete(f"{x}-{y}", f"{x + 1}-{y}", aleatoire.uniform(0.2, 1.0))
+            if y + 1 < cote:
+                graphe.ajouter_arete(f"{x}-{y}", f"{x}-{y + 1}", aleatoire.uniform(0.2, 1.0))
+    return graphe
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cote", type=int, default=55)
+    parser.add_argument("--sources", type=int, default=150)
+    parser.add_argument("--majs", type=int, default=200)
+    parser.add_argument("--graine", type=int, default=7)
+    args = parser.parse_args()
+
+    aleatoire = random.Random(args.graine)
+    graphe = construire_grille(args.cote, aleatoire)
+    sources = aleatoire.sample(graphe.noeuds, args.sources)
+    optimiseur = OptimiseurParcours(graphe, sources=sources)
+    aretes = [(i, j) for i, voisins in enumerate(graphe.voisins) for j in voisins if i < j]
+
+    debut = time.perf_counter()
+    optimiseur.recalculer()
+    complet_s = time.perf_counter() - debut
+
+    durees = []
+    for _ in range(args.majs):
+        i, j = aleatoire.choice(aretes)
+        tirage = aleatoire.random()
+        # Fermetures, congestion et réouvertures
+        minutes = math.inf if tirage < 0.1 else aleatoire.uniform(0.1, 3.0)
+        debut = time.perf_counter()
+        optimiseur.mettre_a_jour_arete(graphe.noeuds[i], graphe.noeuds[j], minutes)
+        durees.append(time.perf_counter() - debut)
+
+    incremental = [list(d) for d in optimiseur.distances]
+    optimiseur.recalculer()
+    identique = incremental == [list(d) for d in optimiseur.distances]
+
+    durees.sort()
+    moyenne = sum(durees) / len(durees)
+    print(f"graphe: {len(graphe)} noeuds, {len(aretes)} arêtes, {args.sources} sources")
+    print(f"recalcul complet     : {complet_s * 1000:8.1f} ms")
+    print(f"mise à jour (moyenne): {moyenne * 1000:8.2f} ms")
+    print(f"mise à jour (p50)    : {durees[len(durees) // 2] * 1000:8.2f} ms")
+    print(f"mise à jour (p99)    : {durees[int(len(durees) * 0.99) - 1] * 1000:8.2f} ms")
+    print(f"accélération         : x{complet_s / moyenne:.1f}")
+    print(f"résultat identique au recalcul complet: {identique}")
+    if not identique:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
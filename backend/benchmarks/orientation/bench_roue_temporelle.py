@@ -0,0 +1,127 @@
+"""
+Minuteurs de départ vers la porte: roue temporelle hiérarchique vs tas binaire.
+
+    python -m benchmarks.orientation.bench_roue_temporelle [--minuteurs 100000] [--horizon-s 10800]
+
+Horloge simulée: les minuteurs sont planifiés sur `--horizon-s`, une partie est
+replanifiée (retards, changements de porte) ou annulée (désabonnements), puis
+le temps avance seconde par seconde jusqu'au dernier déclenchement. Le tas de
+référence (heapq) annule paresseusement: l'entrée reste dans le tas et est
+ignorée à l'extraction.
+"""
+import argparse
+import heapq
+import itertools
+import random
+import time
+
+from services.orientation.core.roue_temporelle import RoueTemporelle
+
+
+class Horloge:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+class TasMinuteurs:
+    """Référence: tas binaire, O(log n) par insertion, annulation paresseuse"""
+
+    def __init__(self, horloge):
+        self._horloge = horloge
+        self._tas = []
+        self._actifs = {}
+        self._compteur = itertools.count()
+
+    def __len__(self):
+        return len(self._actifs)
+
+    def planifier(self, cle, delai_s, valeur=None):
+        entree = [self._horloge() + delai_s, next(self._compteur), cle, valeur, True]
+        ancienne = self._actifs.get(cle)
+        if ancienne is not None:
+            ancienne[4] = False
+        self._actifs[cle] = entree
+        heapq.heappush(self._tas, entree)
+
+    def annuler(self, cle):
+        entree = self._actifs.pop(cle, None)
+        if entree is not None:
+            entree[4] = False
+
+    def avancer(self):
+        maintenant = self._horloge()
+        lot = []
+        while self._tas and self._tas[0][0] <= maintenant:
+            echeance, _, cle, valeur, actif = heapq.heappop(self._tas)
+            if actif:
+                del self._actifs[cle]
+                lot.append((cle, valeur))
+        return lot
+
+
+def mesurer(nom, fabrique, args):
+    aleatoire = random.Random(args.graine)
+    horloge = Horloge()
+    minuteurs = fabrique(horloge)
+    n = args.minuteurs
+    delais = [aleatoire.uniform(60, args.horizon_s) for _ in range(n)]
+    replanifies = aleatoire.sample(range(n), int(n * args.part_replanifies))
+    annules = aleatoire.sample(range(n), int(n * args.part_annules))
+
+    debut = time.perf_counter()
+    for k in range(n):
+        minuteurs.planifier(k, delais[k], k)
+    insertion_s = time.perf_counter() - debut
+
+    horloge.t = 30.0
+    debut = time.perf_counter()
+    for k in replanifies:
+        minuteurs.planifier(k, delais[k] + aleatoire.uniform(-600, 1800), k)
+    replanification_s = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    for k in annules:
+        minuteurs.annuler(k)
+    annulation_s = time.perf_counter() - debut
+    en_attente = len(minuteurs)
+
+    declenches = 0
+    plus_gros_lot = 0
+    ticks = 0
+    debut = time.perf_counter()
+    while len(minuteurs):
+        horloge.t += 1.0
+        lot = minuteurs.avancer()
+        declenches += len(lot)
+        plus_gros_lot = max(plus_gros_lot, len(lot))
+        ticks += 1
+    avancement_s = time.perf_counter() - debut
+
+    print(
+        f"{nom:18} insertion {insertion_s / n * 1e6:5.2f} µs | "
+        f"replanification {replanification_s / max(len(replanifies), 1) * 1e6:5.2f} µs | "
+        f"annulation {annulation_s / max(len(annules), 1) * 1e6:5.2f} µs | "
+        f"avancement {avancement_s / ticks * 1e6:6.1f} µs/tick ({ticks} ticks, "
+        f"{declenches}/{en_attente} déclenchés, lot max {plus_gros_lot})"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--minuteurs", type=int, default=100000)
+    parser.add_argument("--horizon-s", type=float, default=3 * 3600)
+    parser.add_argument("--part-replanifies", type=float, default=0.3)
+    parser.add_argument("--part-annules", type=float, default=0.1)
+    parser.add_argument("--graine", type=int, default=11)
+    args = parser.parse_args()
+
+    print(f"{args.minuteurs} minuteurs sur {args.horizon_s / 3600:.1f} h")
+    mesurer("roue temporelle", lambda horloge: RoueTemporelle(horloge=horloge), args)
+    mesurer("tas (heapq)", TasMinuteurs, args)
+
+
+if __name__ == "__main__":
+    main()
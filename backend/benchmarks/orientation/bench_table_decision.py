@@ -0,0 +1,74 @@
+"""
+Microbenchmark: règles scalaires vs table de décision précompilée.
+
+    python -m benchmarks.orientation.bench_table_decision [--requetes 20000]
+"""
+import argparse
+import logging
+import random
+import time
+from datetime import datetime, timedelta
+
+from services.orientation.core.config import Settings
+from services.orientation.core.decision_engine import DecisionEngine
+from services.orientation.core.topologie import FICHIER_DEFAUT, Topologie
+from services.orientation.schemas.orientation import AlerteSchema, InstructionSchema, SituationSchema
+from services.orientation.utils import generer_alertes, generer_instructions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requetes", type=int, default=20000)
+    parser.add_argument("--graine", type=int, default=5)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    aleatoire = random.Random(args.graine)
+    portes = list(Topologie.depuis_fichier(FICHIER_DEFAUT).zone_par_porte)
+    maintenant = datetime.now()
+    vols = []
+    for k in range(300):
+        porte = aleatoire.choice(portes)
+        vols.append({
+            "numero": f"AF{k:04d}",
+            "heure_depart": (maintenant + timedelta(minutes=aleatoire.randint(5, 240))).isoformat(),
+            "porte_originale": porte,
+            "porte_actuelle": porte if aleatoire.random() > 0.1 else aleatoire.choice(portes),
+            "terminal": "2"
+        })
+    requetes = []
+    for _ in range(args.requetes):
+        requetes.append((
+            {"niveau_alerte": aleatoire.choice(["faible"] * 6 + ["moyen", "critique"]), "impact": {"conditions": ["Pluie"]}},
+            {"statut": aleatoire.choice(["EN_SOUTE"] * 18 + ["MAL_ACHEMINE", "EN_VERIFICATION"])},
+            aleatoire.choice(vols),
+            aleatoire.choice([None, "entree", "securite", "zone_embarquement", "porte"])
+        ))
+
+    engine = DecisionEngine(Settings())
+
+    # Chemin scalaire, avec la construction des schémas comme dans l'ancien calculer_orientation
+    debut = time.perf_counter()
+    for meteo_data, bagage_data, vol_data, position in requetes:
+        situation = engine.analyser_situation(meteo_data, bagage_data, vol_data)
+        instructions = generer_instructions(engine, situation, position, vol_data, bagage_data)
+        alertes = generer_alertes(situation, meteo_data, vol_data)
+        SituationSchema(**situation)
+        [InstructionSchema(**i) for i in instructions]
+        [AlerteSchema(**a) for a in alertes]
+    scalaire_s = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    for meteo_data, bagage_data, vol_data, position in requetes:
+        engine.table.evaluer(meteo_data, bagage_data, vol_data, position)
+    table_s = time.perf_counter() - debut
+
+    n = len(requetes)
+    print(f"{n} requêtes, table de {len(engine.table)} états")
+    print(f"règles scalaires   : {scalaire_s / n * 1e6:7.1f} µs/requête")
+    print(f"table de décision  : {table_s / n * 1e6:7.1f} µs/requête")
+    print(f"accélération       : x{scalaire_s / table_s:.1f}")
+
+
+if __name__ == "__main__":
+    main()
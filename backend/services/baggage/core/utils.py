@@ -2,7 +2,12 @@ import qrcode
 import uuid
 import os
 
-def generate_qr_code(tag: str, output_dir="storage/qr_codes") -> str:
+# Dossier des QR codes générés (remplacé par les tests)
+QR_CODES_DIR = "storage/qr_codes"
+
+
+def generate_qr_code(tag: str, output_dir: str | None = None) -> str:
+    output_dir = output_dir or QR_CODES_DIR
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
@@ -0,0 +1,347 @@
+import asyncio
+import json
+import logging
+import math
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from fastapi import HTTPException, status
+
+from .core.config import Settings
+from .core.decision_engine import DecisionEngine
+from .core.index_inverse import BAGAGE, VOL, ZONE, Dependance, IndexInverse, dependances_orientation
+from .core.path_optimizer import noeud_porte
+from .core.roue_temporelle import Echeance, RoueTemporelle
+from .journal import JournalOrientations
+from .pipeline import calculer_orientation, charger_meteo, charger_vol
+from .schemas.orientation import ActionType, OrientationResponse
+from .services.meteo_client import MeteoServiceClient
+from .services.baggage_client import BagageServiceClient
+from .services.vol_client import VolServiceClient
+
+logger = logging.getLogger(__name__)
+
+# (numero_vol, id_bagage, position_estimee)
+CleAbonnement = Tuple[str, str, Optional[str]]
+
+
+class Abonnement:
+    """Orientation suivie pour un (vol, bagage, position), partagée par ses clients"""
+
+    __slots__ = ("cle", "files", "empreinte", "signature", "dernier_message", "zone_attente")
+
+    def __init__(self, cle: CleAbonnement):
+        self.cle = cle
+        self.files: Set[asyncio.Queue] = set()
+        # Entrées utilisées par la dernière orientation calculée
+        self.empreinte: Optional[int] = None
+        # Contenu de la dernière orientation envoyée, hors horodatage
+        self.signature: Optional[str] = None
+        self.dernier_message: Optional[str] = None
+        # Zone d'attente conseillée, tant que le départ vers la porte n'est pas notifié
+        self.zone_attente: Optional[str] = None
+
+
+def _publier(file: asyncio.Queue, message: str):
+    """Dépose un message; si le client est en retard, le plus ancien est remplacé"""
+    if file.full():
+        file.get_nowait()
+    file.put_nowait(message)
+
+
+class GestionnaireAbonnements:
+    """
+    Orientation poussée aux passagers abonnés.
+
+    Chaque abonnement garde l'empreinte des entrées de sa dernière orientation
+    (vol, bagage, météo, versions des tables de routage et des attentes aux
+    contrôles, minute courante). L'orientation n'est recalculée que si cette
+    empreinte change, et n'est envoyée que si son contenu change.
+
+    Les revalidations sont déclenchées par les événements (vol, bagage, porte,
+    zone, contrôle, congestion météo), et périodiquement pour tous les
+    abonnements; les lectures amont sont groupées comme pour l'orientation par
+    lot. Un index inverse relie chaque entrée aux abonnements dont
+    l'orientation courante en dépend: un événement revalide exactement ces
+    abonnements, en un seul lot.
+
+    Un passager invité à patienter en zone d'attente (parcours JITB) reçoit un
+    message `depart_porte` quand il est temps de rejoindre sa porte: départ
+    moins la marche jusqu'à la porte et la marge d'embarquement. Un minuteur
+    par abonnement, dans une roue temporelle, replanifié à chaque orientation
+    recalculée (retard, changement de porte).
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        decision_engine: DecisionEngine,
+        meteo_client: MeteoServiceClient,
+        bagage_client: BagageServiceClient,
+        vol_client: VolServiceClient,
+        journal: Optional[JournalOrientations] = None
+    ):
+        self.settings = settings
+        self.decision_engine = decision_engine
+        self.meteo_client = meteo_client
+        self.bagage_client = bagage_client
+        self.vol_client = vol_client
+        # Orientations poussées, journalisées comme celles servies par requête
+        self.journal = journal
+        self._abonnements: Dict[CleAbonnement, Abonnement] = {}
+        self._nouveaux: Set[CleAbonnement] = set()
+        # Dépendances des orientations courantes, et celles signalées modifiées
+        self.index = IndexInverse()
+        self._modifiees: Set[Dependance] = set()
+        self._reveil = asyncio.Event()
+        self._tache: Optional[asyncio.Task] = None
+        # Notifications de départ vers la porte, par clé d'abonnement
+        self.departs = RoueTemporelle(
+            granularite_s=settings.JITB_GRANULARITE_S,
+            cases=settings.JITB_CASES,
+            niveaux=settings.JITB_NIVEAUX
+        )
+        # Congestion météo appliquée par n'importe quelle orientation
+        self.decision_engine.observateurs_congestion.append(self.notifier_congestion)
+        # Compteurs: orientations recalculées / messages envoyés / départs notifiés
+        self.recalculs = 0
+        self.envois = 0
+        self.notifications = 0
+
+    def __len__(self) -> int:
+        return len(self._abonnements)
+
+    def abonner(
+        self,
+        numero_vol: str,
+        id_bagage: str,
+        position: Optional[str] = None
+    ) -> Tuple[Abonnement, asyncio.Queue]:
+        """Abonne un client; la dernière orientation connue lui est envoyée immédiatement"""
+        cle = (numero_vol, id_bagage, position)
+        abonnement = self._abonnements.get(cle)
+        if abonnement is None:
+            abonnement = Abonnement(cle)
+            self._abonnements[cle] = abonnement
+            self.index.indexer(cle, [(VOL, numero_vol), (BAGAGE, id_bagage)])
+
+        file: asyncio.Queue = asyncio.Queue(maxsize=self.settings.ABONNEMENT_FILE_MAX)
+        abonnement.files.add(file)
+        if abonnement.dernier_message is not None:
+            _publier(file, abonnement.dernier_message)
+        else:
+            self._nouveaux.add(cle)
+            self._reveil.set()
+        self._demarrer()
+        return abonnement, file
+
+    def desabonner(self, abonnement: Abonnement, file: asyncio.Queue):
+        abonnement.files.discard(file)
+        if not abonnement.files and self._abonnements.get(abonnement.cle) is abonnement:
+            del self._abonnements[abonnement.cle]
+            self.index.retirer(abonnement.cle)
+            self.departs.annuler(abonnement.cle)
+
+    def notifier(self, dependances: Iterable[Dependance]):
+        """Signale des entrées modifiées: les abonnés qui en dépendent sont revalidés"""
+        self._modifiees.update(dependances)
+        self._reveil.set()
+
+    def notifier_vol(self, numero_vol: str):
+        """Signale un changement du vol (porte, horaire): ses abonnés sont revalidés"""
+        self.notifier([(VOL, numero_vol)])
+
+    def notifier_bagage(self, id_bagage: str):
+        """Signale un changement de statut du bagage"""
+        self.notifier([(BAGAGE, id_bagage)])
+
+    def notifier_congestion(self, zones: Set[str]):
+        """Zones dont la congestion vient de changer (temps de marche)"""
+        self.notifier((ZONE, zone) for zone in zones)
+
+    def _demarrer(self):
+        if self._tache is None or self._tache.done():
+            self._tache = asyncio.create_task(self._boucle())
+        self.departs.demarrer(self._notifier_departs)
+
+    async def fermer(self):
+        if self.notifier_congestion in self.decision_engine.observateurs_congestion:
+            self.decision_engine.observateurs_congestion.remove(self.notifier_congestion)
+        await self.departs.fermer()
+        if self._tache is not None:
+            self._tache.cancel()
+            try:
+                await self._tache
+            except asyncio.CancelledError:
+                pass
+            self._tache = None
+
+    async def _boucle(self):
+        """Attend les événements, avec une revalidation complète à intervalle régulier"""
+        intervalle = self.settings.ABONNEMENT_INTERVALLE_S
+        prochaine = time.monotonic() + intervalle
+        while True:
+            # Événements signalés pendant la revalidation précédente (congestion
+            # appliquée par celle-ci): traités sans attendre. wait_for sur un
+            # événement déjà levé avalerait une annulation concurrente (Python 3.11)
+            if not self._reveil.is_set():
+                try:
+                    await asyncio.wait_for(self._reveil.wait(), timeout=max(prochaine - time.monotonic(), 0))
+                except asyncio.TimeoutError:
+                    pass
+            else:
+                await asyncio.sleep(0)
+            self._reveil.clear()
+
+            periodique = time.monotonic() >= prochaine
+            if periodique:
+                prochaine = time.monotonic() + intervalle
+            cles = self._a_revalider(periodique)
+            if not cles:
+                continue
+            try:
+                await self.revalider(cles)
+            except Exception as e:
+                logger.error(f"Erreur revalidation des abonnements: {e}", exc_info=True)
+
+    def _a_revalider(self, periodique: bool) -> List[CleAbonnement]:
+        nouveaux, self._nouveaux = self._nouveaux, set()
+        modifiees, self._modifiees = self._modifiees, set()
+        if periodique:
+            return list(self._abonnements)
+        cles = self.index.concernes(modifiees)
+        cles.update(nouveaux)
+        return [cle for cle in cles if cle in self._abonnements]
+
+    async def revalider(self, cles: Iterable[CleAbonnement]):
+        """Relit les entrées des abonnements et pousse les orientations qui ont changé"""
+        groupes: Dict[str, List[CleAbonnement]] = {}
+        for cle in cles:
+            groupes.setdefault(cle[0], []).append(cle)
+        if not groupes:
+            return
+        ids_bagage = [cle[1] for membres in groupes.values() for cle in membres]
+
+        meteo_data, bagages, vols = await asyncio.gather(
+            charger_meteo(self.settings, self.meteo_client),
+            self.bagage_client.get_bagages_status(
+                ids_bagage,
+                concurrence_max=self.settings.BATCH_CONCURRENCE_BAGAGES,
+                delai_s=self.settings.TIMEOUT_BAGAGE_S
+            ),
+            asyncio.gather(*[
+                charger_vol(self.settings, self.vol_client, numero_vol) for numero_vol in groupes
+            ])
+        )
+
+        # Congestion appliquée avant de lire les versions des tables
+        self.decision_engine.appliquer_meteo(meteo_data)
+        contexte = (
+            self.decision_engine.parcours.version,
+            self.decision_engine.attente_controles.version,
+            int(time.time() // 60)  # temps_disponible évolue à la minute
+        )
+
+        for numero_vol, vol_data in vols:
+            for cle in groupes[numero_vol]:
+                abonnement = self._abonnements.get(cle)
+                if abonnement is None:
+                    continue
+                self._mettre_a_jour(abonnement, meteo_data, bagages[cle[1]], vol_data, contexte)
+
+    def _mettre_a_jour(self, abonnement: Abonnement, meteo_data, bagage_data, vol_data, contexte):
+        """Recalcule si les entrées ont changé, envoie si l'orientation a changé"""
+        numero_vol, id_bagage, position = abonnement.cle
+        reponse = None
+        if isinstance(vol_data, HTTPException):
+            abonnement.empreinte = None
+            message = json.dumps({
+                "success": False,
+                "status_code": vol_data.status_code,
+                "detail": vol_data.detail
+            })
+            signature = message
+        else:
+            empreinte = hash((
+                json.dumps([meteo_data, bagage_data, vol_data], sort_keys=True, default=str),
+                contexte
+            ))
+            if empreinte == abonnement.empreinte:
+                return
+            abonnement.empreinte = empreinte
+            self.recalculs += 1
+            try:
+                reponse = calculer_orientation(
+                    self.decision_engine, numero_vol, position, meteo_data, bagage_data, vol_data
+                )
+            except Exception as e:
+                logger.error(f"Erreur orientation abonnement {abonnement.cle}: {e}", exc_info=True)
+                abonnement.empreinte = None
+                message = json.dumps({
+                    "success": False,
+                    "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    "detail": "Erreur lors du calcul de l'orientation"
+                })
+                signature = message
+            else:
+                message = reponse.model_dump_json()
+                signature = reponse.model_dump_json(exclude={"timestamp"})
+                self.index.indexer(
+                    abonnement.cle,
+                    dependances_orientation(self.decision_engine, numero_vol, id_bagage, position, vol_data)
+                )
+                self._planifier_depart(abonnement, reponse, vol_data)
+
+        abonnement.dernier_message = message
+        if signature == abonnement.signature:
+            return
+        abonnement.signature = signature
+        for file in abonnement.files:
+            _publier(file, message)
+            self.envois += 1
+        if reponse is not None and self.journal is not None:
+            self.journal.enregistrer(numero_vol, id_bagage, position, reponse, meteo_data, bagage_data)
+
+    def _planifier_depart(self, abonnement: Abonnement, reponse: OrientationResponse, vol_data):
+        """(Re)planifie la notification de départ vers la porte d'un passager en zone d'attente"""
+        attente = next((i for i in reponse.instructions if i.action == ActionType.ATTENDRE), None)
+        if attente is not None:
+            abonnement.zone_attente = attente.details["zone_id"]
+        elif abonnement.zone_attente is None:
+            return
+        embarquement = next((i for i in reponse.instructions if i.action == ActionType.EMBARQUER), None)
+        heure_depart = DecisionEngine._lire_heure_depart(vol_data)
+        if embarquement is None or heure_depart is None:
+            return
+
+        porte = vol_data.get("porte_actuelle", "A1")
+        marche = self.decision_engine.parcours.temps(abonnement.zone_attente, noeud_porte(porte)) or 0.0
+        delai_s = (
+            (heure_depart - datetime.now(timezone.utc)).total_seconds()
+            - (marche + embarquement.temps_estime) * 60
+        )
+        if delai_s <= 0:
+            # L'orientation courante dirige déjà le passager vers sa porte
+            abonnement.zone_attente = None
+            self.departs.annuler(abonnement.cle)
+            return
+        self.departs.planifier(abonnement.cle, delai_s, (porte, math.ceil(marche)))
+
+    def _notifier_departs(self, lot: List[Echeance]):
+        """Pousse les notifications de départ échues, par lot"""
+        for cle, (porte, marche) in lot:
+            abonnement = self._abonnements.get(cle)
+            if abonnement is None:
+                continue
+            abonnement.zone_attente = None
+            message = json.dumps({
+                "type": "depart_porte",
+                "numero_vol": cle[0],
+                "porte": porte,
+                "temps_marche": marche,
+                "message": f"Il est temps de vous diriger vers la porte {porte} ({marche} min de marche)."
+            })
+            for file in abonnement.files:
+                _publier(file, message)
+            self.notifications += 1
@@ -0,0 +1,114 @@
+import asyncio
+import heapq
+import itertools
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Priorités (la plus petite passe en premier)
+CRITIQUE, ELEVEE, NORMALE = 0, 1, 2
+NOMS_PRIORITE = ("critique", "elevee", "normale")
+
+ADMISE, ATTENTE, REJETEE, EXPIREE, EVINCEE = "admise", "attente", "rejetee", "expiree", "evincee"
+
+
+class Surcharge(Exception):
+    """Requête refusée par le contrôle d'admission (file pleine ou attente trop longue)"""
+
+    def __init__(self, priorite: int, motif: str):
+        super().__init__(f"Surcharge: requête {NOMS_PRIORITE[priorite]} {motif}")
+        self.priorite = priorite
+        self.motif = motif
+
+
+class ControleAdmission:
+    """
+    Contrôle d'admission par priorité.
+
+    Au plus `concurrence_max` requêtes en cours; les suivantes attendent
+    dans une file ordonnée par priorité puis par arrivée, chacune au plus
+    `attente_max_s[priorite]`. File pleine: une requête plus prioritaire que
+    la dernière de la file prend sa place (la dernière est évincée), sinon
+    elle est refusée. Les refus lèvent `Surcharge`: à l'appelant de servir
+    une réponse dégradée ou un 503.
+    """
+
+    def __init__(self, concurrence_max: int, file_max: int, attente_max_s: Sequence[float]):
+        self.concurrence_max = concurrence_max
+        self.file_max = file_max
+        self.attente_max_s = attente_max_s
+        self.en_cours = 0
+        # Tas de (priorité, ordre d'arrivée, future de l'attente)
+        self._file: List[Tuple[int, int, asyncio.Future]] = []
+        self._ordre = itertools.count()
+        # Appelés à chaque décision: (nom de la priorité, ADMISE, ATTENTE, REJETEE...)
+        self.observateurs: List[Callable[[str, str], None]] = []
+
+    def __len__(self) -> int:
+        """Requêtes en file d'attente"""
+        return len(self._file)
+
+    @asynccontextmanager
+    async def admettre(self, priorite: int) -> AsyncIterator[None]:
+        """Occupe une place le temps du bloc (lève `Surcharge` si refusé)"""
+        await self.entrer(priorite)
+        try:
+            yield
+        finally:
+            self.sortir()
+
+    async def entrer(self, priorite: int):
+        if self.en_cours < self.concurrence_max and not self._file:
+            self.en_cours += 1
+            self._notifier(priorite, ADMISE)
+            return
+
+        if len(self._file) >= self.file_max:
+            derniere = max(self._file, default=None)
+            if derniere is None or derniere[0] <= priorite:
+                self._notifier(priorite, REJETEE)
+                raise Surcharge(priorite, "refusée (file pleine)")
+            self._retirer(derniere)
+            derniere[2].set_exception(Surcharge(derniere[0], "évincée par une requête plus prioritaire"))
+            self._notifier(derniere[0], EVINCEE)
+
+        attente = asyncio.get_running_loop().create_future()
+        entree = (priorite, next(self._ordre), attente)
+        heapq.heappush(self._file, entree)
+        try:
+            # La place libérée est transmise directement (voir `sortir`)
+            await asyncio.wait_for(attente, self.attente_max_s[priorite])
+        except asyncio.TimeoutError:
+            self._retirer(entree)
+            self._notifier(priorite, EXPIREE)
+            raise Surcharge(priorite, "hors budget d'attente") from None
+        except asyncio.CancelledError:
+            if attente.done() and not attente.cancelled() and attente.exception() is None:
+                # Place obtenue juste avant l'annulation: on la rend
+                self.sortir()
+            else:
+                self._retirer(entree)
+            raise
+        self._notifier(priorite, ATTENTE)
+
+    def sortir(self):
+        """Libère une place, transmise à la requête en attente la plus prioritaire"""
+        while self._file:
+            _, _, attente = heapq.heappop(self._file)
+            if not attente.done():
+                attente.set_result(None)
+                return
+        self.en_cours -= 1
+
+    def _retirer(self, entree: Tuple[int, int, asyncio.Future]):
+        try:
+            self._file.remove(entree)
+        except ValueError:
+            return
+        heapq.heapify(self._file)
+
+    def _notifier(self, priorite: int, resultat: str):
+        for observateur in self.observateurs:
+            observateur(NOMS_PRIORITE[priorite], resultat)
@@ -0,0 +1,182 @@
+import logging
+import time
+from array import array
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def attente_erlang_c(arrivees_min: float, debit_file_min: float, files: int) -> float:
+    """
+    Attente moyenne en file (minutes) d'un système M/M/c.
+
+    `arrivees_min` passagers/min, `debit_file_min` passagers/min par file,
+    `files` files ouvertes. Infini si le système est saturé.
+    """
+    if arrivees_min <= 0:
+        return 0.0
+    capacite = files * debit_file_min
+    if files <= 0 or arrivees_min >= capacite:
+        return float("inf")
+
+    charge = arrivees_min / debit_file_min
+    # Somme des a^k/k! pour k < c, calculée par récurrence
+    terme = 1.0
+    somme = 1.0
+    for k in range(1, files):
+        terme *= charge / k
+        somme += terme
+    terme_c = terme * charge / files / (1 - arrivees_min / capacite)
+    proba_attente = terme_c / (somme + terme_c)
+    return proba_attente / (capacite - arrivees_min)
+
+
+class _FenetreControle:
+    """Compteurs d'arrivées et de passages d'un contrôle sur une fenêtre glissante"""
+
+    __slots__ = (
+        "arrivees", "passages", "somme_arrivees", "somme_passages",
+        "dernier_seau", "debut", "files", "file_attente"
+    )
+
+    def __init__(self, nb_seaux: int, files: int, maintenant: float):
+        self.arrivees = array("d", bytes(8 * nb_seaux))
+        self.passages = array("d", bytes(8 * nb_seaux))
+        self.somme_arrivees = 0.0
+        self.somme_passages = 0.0
+        self.dernier_seau = -1
+        self.debut = maintenant
+        self.files = files
+        # Passagers en file (arrivées - passages cumulés, ou valeur observée)
+        self.file_attente = 0.0
+
+    def avancer(self, seau: int):
+        """Vide les seaux sortis de la fenêtre (coût amorti O(1))"""
+        nb_seaux = len(self.arrivees)
+        if self.dernier_seau < 0:
+            self.dernier_seau = seau
+            return
+        a_vider = min(seau - self.dernier_seau, nb_seaux)
+        for k in range(1, a_vider + 1):
+            i = (self.dernier_seau + k) % nb_seaux
+            self.somme_arrivees -= self.arrivees[i]
+            self.somme_passages -= self.passages[i]
+            self.arrivees[i] = 0.0
+            self.passages[i] = 0.0
+        if seau > self.dernier_seau:
+            self.dernier_seau = seau
+
+
+class EstimateurAttenteControles:
+    """
+    Estimation en continu du temps d'attente aux contrôles de sécurité.
+
+    Alimenté par les compteurs des contrôles (arrivées et passages scannés par
+    file), il tient des débits sur une fenêtre glissante et en déduit l'attente
+    par un modèle de file M/M/c. Chaque événement coûte O(1) (hors nombre de
+    files); les estimations sont publiées dans un dictionnaire remplacé en bloc,
+    lu sans verrou par le moteur de décision.
+    """
+
+    def __init__(
+        self,
+        fenetre_s: float = 600.0,
+        granularite_s: float = 10.0,
+        debit_file_min: float = 3.0,
+        attente_max_min: float = 120.0,
+        horloge: Callable[[], float] = time.monotonic
+    ):
+        self.fenetre_s = fenetre_s
+        self.granularite_s = granularite_s
+        self.debit_file_min = debit_file_min
+        self.attente_max_min = attente_max_min
+        self._horloge = horloge
+        self._nb_seaux = max(1, int(round(fenetre_s / granularite_s)))
+        self._fenetres: Dict[str, _FenetreControle] = {}
+        # id contrôle -> (attente en minutes, instant du calcul)
+        self.estimations: Dict[str, Tuple[float, float]] = {}
+        self._version = 0
+        # Instant où la plus ancienne estimation en cours sort de la fenêtre
+        self._expiration = float("inf")
+
+    def enregistrer(
+        self,
+        id_controle: str,
+        arrivees: float = 0,
+        passages: float = 0,
+        files_ouvertes: Optional[int] = None,
+        file_attente: Optional[float] = None
+    ) -> float:
+        """Ajoute un relevé d'un contrôle et retourne la nouvelle attente estimée"""
+        maintenant = self._horloge()
+        fenetre = self._fenetres.get(id_controle)
+        if fenetre is None:
+            fenetre = _FenetreControle(self._nb_seaux, files_ouvertes or 1, maintenant)
+            self._fenetres[id_controle] = fenetre
+
+        seau = int(maintenant // self.granularite_s)
+        fenetre.avancer(seau)
+        i = seau % self._nb_seaux
+        fenetre.arrivees[i] += arrivees
+        fenetre.passages[i] += passages
+        fenetre.somme_arrivees += arrivees
+        fenetre.somme_passages += passages
+
+        if files_ouvertes is not None:
+            fenetre.files = max(files_ouvertes, 1)
+        if file_attente is not None:
+            fenetre.file_attente = file_attente
+        else:
+            fenetre.file_attente = max(fenetre.file_attente + arrivees - passages, 0.0)
+
+        attente = self._estimer(fenetre, maintenant)
+        estimations = dict(self.estimations)
+        estimations[id_controle] = (attente, maintenant)
+        # Publication atomique: les lecteurs voient l'ancien ou le nouveau dictionnaire
+        self.estimations = estimations
+        self._version += 1
+        self._expiration = min(self._expiration, maintenant + self.fenetre_s)
+        return attente
+
+    @property
+    def version(self) -> int:
+        """Incrémentée à chaque estimation publiée ou périmée (clé des mémos des lecteurs)"""
+        maintenant = self._horloge()
+        if maintenant > self._expiration:
+            self._version += 1
+            self._expiration = min(
+                (calcule_a + self.fenetre_s for _, calcule_a in self.estimations.values()
+                 if calcule_a + self.fenetre_s >= maintenant),
+                default=float("inf")
+            )
+        return self._version
+
+    def _estimer(self, fenetre: _FenetreControle, maintenant: float) -> float:
+        """Attente (minutes) déduite des débits de la fenêtre"""
+        duree_min = max(min(maintenant - fenetre.debut, self.fenetre_s), self.granularite_s) / 60
+        arrivees_min = max(fenetre.somme_arrivees, 0.0) / duree_min
+
+        # Avec une file formée, le débit observé est le débit de service réel;
+        # sans file, il n'en est qu'un minorant
+        debit_observe = max(fenetre.somme_passages, 0.0) / duree_min / fenetre.files
+        if fenetre.file_attente > 0 and debit_observe > 0:
+            debit_file = debit_observe
+        else:
+            debit_file = max(debit_observe, self.debit_file_min)
+
+        attente = attente_erlang_c(arrivees_min, debit_file, fenetre.files)
+        # File saturée (ou déjà formée): temps d'écoulement de la file présente
+        attente_file = fenetre.file_attente / (debit_file * fenetre.files)
+        if attente == float("inf"):
+            attente = attente_file
+        return min(max(attente, attente_file), self.attente_max_min)
+
+    def attente(self, id_controle: str) -> Optional[float]:
+        """Attente estimée en minutes, None sans relevé récent (lecture sans verrou)"""
+        estimation = self.estimations.get(id_controle)
+        if estimation is None:
+            return None
+        attente, calcule_a = estimation
+        if self._horloge() - calcule_a > self.fenetre_s:
+            return None
+        return attente
@@ -0,0 +1,152 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Generic, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class CacheRevalidation(Generic[T]):
+    """
+    Cache d'une valeur unique avec rafraîchissement single-flight.
+
+    - Valeur fraîche (âge < ttl) : renvoyée directement.
+    - Valeur périmée mais encore acceptable (âge < staleness_max) : renvoyée
+      immédiatement, un seul rafraîchissement est lancé en arrière-plan.
+    - Pas de valeur, ou valeur trop ancienne : les appelants attendent tous
+      le même rafraîchissement. S'il échoue, `obtenir` renvoie None.
+    """
+
+    def __init__(
+        self,
+        ttl_s: float,
+        staleness_max_s: float,
+        horloge: Callable[[], float] = time.monotonic
+    ):
+        self.ttl_s = ttl_s
+        self.staleness_max_s = max(staleness_max_s, ttl_s)
+        self._horloge = horloge
+        self._valeur: Optional[T] = None
+        self._obtenu_a: float = 0.0
+        self._rafraichissement: Optional[asyncio.Task] = None
+        # Incrémentée à chaque nouvelle valeur obtenue
+        self.version = 0
+
+    @property
+    def age(self) -> Optional[float]:
+        """Âge de la valeur en cache (None si vide)"""
+        if self._valeur is None:
+            return None
+        return self._horloge() - self._obtenu_a
+
+    async def obtenir(self, charger: Callable[[], Awaitable[T]]) -> Optional[T]:
+        """Retourne la valeur en cache, en la rafraîchissant si nécessaire"""
+        age = self.age
+        if age is not None:
+            if age < self.ttl_s:
+                return self._valeur
+            if age < self.staleness_max_s:
+                self._lancer_rafraichissement(charger)
+                return self._valeur
+
+        tache = self._lancer_rafraichissement(charger)
+        try:
+            # shield: l'annulation d'un appelant (délai dépassé) ne doit pas
+            # annuler le rafraîchissement partagé
+            return await asyncio.shield(tache)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            return None
+
+    def invalider(self):
+        """Oublie la valeur en cache"""
+        self._valeur = None
+
+    def _lancer_rafraichissement(self, charger: Callable[[], Awaitable[T]]) -> asyncio.Task:
+        if self._rafraichissement is None or self._rafraichissement.done():
+            self._rafraichissement = asyncio.create_task(self._rafraichir(charger))
+            self._rafraichissement.add_done_callback(consommer_exception)
+        return self._rafraichissement
+
+    async def _rafraichir(self, charger: Callable[[], Awaitable[T]]) -> T:
+        valeur = await charger()
+        self._valeur = valeur
+        self._obtenu_a = self._horloge()
+        self.version += 1
+        return valeur
+
+
+def consommer_exception(tache: asyncio.Task):
+    """Évite les avertissements 'exception never retrieved' des rafraîchissements en arrière-plan"""
+    if not tache.cancelled() and tache.exception() is not None:
+        logger.debug(f"Rafraîchissement du cache en échec: {tache.exception()}")
+
+
+class CacheLRU(Generic[T]):
+    """Cache borné (LRU) avec durée de vie par entrée et compteurs de hits/misses"""
+
+    def __init__(
+        self,
+        taille_max: int,
+        ttl_s: float,
+        horloge: Callable[[], float] = time.monotonic
+    ):
+        self.taille_max = taille_max
+        self.ttl_s = ttl_s
+        self._horloge = horloge
+        self._entrees: "OrderedDict[str, Tuple[float, T]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entrees)
+
+    def get(self, cle: str) -> Optional[T]:
+        """Retourne la valeur si présente et non expirée"""
+        entree = self._entrees.get(cle)
+        if entree is None:
+            self.misses += 1
+            return None
+        expire_a, valeur = entree
+        if self._horloge() >= expire_a:
+            del self._entrees[cle]
+            self.misses += 1
+            return None
+        self._entrees.move_to_end(cle)
+        self.hits += 1
+        return valeur
+
+    def set(self, cle: str, valeur: T):
+        """Ajoute ou remplace une entrée, en évinçant la moins récemment utilisée"""
+        self._entrees[cle] = (self._horloge() + self.ttl_s, valeur)
+        self._entrees.move_to_end(cle)
+        while len(self._entrees) > self.taille_max:
+            self._entrees.popitem(last=False)
+
+    def invalider(self, cle: str) -> bool:
+        """Supprime une entrée; retourne True si elle existait"""
+        if self._entrees.pop(cle, None) is None:
+            return False
+        self.invalidations += 1
+        return True
+
+    def vider(self):
+        """Supprime toutes les entrées"""
+        self._entrees.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Compteurs d'utilisation du cache"""
+        total = self.hits + self.misses
+        return {
+            "taille": len(self._entrees),
+            "taille_max": self.taille_max,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "taux_hit": round(self.hits / total, 4) if total else 0.0
+        }
@@ -0,0 +1,55 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Generic, Hashable, List, TypeVar
+
+from .cache import consommer_exception
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CALCUL, PARTAGE = "calcul", "partage"
+
+
+class Coalescence(Generic[T]):
+    """
+    Regroupement des requêtes identiques simultanées.
+
+    Tant qu'un calcul est en cours pour une clé, les requêtes suivantes de
+    même clé attendent son résultat (ou son exception) au lieu de le refaire.
+    Le calcul est protégé (shield): un client qui abandonne n'annule pas le
+    résultat attendu par les autres. Rien n'est gardé une fois le calcul
+    terminé: ce n'est pas un cache.
+    """
+
+    def __init__(self, nom: str):
+        self.nom = nom
+        self._en_cours: Dict[Hashable, asyncio.Task] = {}
+        self.calculs = 0
+        self.partages = 0
+        # Appelés à chaque requête: (nom, CALCUL ou PARTAGE)
+        self.observateurs: List[Callable[[str, str], None]] = []
+
+    def __len__(self) -> int:
+        return len(self._en_cours)
+
+    async def executer(self, cle: Hashable, calcul: Callable[[], Awaitable[T]]) -> T:
+        """Résultat de `calcul()`, partagé avec les requêtes de même clé déjà en cours"""
+        tache = self._en_cours.get(cle)
+        if tache is None:
+            tache = asyncio.create_task(calcul())
+            self._en_cours[cle] = tache
+            tache.add_done_callback(lambda t: self._terminer(cle, t))
+            tache.add_done_callback(consommer_exception)
+            self.calculs += 1
+            resultat = CALCUL
+        else:
+            self.partages += 1
+            resultat = PARTAGE
+        for observateur in self.observateurs:
+            observateur(self.nom, resultat)
+        return await asyncio.shield(tache)
+
+    def _terminer(self, cle: Hashable, tache: asyncio.Task):
+        if self._en_cours.get(cle) is tache:
+            del self._en_cours[cle]
@@ -1,30 +1,132 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from functools import lru_cache
+from typing import List, Optional
 
 class Settings(BaseSettings):
     SERVICE_NAME: str = "orientation-service"
     VERSION: str = "1.0.0"
     DEBUG: bool = False
+    LOG_LEVEL: str = "INFO"  # DEBUG pour tracer chaque orientation calculée
     
     # URLs des services externes
     METEO_SERVICE_URL: str = "http://meteo-service:8000"
     BAGAGE_SERVICE_URL: str = "http://bagage-service:8000"
     VOL_SERVICE_URL: str = "http://vol-service:8000"
+
+    # Délais des appels amont (en secondes)
+    BUDGET_ORIENTATION_S: float = 2.5  # Budget total de la collecte des données
+    TIMEOUT_METEO_S: float = 1.0
+    TIMEOUT_BAGAGE_S: float = 1.5
+    TIMEOUT_VOL_S: float = 2.0
+
+    # Pool de connexions HTTP vers les services amont
+    HTTP_TIMEOUT_S: float = 10.0
+    HTTP_CONNECT_TIMEOUT_S: float = 2.0
+    HTTP_MAX_CONNEXIONS: int = 200
+    HTTP_MAX_KEEPALIVE: int = 50
+    HTTP_KEEPALIVE_EXPIRY_S: float = 30.0
+    HTTP2_ACTIVE: bool = False  # Nécessite httpx[http2]
+
+    # Disjoncteurs des services amont (échec = erreur, 5xx ou appel trop lent)
+    DISJONCTEUR_FENETRE: int = 20  # Derniers appels observés
+    DISJONCTEUR_APPELS_MIN: int = 10  # Appels observés avant de pouvoir s'ouvrir
+    DISJONCTEUR_TAUX_ECHEC: float = 0.5
+    DISJONCTEUR_LATENCE_MAX_S: float = 1.0
+    DISJONCTEUR_OUVERTURE_S: float = 15.0  # Durée d'ouverture avant les appels d'essai
+    DISJONCTEUR_ESSAIS: int = 1  # Appels d'essai simultanés en demi-ouvert
+
+    # Dernières réponses valides par bagage/vol, servies pendant une panne
+    DERNIERS_BONS_TAILLE_MAX: int = 20000
+    DERNIERS_BONS_TTL_S: float = 3600.0
+
+    # Cache du résumé météo (identique pour tous les passagers)
+    METEO_CACHE_TTL_S: float = 30.0
+    METEO_STALENESS_MAX_S: float = 600.0  # Ancienneté max servie si la météo est indisponible
+    METEO_DERNIER_BON_MAX_S: float = 1800.0  # Au-delà, le dernier résumé connu cède la place au résumé neutre
+
+    # Cache des informations de vol (invalidé par les événements porte/retard)
+    VOL_CACHE_TAILLE_MAX: int = 2000
+    VOL_CACHE_TTL_S: float = 60.0
+
+    # Cache local des statuts bagage (0 = désactivé, invalidé par les événements bagage)
+    BAGAGE_CACHE_TAILLE_MAX: int = 5000
+    BAGAGE_CACHE_TTL_S: float = 5.0
+
+    # Cache partagé entre workers et réplicas (Redis, derrière les caches
+    # locaux); None = désactivé. Une panne Redis ne fait que des misses.
+    CACHE_PARTAGE_URL: Optional[str] = None
+    CACHE_PARTAGE_TIMEOUT_S: float = 0.1
+    CACHE_PARTAGE_TTL_METEO_S: float = 15.0
+    CACHE_PARTAGE_TTL_VOL_S: float = 60.0
+    CACHE_PARTAGE_TTL_BAGAGE_S: float = 10.0
+
+    # Orientation par lot
+    BATCH_TAILLE_MAX: int = 500
+    BATCH_CONCURRENCE_BAGAGES: int = 20
+    
+    # Abonnements temps réel (WebSocket)
+    ABONNEMENT_INTERVALLE_S: float = 15.0  # Revalidation périodique des abonnements
+    ABONNEMENT_FILE_MAX: int = 8  # Messages en attente par client (les plus anciens sont remplacés)
+    # Roue temporelle des notifications de départ vers la porte (JITB):
+    # horizon JITB_CASES**JITB_NIVEAUX ticks (64**4 s ≈ 194 jours)
+    JITB_GRANULARITE_S: float = 1.0
+    JITB_CASES: int = 64
+    JITB_NIVEAUX: int = 4
+    
+    # Contrôle d'admission des orientations (afflux lors des irrégularités):
+    # places de calcul, file d'attente et budget d'attente par priorité
+    ADMISSION_CONCURRENCE_MAX: int = 64
+    ADMISSION_FILE_MAX: int = 256
+    ADMISSION_ATTENTE_MAX_S: dict = {"critique": 2.0, "elevee": 0.5, "normale": 0.1}
+    ADMISSION_RETRY_AFTER_S: int = 5  # Retry-After des 503, max-age des réponses dégradées
+
+    # Cache HTTP des orientations (ETag + Cache-Control: max-age selon l'urgence)
+    CACHE_HTTP_MAX_AGE_S: dict = {"critique": 5, "eleve": 15, "moyen": 30, "faible": 60}
+    CACHE_HTTP_MAX_AGE_LONG_S: int = 300  # Passagers ayant plusieurs heures devant eux
+    CACHE_HTTP_LONG_MIN: int = 180  # Temps disponible (min) à partir duquel il s'applique
+    
+    # Journal des orientations (écriture groupée en base, hors requête)
+    JOURNAL_ACTIF: bool = True
+    JOURNAL_FILE_MAX: int = 20000  # Orientations en attente; au-delà elles sont abandonnées
+    JOURNAL_LOT_MAX: int = 500  # Lignes par insertion
+    JOURNAL_DELAI_S: float = 1.0  # Attente max d'une orientation avant écriture
+    JOURNAL_ARRET_DELAI_S: float = 10.0  # Vidange de la file à l'arrêt
     
     # Configuration aéroport
     AIRPORT_CODE: str = "CDG"
-    ZONES: dict = {
-        "A": {"portes": ["A1", "A2", "A3", "A4", "A5"], "capacite": 500},
-        "B": {"portes": ["B1", "B2", "B3", "B4"], "capacite": 400},
-        "C": {"portes": ["C1", "C2", "C3", "C4", "C5", "C6"], "capacite": 600},
-        "F": {"portes": ["F10", "F11", "F12"], "capacite": 300},
-        "G": {"portes": ["G20", "G21", "G22", "G23", "G24"], "capacite": 550}
-    }
+    # Plan de l'aéroport (zones, portes, contrôles, zones d'attente), rechargeable
+    # à chaud; par défaut celui livré avec le service (data/topologie.json)
+    TOPOLOGIE_FICHIER: Optional[str] = None
     
     # Seuils de temps
     TEMPS_CRITIQUE_MIN: int = 30
     TEMPS_URGENT_MIN: int = 60
     TEMPS_NORMAL_MIN: int = 90
+
+    # Ralentissement des couloirs dans les secteurs congestionnés (météo)
+    CONGESTION_FACTEUR_MARCHE: float = 1.5
+
+    # Estimation en continu de l'attente aux contrôles de sécurité
+    ATTENTE_FENETRE_S: float = 600.0  # Fenêtre glissante des débits
+    ATTENTE_GRANULARITE_S: float = 10.0
+    ATTENTE_DEBIT_FILE_MIN: float = 3.0  # Passagers/min par file ouverte (nominal)
+    ATTENTE_MAX_MIN: float = 120.0
+
+    # Occupation des zones (tableau de bord densité): un passager compte dans la
+    # zone de sa dernière observation pendant OCCUPATION_FENETRE_S
+    OCCUPATION_FENETRE_S: float = 900.0
+    OCCUPATION_GRANULARITE_S: float = 30.0
+
+    # Alertes prédictives de saturation (lissage de Holt à tendance amortie)
+    PREVISION_PAS_S: float = 60.0
+    PREVISION_HORIZONS_MIN: List[float] = [15, 30, 45, 60]
+    PREVISION_ALPHA: float = 0.5  # Lissage du niveau
+    PREVISION_BETA: float = 0.2  # Lissage de la tendance
+    PREVISION_AMORTISSEMENT: float = 0.98
+    PREVISION_SEUIL: float = 1.0  # Alerte au-delà de SEUIL x capacité
+
+    # Nombre max d'analyses de vol mémoïsées par le moteur de décision
+    ANALYSE_VOL_CACHE_MAX: int = 4096
     
     # JWT et sécurité (si nécessaire)
     SECRET_KEY: str = "your-secret-key-here"
@@ -1,28 +1,86 @@
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Callable, Dict, Any, List, Optional, Set, Tuple
+from collections import OrderedDict
 import logging
+import math
 
 from datetime import datetime, timezone # Import timezone
 from ..core.config import Settings
-
-from datetime import datetime, timezone
-from typing import Dict, Any
+from .attente_controles import EstimateurAttenteControles
+from .table_decision import STATUTS_BAGAGE_PROBLEME, TableDecision
+from .path_optimizer import (
+    OptimiseurParcours,
+    construire_graphe_terminal,
+    noeud_controle,
+    noeud_porte,
+    noeud_zone
+)
+from .topologie import FICHIER_DEFAUT, Topologie
 
 logger = logging.getLogger(__name__)
 
 class DecisionEngine:
     """Moteur de décision pour l'orientation des passagers"""
     
-    def __init__(self, settings: Settings):
+    def __init__(self, settings: Settings, topologie: Optional[Topologie] = None):
         self.settings = settings
-        self.zones = settings.ZONES
-        
-        # Configuration des contrôles de sécurité
-        self.controles_securite = {
-            "A": {"temps_moyen": 15, "position": "Terminal 1 - Aile Est", "zone_desservie": ["A", "B"]},
-            "B": {"temps_moyen": 20, "position": "Terminal 1 - Centre", "zone_desservie": ["B", "C"]},
-            "C": {"temps_moyen": 10, "position": "Terminal 2 - Ouest", "zone_desservie": ["C", "F", "G"]}
-        }
-    
+
+        # Attente en direct aux contrôles, alimentée par leurs compteurs
+        # (temps_moyen de la topologie par défaut, en l'absence de relevés récents)
+        self.attente_controles = EstimateurAttenteControles(
+            fenetre_s=settings.ATTENTE_FENETRE_S,
+            granularite_s=settings.ATTENTE_GRANULARITE_S,
+            debit_file_min=settings.ATTENTE_DEBIT_FILE_MIN,
+            attente_max_min=settings.ATTENTE_MAX_MIN
+        )
+
+        # Analyses au niveau du vol, partagées par tous ses passagers
+        self._analyses_vol: "OrderedDict[Tuple, Dict[str, Any]]" = OrderedDict()
+        self._analyses_vol_max = settings.ANALYSE_VOL_CACHE_MAX
+
+        # Appelés avec les zones dont la congestion météo vient de changer
+        self.observateurs_congestion: List[Callable[[Set[str]], None]] = []
+
+        self.topologie: Optional[Topologie] = None
+        self.parcours: Optional[OptimiseurParcours] = None
+        self.appliquer_topologie(topologie or Topologie.depuis_fichier(settings.TOPOLOGIE_FICHIER or FICHIER_DEFAUT))
+
+    def appliquer_topologie(self, topologie: Topologie):
+        """
+        Bascule sur une nouvelle topologie (rechargement à chaud).
+
+        Graphe, tables de routage et table de décision sont construits avant
+        d'être publiés ensemble, sans point d'attente entre les affectations:
+        une requête voit l'ancien plan ou le nouveau, jamais un mélange.
+        """
+        parcours = OptimiseurParcours(construire_graphe_terminal(topologie))
+        # Règles d'orientation compilées (chemin rapide de calculer_orientation)
+        table = TableDecision(self, topologie)
+        if self.parcours is not None:
+            # Version strictement croissante: les caches qui en dépendent sont invalidés
+            parcours.version = self.parcours.version + 1
+            logger.info(f"Topologie {self.topologie.version} remplacée par {topologie.version}")
+        self.topologie, self.parcours, self.table = topologie, parcours, table
+
+    @property
+    def zones(self) -> Dict[str, Dict[str, Any]]:
+        return self.topologie.zones
+
+    @property
+    def controles_securite(self) -> Dict[str, Dict[str, Any]]:
+        return self.topologie.controles_securite
+
+    @property
+    def zones_attente(self) -> Dict[str, Dict[str, str]]:
+        return self.topologie.zones_attente
+
+    def appliquer_meteo(self, meteo_data: Dict[str, Any]):
+        """Répercute les secteurs congestionnés de la météo sur les temps de marche"""
+        secteurs = meteo_data.get("impact", {}).get("secteurs_congestionnes") or []
+        zones = self.parcours.appliquer_congestion(secteurs, self.settings.CONGESTION_FACTEUR_MARCHE)
+        if zones:
+            for observateur in list(self.observateurs_congestion):
+                observateur(zones)
+
     def analyser_situation(
         self, 
         meteo_data: Dict[str, Any],
@@ -31,73 +89,141 @@ class DecisionEngine:
     ) -> Dict[str, Any]:
         """Analyse la situation globale du passager"""
         
+        # Partie commune au vol (mémoïsée), puis partie propre au passager
+        analyse_vol = self.analyser_vol(meteo_data, vol_data)
+        
         situation = {
             "type_trajet": "normal",
             "niveau_urgence": "faible",
             "probleme_bagage": False,
-            "perturbation_meteo": False,
-            "changement_porte": False,
+            "perturbation_meteo": analyse_vol["perturbation_meteo"],
+            "changement_porte": analyse_vol["changement_porte"],
             "temps_disponible": 0,
-            "recommandations": []
+            "recommandations": list(analyse_vol["recommandations"])
         }
         
         # Analyse du bagage
         statut_bagage = bagage_data.get("statut", "ENREGISTRE")
-        if statut_bagage in ["MAL_ACHEMINE", "EN_VERIFICATION"]:
+        if statut_bagage in STATUTS_BAGAGE_PROBLEME:
             situation["probleme_bagage"] = True
-            situation["niveau_urgence"] = "eleve"
             situation["type_trajet"] = "probleme_bagage"
             logger.warning(f"Problème bagage détecté: {statut_bagage}")
         
+        # Calcul du temps disponible
+        situation["temps_disponible"] = self._minutes_avant(analyse_vol["heure_depart"])
+        
+        situation["niveau_urgence"] = self.niveau_urgence(
+            situation["probleme_bagage"],
+            analyse_vol["niveau_alerte_meteo"],
+            situation["temps_disponible"]
+        )
+        
+        logger.debug(
+            "Situation analysée: %s - %smin disponibles", situation["niveau_urgence"], situation["temps_disponible"]
+        )
+        
+        return situation
+
+    def niveau_urgence(
+        self,
+        probleme_bagage: bool,
+        niveau_alerte_meteo: str,
+        temps_disponible: int
+    ) -> str:
+        """Escalade de l'urgence: bagage, puis météo, puis temps disponible"""
+        niveau = "eleve" if probleme_bagage else "faible"
+        
         # Analyse météo
-        niveau_alerte_meteo = meteo_data.get("niveau_alerte", "faible")
         if niveau_alerte_meteo != "faible":
-            situation["perturbation_meteo"] = True
             if niveau_alerte_meteo == "critique":
-                situation["niveau_urgence"] = "critique"
-            elif situation["niveau_urgence"] == "faible":
-                situation["niveau_urgence"] = "moyen"
+                niveau = "critique"
+            elif niveau == "faible":
+                niveau = "moyen"
+        
+        # Réévaluation de l'urgence basée sur le temps
+        if temps_disponible < self.settings.TEMPS_CRITIQUE_MIN:
+            niveau = "critique"
+        elif temps_disponible < self.settings.TEMPS_URGENT_MIN:
+            if niveau == "faible":
+                niveau = "eleve"
+        return niveau
+
+    def analyser_vol(
+        self,
+        meteo_data: Dict[str, Any],
+        vol_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Analyse la partie de la situation qui ne dépend que du vol et de la météo.
+
+        Le résultat est mémoïsé par vol et par version des données (porte,
+        horaire, niveau d'alerte météo): il est recalculé dès qu'une de ces
+        entrées change. Ne pas modifier le dictionnaire retourné.
+        """
+        niveau_alerte_meteo = meteo_data.get("niveau_alerte", "faible")
+        cle = (
+            vol_data.get("numero"),
+            vol_data.get("porte_originale"),
+            vol_data.get("porte_actuelle"),
+            vol_data.get("heure_depart"),
+            niveau_alerte_meteo
+        )
+        analyse = self._analyses_vol.get(cle)
+        if analyse is not None:
+            self._analyses_vol.move_to_end(cle)
+            return analyse
+        
+        analyse = {
+            "perturbation_meteo": niveau_alerte_meteo != "faible",
+            "niveau_alerte_meteo": niveau_alerte_meteo,
+            "changement_porte": False,
+            "recommandations": [],
+            "heure_depart": self._lire_heure_depart(vol_data)
+        }
         
         # Changement de porte
         porte_originale = vol_data.get("porte_originale")
         porte_actuelle = vol_data.get("porte_actuelle")
         if porte_originale and porte_actuelle and porte_originale != porte_actuelle:
-            situation["changement_porte"] = True
-            situation["recommandations"].append(
+            analyse["changement_porte"] = True
+            analyse["recommandations"].append(
                 f"Attention: Changement de porte {porte_originale} → {porte_actuelle}"
             )
         
-        # Calcul du temps disponible
-        situation["temps_disponible"] = self._calculer_temps_disponible(vol_data)
-        
-        # Réévaluation de l'urgence basée sur le temps
-        if situation["temps_disponible"] < self.settings.TEMPS_CRITIQUE_MIN:
-            situation["niveau_urgence"] = "critique"
-        elif situation["temps_disponible"] < self.settings.TEMPS_URGENT_MIN:
-            if situation["niveau_urgence"] == "faible":
-                situation["niveau_urgence"] = "eleve"
-        
-        logger.info(f"Situation analysée: {situation['niveau_urgence']} - {situation['temps_disponible']}min disponibles")
-        
-        return situation
+        self._analyses_vol[cle] = analyse
+        if len(self._analyses_vol) > self._analyses_vol_max:
+            self._analyses_vol.popitem(last=False)
+        return analyse
     
 
     def _calculer_temps_disponible(self, vol_data: Dict[str, Any]) -> int:
         """Calcule le temps disponible jusqu'au départ en minutes"""
+        return self._minutes_avant(self._lire_heure_depart(vol_data))
+
+    @staticmethod
+    def _lire_heure_depart(vol_data: Dict[str, Any]) -> Optional[datetime]:
+        """Lit l'heure de départ du vol (datetime aware, None si absente ou invalide)"""
         heure_depart_str = vol_data.get("heure_depart")
         if not heure_depart_str:
-            return 90  # Défaut si pas de date fournie
+            return None
 
         # Conversion en datetime aware
         try:
             heure_depart = datetime.fromisoformat(heure_depart_str)
         except ValueError:
             # si le format n'est pas correct
-            return 90
+            return None
 
         # Si naive, on considère UTC
         if heure_depart.tzinfo is None:
             heure_depart = heure_depart.replace(tzinfo=timezone.utc)
+        return heure_depart
+
+    @staticmethod
+    def _minutes_avant(heure_depart: Optional[datetime]) -> int:
+        """Minutes restantes avant le départ"""
+        if heure_depart is None:
+            return 90  # Défaut si pas de date fournie
 
         maintenant = datetime.now(timezone.utc)  # datetime aware en UTC
         temps_disponible = int((heure_depart - maintenant).total_seconds() / 60)
@@ -113,21 +239,8 @@ class DecisionEngine:
     ) -> Dict[str, Any]:
         """Choisit le meilleur contrôle de sécurité"""
         
-        porte = vol_data.get("porte_actuelle", "A1")
-        zone_porte = porte[0]  # Première lettre = zone
-        
-        # Trouver les contrôles qui desservent cette zone
-        controles_possibles = []
-        for id_controle, info in self.controles_securite.items():
-            if zone_porte in info["zone_desservie"]:
-                controles_possibles.append((id_controle, info))
-        
-        # Si aucun contrôle trouvé, prendre le plus proche
-        if not controles_possibles:
-            controles_possibles = list(self.controles_securite.items())
-        
-        # Trier par temps d'attente
-        controles_possibles.sort(key=lambda x: x[1]["temps_moyen"])
+        zone_porte = self.topologie.zone_porte(vol_data.get("porte_actuelle", "A1"))
+        controles_possibles = self._controles_pour_zone(zone_porte)
         
         meilleur_id, meilleur_info = controles_possibles[0]
         
@@ -135,16 +248,30 @@ class DecisionEngine:
         if situation["niveau_urgence"] == "critique":
             conseil = "⚡ Dirigez-vous rapidement vers ce contrôle."
         elif len(controles_possibles) > 1:
-            alt_id, alt_info = controles_possibles[1]
-            conseil = f"Alternative: Contrôle {alt_id} ({alt_info['temps_moyen']}min)"
+            alt_id = controles_possibles[1][0]
+            conseil = f"Alternative: Contrôle {alt_id} ({self.temps_attente_controle(alt_id)}min)"
         
         return {
             "id": meilleur_id,
-            "temps_attente": meilleur_info["temps_moyen"],
+            "temps_attente": self.temps_attente_controle(meilleur_id),
             "position": meilleur_info["position"],
             "conseil": conseil,
             "alternative": controles_possibles[1][0] if len(controles_possibles) > 1 else None
         }
+
+    def temps_attente_controle(self, id_controle: str) -> int:
+        """Attente estimée en direct au contrôle (minutes), sinon son temps moyen"""
+        attente = self.attente_controles.attente(id_controle)
+        if attente is None:
+            return self.controles_securite[id_controle]["temps_moyen"]
+        return math.ceil(attente)
+    
+    def _controles_pour_zone(self, zone_porte: str) -> List[Tuple[str, Dict[str, Any]]]:
+        """Contrôles desservant une zone, triés par temps d'attente actuel"""
+        controles_possibles = self.topologie.controles_zone(zone_porte)
+        
+        # Trier par temps d'attente (les estimations évoluent en continu)
+        return sorted(controles_possibles, key=lambda x: self.temps_attente_controle(x[0]))
     
     def generer_parcours_jitb(
         self,
@@ -158,13 +285,27 @@ class DecisionEngine:
         ordre = 1
         
         porte = vol_data.get("porte_actuelle", "A1")
-        zone = porte[0]
+        cible = noeud_porte(porte)
+        zone = self.topologie.zone_porte(porte)
         temps_restant = situation["temps_disponible"]
+        # Marge d'arrivée à la porte avant le départ
+        marge_porte = 15 if situation["niveau_urgence"] == "critique" else 20
+        
+        # Point de départ du passager dans le graphe du terminal
+        courant = {
+            None: "entree",
+            "entree": "entree",
+            "zone_embarquement": noeud_zone(zone),
+            "porte": cible
+        }.get(position)
         
         # Étape 1: Position actuelle → Sécurité
         if position not in ["zone_embarquement", "porte"]:
             controle = self.choisir_meilleur_controle(situation, vol_data)
-            temps_securite = controle["temps_attente"] + 5
+            noeud = noeud_controle(controle["id"])
+            # Passager déjà au contrôle ("securite"): pas de marche
+            marche = self._marche(courant, noeud, defaut=5) if courant else 0
+            temps_securite = controle["temps_attente"] + marche
             
             etapes.append({
                 "ordre": ordre,
@@ -172,37 +313,51 @@ class DecisionEngine:
                 "description": f"Passez le contrôle ({controle['temps_attente']}min d'attente)",
                 "zone": f"Sécurité-{controle['id']}",
                 "temps_estime": temps_securite,
-                "statut": "en_attente"
+                "statut": "en_attente",
+                "coordonnees": self.parcours.coordonnees(noeud)
             })
             ordre += 1
             temps_restant -= temps_securite
+            courant = noeud
         
         # Étape 2: Just-In-Time - Zone d'attente ou direct à la porte
         if temps_restant > 45 and situation["niveau_urgence"] != "critique":
             # Temps de se détendre
             zone_attente = self._trouver_zone_attente_optimale(zone, situation)
+            # Garder le temps de marche jusqu'à la porte, plus la marge d'arrivée
+            marche = self._marche(courant, zone_attente["id"], defaut=0)
+            marche_porte = self._marche(zone_attente["id"], cible, defaut=0)
             etapes.append({
                 "ordre": ordre,
                 "nom": f"Zone d'Attente - {zone_attente['nom']}",
                 "description": zone_attente["description"],
                 "zone": zone_attente["id"],
-                "temps_estime": temps_restant - 20,  # Garder 20min pour aller à la porte
-                "statut": "en_attente"
+                "temps_estime": temps_restant - marche - marche_porte - marge_porte,
+                "statut": "en_attente",
+                "coordonnees": self.parcours.coordonnees(zone_attente["id"])
             })
             ordre += 1
+            courant = zone_attente["id"]
         
         # Étape 3: Porte d'embarquement
-        temps_vers_porte = 15 if situation["niveau_urgence"] == "critique" else 20
         etapes.append({
             "ordre": ordre,
             "nom": f"Porte {porte}",
-            "description": f"Embarquement prévu - Arrivée {temps_vers_porte}min avant",
+            "description": f"Embarquement prévu - Arrivée {marge_porte}min avant",
             "zone": zone,
-            "temps_estime": temps_vers_porte,
-            "statut": "en_attente"
+            "temps_estime": self._marche(courant, cible, defaut=marge_porte),
+            "statut": "en_attente",
+            "coordonnees": self.parcours.coordonnees(cible)
         })
         
         return etapes
+
+    def _marche(self, depart: Optional[str], arrivee: str, defaut: int) -> int:
+        """Temps de marche arrondi à la minute supérieure (défaut si hors du graphe)"""
+        if depart is None:
+            return defaut
+        temps = self.parcours.temps(depart, arrivee)
+        return defaut if temps is None else math.ceil(temps)
     
     def _trouver_zone_attente_optimale(
         self,
@@ -210,14 +365,4 @@ class DecisionEngine:
         situation: Dict[str, Any]
     ) -> Dict[str, str]:
         """Trouve la meilleure zone d'attente"""
-        
-        # Zones d'attente par proximité de porte
-        zones_attente = {
-            "A": {"id": "lounge-a", "nom": "Salon Business A", "description": "Profitez du salon avec vue sur les pistes"},
-            "B": {"id": "commerces-b", "nom": "Galerie Commerciale B", "description": "Restaurants et boutiques à proximité"},
-            "C": {"id": "lounge-c", "nom": "Zone de Repos C", "description": "Espace calme avec sièges confortables"},
-            "F": {"id": "cafe-f", "nom": "Café Panorama F", "description": "Prenez un café avec vue panoramique"},
-            "G": {"id": "restaurant-g", "nom": "Restaurant Terminal G", "description": "Restauration à proximité de votre porte"}
-        }
-        
-        return zones_attente.get(zone_porte, zones_attente["C"])
+        return self.topologie.zone_attente(zone_porte)
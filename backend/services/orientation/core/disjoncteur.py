@@ -0,0 +1,139 @@
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, List, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+FERME, DEMI_OUVERT, OUVERT = "ferme", "demi_ouvert", "ouvert"
+
+
+class CircuitOuvert(Exception):
+    """Appel refusé sans contacter le service amont (disjoncteur ouvert)"""
+
+    def __init__(self, nom: str):
+        super().__init__(f"Disjoncteur {nom} ouvert")
+        self.nom = nom
+
+
+class Disjoncteur:
+    """
+    Disjoncteur d'un service amont.
+
+    - Fermé: les appels passent; sur les `fenetre` derniers appels, si au
+      moins `appels_min` ont eu lieu et que la part d'échecs (erreurs ou
+      appels plus lents que `latence_max_s`) atteint `taux_echec`, il s'ouvre.
+    - Ouvert: les appels échouent immédiatement (`CircuitOuvert`) pendant
+      `duree_ouverture_s`.
+    - Demi-ouvert: `essais` appels sont laissés passer; un succès referme le
+      disjoncteur, un échec le rouvre.
+    """
+
+    def __init__(
+        self,
+        nom: str,
+        fenetre: int = 20,
+        appels_min: int = 10,
+        taux_echec: float = 0.5,
+        latence_max_s: float = 1.0,
+        duree_ouverture_s: float = 15.0,
+        essais: int = 1,
+        horloge: Callable[[], float] = time.monotonic
+    ):
+        self.nom = nom
+        self.appels_min = appels_min
+        self.taux_echec = taux_echec
+        self.latence_max_s = latence_max_s
+        self.duree_ouverture_s = duree_ouverture_s
+        self.essais = essais
+        self._horloge = horloge
+        self._resultats: deque = deque(maxlen=fenetre)  # True = échec
+        self._echecs = 0
+        self.etat = FERME
+        self._ouvert_a = 0.0
+        self._essais_en_cours = 0
+        # Appelés à chaque changement d'état: (nom, nouvel état)
+        self.observateurs: List[Callable[[str, str], None]] = []
+
+    def autoriser(self) -> bool:
+        """True si un appel peut partir vers le service amont"""
+        if self.etat == FERME:
+            return True
+        if self.etat == OUVERT:
+            if self._horloge() - self._ouvert_a < self.duree_ouverture_s:
+                return False
+            self._changer(DEMI_OUVERT)
+        if self._essais_en_cours >= self.essais:
+            return False
+        self._essais_en_cours += 1
+        return True
+
+    def enregistrer(self, echec: bool, latence_s: float = 0.0):
+        """Résultat d'un appel autorisé"""
+        echec = echec or latence_s > self.latence_max_s
+        if self.etat == DEMI_OUVERT:
+            self._essais_en_cours = max(self._essais_en_cours - 1, 0)
+            if echec:
+                self._ouvrir()
+            else:
+                self._essais_en_cours = 0
+                self._reinitialiser()
+                self._changer(FERME)
+            return
+        if self.etat == OUVERT:
+            # Appel parti avant l'ouverture
+            return
+
+        if len(self._resultats) == self._resultats.maxlen and self._resultats[0]:
+            self._echecs -= 1
+        self._resultats.append(echec)
+        self._echecs += echec
+        if len(self._resultats) >= self.appels_min and self._echecs >= self.taux_echec * len(self._resultats):
+            self._ouvrir()
+
+    async def executer(self, appel: Callable[[], Awaitable[T]]) -> T:
+        """
+        Exécute `appel` sous la protection du disjoncteur.
+
+        Toute exception compte comme un échec; une annulation (délai dépassé
+        chez l'appelant) compte comme un échec si elle survient au-delà de
+        `latence_max_s`. Lève `CircuitOuvert` si l'appel est refusé.
+        """
+        if not self.autoriser():
+            raise CircuitOuvert(self.nom)
+        debut = self._horloge()
+        try:
+            resultat = await appel()
+        except BaseException as e:
+            latence = self._horloge() - debut
+            if isinstance(e, Exception) or latence > self.latence_max_s:
+                self.enregistrer(True, latence)
+            else:
+                self._liberer_essai()
+            raise
+        self.enregistrer(False, self._horloge() - debut)
+        return resultat
+
+    def _liberer_essai(self):
+        if self.etat == DEMI_OUVERT:
+            self._essais_en_cours = max(self._essais_en_cours - 1, 0)
+
+    def _ouvrir(self):
+        self._ouvert_a = self._horloge()
+        self._essais_en_cours = 0
+        self._reinitialiser()
+        self._changer(OUVERT)
+
+    def _reinitialiser(self):
+        self._resultats.clear()
+        self._echecs = 0
+
+    def _changer(self, etat: str):
+        if etat == self.etat:
+            return
+        logger.warning(f"Disjoncteur {self.nom}: {self.etat} -> {etat}")
+        self.etat = etat
+        for observateur in self.observateurs:
+            observateur(self.nom, etat)
@@ -0,0 +1,124 @@
+import logging
+from typing import TYPE_CHECKING, Any, Dict, FrozenSet, Hashable, Iterable, List, Optional, Set, Tuple
+
+from .path_optimizer import noeud_controle, noeud_porte, noeud_zone
+
+if TYPE_CHECKING:
+    from .decision_engine import DecisionEngine
+
+logger = logging.getLogger(__name__)
+
+# (type, valeur): ("vol", "AF1234"), ("porte", "G21"), ("zone", "G"), ("controle", "C")...
+Dependance = Tuple[str, str]
+
+VOL, BAGAGE, PORTE, ZONE, CONTROLE = "vol", "bagage", "porte", "zone", "controle"
+
+_PREFIXE_CONTROLE, _PREFIXE_PORTE = noeud_controle(""), noeud_porte("")
+_POSITIONS_SANS_SECURITE = ("zone_embarquement", "porte")
+
+
+class IndexInverse:
+    """
+    Index inverse: dépendance -> clés dont l'orientation courante en dépend.
+
+    Chaque clé (abonnement) est indexée sous les entrées de sa dernière
+    orientation; réindexer une clé ne touche que les dépendances qui ont
+    changé. Un événement (vol, porte, zone, contrôle) donne directement
+    l'ensemble des clés à recalculer, sans parcourir les autres.
+    """
+
+    def __init__(self):
+        self._cles: Dict[Dependance, Set[Hashable]] = {}
+        # Tuples plutôt que frozensets: 4 à 5 fois moins de mémoire par clé
+        self._dependances: Dict[Hashable, Tuple[Dependance, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self._dependances)
+
+    def dependances(self, cle: Hashable) -> FrozenSet[Dependance]:
+        return frozenset(self._dependances.get(cle, ()))
+
+    def indexer(self, cle: Hashable, dependances: Iterable[Dependance]):
+        """Remplace les dépendances de `cle`"""
+        nouvelles = frozenset(dependances)
+        anciennes = frozenset(self._dependances.get(cle, ()))
+        if nouvelles == anciennes:
+            return
+        for dependance in anciennes - nouvelles:
+            self._retirer_de(dependance, cle)
+        for dependance in nouvelles - anciennes:
+            cles = self._cles.get(dependance)
+            if cles is None:
+                cles = self._cles[dependance] = set()
+            cles.add(cle)
+        self._dependances[cle] = tuple(nouvelles)
+
+    def retirer(self, cle: Hashable):
+        for dependance in self._dependances.pop(cle, ()):
+            self._retirer_de(dependance, cle)
+
+    def _retirer_de(self, dependance: Dependance, cle: Hashable):
+        cles = self._cles[dependance]
+        cles.discard(cle)
+        if not cles:
+            del self._cles[dependance]
+
+    def concernes(self, dependances: Iterable[Dependance]) -> Set[Hashable]:
+        """Clés qui dépendent d'au moins une des `dependances`"""
+        concernes: Set[Hashable] = set()
+        for dependance in dependances:
+            cles = self._cles.get(dependance)
+            if cles:
+                concernes |= cles
+        return concernes
+
+    def statistiques(self) -> Dict[str, int]:
+        return {
+            "cles": len(self._dependances),
+            "dependances": len(self._cles),
+            "entrees": sum(len(cles) for cles in self._cles.values())
+        }
+
+
+def dependances_orientation(
+    engine: "DecisionEngine",
+    numero_vol: str,
+    id_bagage: str,
+    position: Optional[str],
+    vol_data: Dict[str, Any]
+) -> Set[Dependance]:
+    """
+    Entrées dont dépend l'orientation d'un passager: son vol, son bagage, sa
+    porte, les contrôles candidats (le choix dépend de leurs attentes) et les
+    zones traversées depuis chacun d'eux jusqu'à la porte (temps de marche).
+    """
+    porte = vol_data.get("porte_actuelle", "A1")
+    zone = engine.topologie.zone_porte(porte)
+    dependances = {(VOL, numero_vol), (BAGAGE, id_bagage), (PORTE, porte), (ZONE, zone)}
+    if position in _POSITIONS_SANS_SECURITE:
+        departs = [noeud_zone(zone)]
+    else:
+        controles = [id_controle for id_controle, _ in engine.topologie.controles_zone(zone)]
+        dependances.update((CONTROLE, id_controle) for id_controle in controles)
+        departs = [noeud_controle(id_controle) for id_controle in controles]
+    parcours = engine.parcours
+    cible = noeud_porte(porte)
+    for depart in departs:
+        for noeud in parcours.chemin(depart, cible):
+            zone_noeud = parcours.zone(noeud)
+            if zone_noeud is not None:
+                dependances.add((ZONE, zone_noeud))
+    return dependances
+
+
+def dependances_noeud(engine: "DecisionEngine", noeud: str) -> List[Dependance]:
+    """Dépendances touchées par un changement sur un nœud du graphe du terminal"""
+    if noeud.startswith(_PREFIXE_CONTROLE):
+        return [(CONTROLE, noeud[len(_PREFIXE_CONTROLE):])]
+    dependances = []
+    zone = engine.parcours.zone(noeud)
+    if zone is not None:
+        dependances.append((ZONE, zone))
+    if noeud.startswith(_PREFIXE_PORTE):
+        dependances.append((PORTE, noeud[len(_PREFIXE_PORTE):]))
+    return dependances
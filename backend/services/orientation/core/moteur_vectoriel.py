@@ -0,0 +1,212 @@
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .decision_engine import STATUTS_BAGAGE_PROBLEME, DecisionEngine
+from ..utils import generer_alertes, generer_instructions
+
+logger = logging.getLogger(__name__)
+
+# Codes des niveaux d'urgence (ordre croissant de gravité)
+FAIBLE, MOYEN, ELEVE, CRITIQUE = 0, 1, 2, 3
+LIBELLES_URGENCE = ("faible", "moyen", "eleve", "critique")
+NIVEAUX_URGENCE = np.array(LIBELLES_URGENCE)
+
+
+class ManifesteVectoriel:
+    """
+    Évaluation de l'urgence de tous les passagers d'un ensemble de vols.
+
+    Les entrées sont tenues en colonnes NumPy (un rang par passager, un rang
+    par vol) et `temps_disponible`, `niveau_urgence` et les indicateurs bagage
+    et changement de porte sont calculés par opérations sur tableaux, avec les
+    mêmes règles que `DecisionEngine.analyser_situation`. Les instructions et
+    alertes ne sont matérialisées (par le chemin scalaire) que pour les
+    passagers dont la décision a changé depuis l'évaluation précédente.
+    """
+
+    def __init__(
+        self,
+        decision_engine: DecisionEngine,
+        passagers: Sequence[Tuple[str, str, Optional[str]]]
+    ):
+        """`passagers`: (numero_vol, id_bagage, position_estimee) par passager"""
+        self.decision_engine = decision_engine
+        self.passagers = list(passagers)
+        self.numeros_vol: List[str] = sorted({numero_vol for numero_vol, _, _ in self.passagers})
+        index_vol = {numero_vol: k for k, numero_vol in enumerate(self.numeros_vol)}
+        self._index_bagage: Dict[str, List[int]] = {}
+        for i, (_, id_bagage, _) in enumerate(self.passagers):
+            self._index_bagage.setdefault(id_bagage, []).append(i)
+
+        n = len(self.passagers)
+        self.vol = np.fromiter((index_vol[p[0]] for p in self.passagers), dtype=np.int32, count=n)
+        self.probleme_bagage = np.zeros(n, dtype=bool)
+        # Empreinte du statut bagage (repris dans l'instruction bagage)
+        self.statut_bagage = np.zeros(n, dtype=np.int64)
+        self._bagages: List[Dict[str, Any]] = [{} for _ in range(n)]
+
+        # Décision de l'évaluation précédente, pour ne matérialiser que les changements
+        self._etat_precedent: Optional[np.ndarray] = None
+        self._versions_precedentes: Optional[Tuple[int, int]] = None
+        self._meteo_precedente: Optional[Tuple] = None
+
+    def __len__(self) -> int:
+        return len(self.passagers)
+
+    def definir_bagages(self, bagages: Dict[str, Dict[str, Any]]):
+        """Renseigne le statut de tous les bagages (id_bagage -> données bagage)"""
+        for id_bagage, bagage_data in bagages.items():
+            self.mettre_a_jour_bagage(id_bagage, bagage_data)
+
+    def mettre_a_jour_bagage(self, id_bagage: str, bagage_data: Dict[str, Any]):
+        """Met à jour un bagage (événement de statut), en O(1)"""
+        statut = bagage_data.get("statut", "ENREGISTRE")
+        probleme = statut in STATUTS_BAGAGE_PROBLEME
+        empreinte = hash(statut)
+        for i in self._index_bagage.get(id_bagage, ()):
+            self._bagages[i] = bagage_data
+            self.probleme_bagage[i] = probleme
+            self.statut_bagage[i] = empreinte
+
+    def evaluer(
+        self,
+        meteo_data: Dict[str, Any],
+        vols: Dict[str, Dict[str, Any]],
+        maintenant: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """
+        Évalue tous les passagers.
+
+        Retourne les colonnes `temps_disponible`, `niveau_urgence` (codes),
+        `probleme_bagage`, `changement_porte`, les rangs `modifies` dont la
+        décision a changé et, pour ceux-ci, `orientations` (situation,
+        instructions, alertes identiques au chemin scalaire).
+        """
+        maintenant = maintenant or datetime.now(timezone.utc)
+        engine = self.decision_engine
+        settings = engine.settings
+
+        # Colonnes par vol (analyse mémoïsée par le moteur scalaire)
+        nb_vols = len(self.numeros_vol)
+        analyses = [engine.analyser_vol(meteo_data, vols.get(numero_vol, {})) for numero_vol in self.numeros_vol]
+        depart_s = np.fromiter(
+            (a["heure_depart"].timestamp() if a["heure_depart"] is not None else np.nan for a in analyses),
+            dtype=np.float64, count=nb_vols
+        )
+        changement_vol = np.fromiter((a["changement_porte"] for a in analyses), dtype=bool, count=nb_vols)
+        # Empreinte des valeurs du vol reprises dans les instructions et la situation
+        empreinte_vol = np.fromiter(
+            (
+                hash((
+                    vol_data.get("porte_actuelle"), vol_data.get("porte_originale"),
+                    vol_data.get("terminal"), vol_data.get("heure_depart"), tuple(analyse["recommandations"])
+                ))
+                for vol_data, analyse in zip((vols.get(numero_vol, {}) for numero_vol in self.numeros_vol), analyses)
+            ),
+            dtype=np.int64, count=nb_vols
+        )
+
+        # Temps disponible: minutes entières tronquées, >= 0, 90 sans heure de départ
+        minutes = np.trunc((depart_s - maintenant.timestamp()) / 60)
+        temps_vol = np.where(np.isnan(minutes), 90, np.maximum(minutes, 0)).astype(np.int64)
+        temps_disponible = temps_vol[self.vol]
+
+        # Urgence: mêmes règles, dans le même ordre, que analyser_situation
+        urgence = np.where(self.probleme_bagage, ELEVE, FAIBLE).astype(np.int8)
+        niveau_alerte_meteo = meteo_data.get("niveau_alerte", "faible")
+        perturbation = niveau_alerte_meteo != "faible"
+        if perturbation:
+            if niveau_alerte_meteo == "critique":
+                urgence[:] = CRITIQUE
+            else:
+                urgence[urgence == FAIBLE] = MOYEN
+        urgence[(temps_disponible < settings.TEMPS_URGENT_MIN) & (urgence == FAIBLE)] = ELEVE
+        urgence[temps_disponible < settings.TEMPS_CRITIQUE_MIN] = CRITIQUE
+
+        changement_porte = changement_vol[self.vol]
+        # Étape salon du parcours JITB (dépend du temps disponible)
+        attente_salon = (temps_disponible > 45) & (urgence != CRITIQUE)
+
+        # Tout ce que la matérialisation reprend: le temps disponible figure dans
+        # la situation, les alertes de temps et l'étape salon
+        etat = np.stack([
+            urgence.astype(np.int64),
+            temps_disponible,
+            self.statut_bagage,
+            changement_porte.astype(np.int64),
+            attente_salon.astype(np.int64),
+            empreinte_vol[self.vol]
+        ])
+        # Entrées communes à tous les passagers: tout change si elles changent
+        versions = (engine.parcours.version, engine.attente_controles.version)
+        meteo = (niveau_alerte_meteo, tuple(meteo_data.get("impact", {}).get("conditions", [])))
+        if (
+            self._etat_precedent is None
+            or self._versions_precedentes != versions
+            or self._meteo_precedente != meteo
+        ):
+            modifies = np.arange(len(self))
+        else:
+            modifies = np.flatnonzero((etat != self._etat_precedent).any(axis=0))
+        self._etat_precedent = etat
+        self._versions_precedentes = versions
+        self._meteo_precedente = meteo
+
+        # Matérialisation des seuls rangs modifiés (valeurs Python, pas de scalaires NumPy)
+        orientations = {}
+        lignes = zip(
+            modifies.tolist(),
+            self.vol[modifies].tolist(),
+            temps_disponible[modifies].tolist(),
+            urgence[modifies].tolist(),
+            self.probleme_bagage[modifies].tolist()
+        )
+        for i, k, temps, niveau, probleme in lignes:
+            numero_vol, _, position = self.passagers[i]
+            orientations[i] = self._materialiser(
+                i, position, meteo_data, vols.get(numero_vol, {}),
+                analyses[k], temps, niveau, probleme, perturbation
+            )
+
+        return {
+            "temps_disponible": temps_disponible,
+            "niveau_urgence": urgence,
+            "probleme_bagage": self.probleme_bagage.copy(),
+            "changement_porte": changement_porte,
+            "modifies": modifies,
+            "orientations": orientations
+        }
+
+    def _materialiser(
+        self,
+        i: int,
+        position: Optional[str],
+        meteo_data: Dict[str, Any],
+        vol_data: Dict[str, Any],
+        analyse_vol: Dict[str, Any],
+        temps_disponible: int,
+        urgence: int,
+        probleme: bool,
+        perturbation: bool
+    ) -> Dict[str, Any]:
+        """Construit situation, instructions et alertes d'un passager"""
+        situation = {
+            "type_trajet": "probleme_bagage" if probleme else "normal",
+            "niveau_urgence": LIBELLES_URGENCE[urgence],
+            "probleme_bagage": probleme,
+            "perturbation_meteo": perturbation,
+            "changement_porte": analyse_vol["changement_porte"],
+            "temps_disponible": temps_disponible,
+            "recommandations": list(analyse_vol["recommandations"])
+        }
+        bagage_data = self._bagages[i]
+        return {
+            "situation": situation,
+            "instructions": generer_instructions(
+                self.decision_engine, situation, position, vol_data, bagage_data
+            ),
+            "alertes": generer_alertes(situation, meteo_data, vol_data)
+        }
@@ -0,0 +1,122 @@
+import logging
+import time
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    from .topologie import Topologie
+
+logger = logging.getLogger(__name__)
+
+# Zones côté ville, hors zones d'embarquement de la topologie
+ZONE_ENTREE, ZONE_SECURITE = "entree", "securite"
+
+
+def zone_de_position(topologie: "Topologie", position: Optional[str], porte: str) -> Optional[str]:
+    """Zone occupée par un passager d'après sa position estimée et sa porte (None si inconnue)"""
+    if position in ("zone_embarquement", "porte"):
+        return topologie.zone_porte(porte)
+    if position == "securite":
+        return ZONE_SECURITE
+    if position == "entree":
+        return ZONE_ENTREE
+    return None
+
+
+class OccupationZones:
+    """
+    Occupation des zones en continu, sur une fenêtre glissante.
+
+    Un passager compte dans la zone de sa dernière observation (orientation
+    demandée, événement de positionnement) tant qu'elle date de moins de
+    `fenetre_s`. Les observations sont rangées dans des seaux de
+    `granularite_s` secondes: une observation déplace le passager de son
+    ancien seau vers le seau courant, un seau sorti de la fenêtre est retiré
+    des totaux en bloc. Coût O(1) amorti par événement; l'instantané ne lit
+    que les totaux par zone. Les passagers dont le vol est connu sont aussi
+    comptés par vol et par zone (départs attendus pour la prévision).
+    """
+
+    def __init__(
+        self,
+        fenetre_s: float = 900.0,
+        granularite_s: float = 30.0,
+        horloge: Callable[[], float] = time.monotonic
+    ):
+        self.fenetre_s = fenetre_s
+        self.granularite_s = granularite_s
+        self._horloge = horloge
+        self._nb_seaux = max(1, int(round(fenetre_s / granularite_s)))
+        # Par seau: passagers par zone, et passagers dont c'est la dernière observation
+        self._comptes: List[Dict[str, int]] = [{} for _ in range(self._nb_seaux)]
+        self._membres: List[Set[str]] = [set() for _ in range(self._nb_seaux)]
+        # Passager -> (zone, seau de sa dernière observation, vol)
+        self._passagers: Dict[str, Tuple[str, int, Optional[str]]] = {}
+        self._dernier_seau = -1
+        # Passagers présents par zone, sur la fenêtre
+        self.occupation: Dict[str, int] = {}
+        # Vol -> passagers présents par zone
+        self.par_vol: Dict[str, Dict[str, int]] = {}
+        self.evenements = 0
+
+    def __len__(self) -> int:
+        return len(self._passagers)
+
+    def observer(self, id_passager: str, zone: Optional[str], numero_vol: Optional[str] = None):
+        """Passager vu dans `zone`; None s'il a quitté le terminal (embarqué)"""
+        seau = self._avancer()
+        self.evenements += 1
+        ancien = self._passagers.pop(id_passager, None)
+        if ancien is not None:
+            zone_ancienne, seau_ancien, vol_ancien = ancien
+            i = seau_ancien % self._nb_seaux
+            self._comptes[i][zone_ancienne] -= 1
+            self._membres[i].discard(id_passager)
+            self.occupation[zone_ancienne] -= 1
+            self._retirer_vol(vol_ancien, zone_ancienne)
+            # Événement de positionnement sans vol: celui déjà connu est conservé
+            numero_vol = numero_vol or vol_ancien
+        if zone is None:
+            return
+        i = seau % self._nb_seaux
+        comptes = self._comptes[i]
+        comptes[zone] = comptes.get(zone, 0) + 1
+        self._membres[i].add(id_passager)
+        self._passagers[id_passager] = (zone, seau, numero_vol)
+        self.occupation[zone] = self.occupation.get(zone, 0) + 1
+        if numero_vol is not None:
+            zones_vol = self.par_vol.setdefault(numero_vol, {})
+            zones_vol[zone] = zones_vol.get(zone, 0) + 1
+
+    def _retirer_vol(self, numero_vol: Optional[str], zone: str):
+        if numero_vol is None:
+            return
+        zones_vol = self.par_vol[numero_vol]
+        zones_vol[zone] -= 1
+        if not zones_vol[zone]:
+            del zones_vol[zone]
+            if not zones_vol:
+                del self.par_vol[numero_vol]
+
+    def _avancer(self) -> int:
+        """Retire les seaux sortis de la fenêtre (coût amorti O(1))"""
+        seau = int(self._horloge() // self.granularite_s)
+        if self._dernier_seau < 0:
+            self._dernier_seau = seau
+            return seau
+        for k in range(1, min(seau - self._dernier_seau, self._nb_seaux) + 1):
+            i = (self._dernier_seau + k) % self._nb_seaux
+            for zone, nombre in self._comptes[i].items():
+                self.occupation[zone] -= nombre
+            self._comptes[i].clear()
+            for id_passager in self._membres[i]:
+                zone, _, numero_vol = self._passagers.pop(id_passager)
+                self._retirer_vol(numero_vol, zone)
+            self._membres[i].clear()
+        if seau > self._dernier_seau:
+            self._dernier_seau = seau
+        return seau
+
+    def instantane(self) -> Dict[str, int]:
+        """Passagers présents par zone (zones occupées uniquement)"""
+        self._avancer()
+        return {zone: nombre for zone, nombre in self.occupation.items() if nombre > 0}
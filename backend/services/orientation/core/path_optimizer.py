@@ -0,0 +1,368 @@
+from array import array
+from typing import TYPE_CHECKING, Dict, Any, Iterable, List, Optional, Set, Tuple
+import heapq
+import logging
+import math
+
+if TYPE_CHECKING:
+    from .topologie import Topologie
+
+logger = logging.getLogger(__name__)
+
+INFINI = math.inf
+
+# Vitesse de marche moyenne d'un passager avec bagage cabine (mètres/minute)
+VITESSE_MARCHE_M_MIN = 75.0
+
+
+class GrapheTerminal:
+    """Graphe du terminal: points d'intérêt reliés par des couloirs pondérés en minutes de marche"""
+
+    def __init__(self):
+        self.noeuds: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.infos: List[Dict[str, Any]] = []
+        self.voisins: List[Dict[int, float]] = []
+
+    def __len__(self) -> int:
+        return len(self.noeuds)
+
+    def ajouter_noeud(
+        self,
+        id_noeud: str,
+        type_noeud: str,
+        coordonnees: Tuple[float, float],
+        zone: Optional[str] = None,
+        nom: Optional[str] = None
+    ) -> int:
+        """Ajoute un nœud (entree, securite, zone, salon, porte, couloir)"""
+        if id_noeud in self.index:
+            return self.index[id_noeud]
+        i = len(self.noeuds)
+        self.noeuds.append(id_noeud)
+        self.index[id_noeud] = i
+        self.infos.append({
+            "type": type_noeud,
+            "coordonnees": {"x": float(coordonnees[0]), "y": float(coordonnees[1])},
+            "zone": zone,
+            "nom": nom or id_noeud
+        })
+        self.voisins.append({})
+        return i
+
+    def ajouter_arete(self, a: str, b: str, minutes: Optional[float] = None):
+        """Ajoute un couloir à double sens (durée déduite des coordonnées si absente)"""
+        i, j = self.index[a], self.index[b]
+        if minutes is None:
+            minutes = self.distance_m(i, j) / VITESSE_MARCHE_M_MIN
+        self.voisins[i][j] = minutes
+        self.voisins[j][i] = minutes
+
+    def distance_m(self, i: int, j: int) -> float:
+        """Distance à vol d'oiseau entre deux nœuds (mètres)"""
+        ci, cj = self.infos[i]["coordonnees"], self.infos[j]["coordonnees"]
+        return math.hypot(ci["x"] - cj["x"], ci["y"] - cj["y"])
+
+
+def dijkstra(graphe: GrapheTerminal, source: int) -> Tuple[array, array]:
+    """Plus courts chemins depuis une source: (distances, prédécesseurs)"""
+    n = len(graphe)
+    dist = array("d", [INFINI]) * n
+    parent = array("i", [-1]) * n
+    dist[source] = 0.0
+    tas = [(0.0, source)]
+    voisins = graphe.voisins
+    while tas:
+        d, u = heapq.heappop(tas)
+        if d > dist[u]:
+            continue
+        for v, w in voisins[u].items():
+            nd = d + w
+            if nd < dist[v]:
+                dist[v] = nd
+                parent[v] = u
+                heapq.heappush(tas, (nd, v))
+    return dist, parent
+
+
+class OptimiseurParcours:
+    """
+    Routage dans le terminal avec tables de plus courts chemins précalculées.
+
+    Un arbre de plus courts chemins est calculé au démarrage depuis chaque
+    point d'intérêt (entrées, contrôles, salons, portes). À la requête, le
+    temps de marche entre deux points est une lecture de table en O(1) et le
+    chemin se reconstruit en remontant l'arbre.
+    """
+
+    TYPES_SOURCES = ("entree", "securite", "zone", "salon", "porte")
+
+    def __init__(self, graphe: GrapheTerminal, sources: Optional[Iterable[str]] = None):
+        self.graphe = graphe
+        if sources is None:
+            sources = [
+                noeud for noeud, info in zip(graphe.noeuds, graphe.infos)
+                if info["type"] in self.TYPES_SOURCES
+            ]
+        self.sources: Dict[int, int] = {
+            graphe.index[noeud]: k for k, noeud in enumerate(sources)
+        }
+        self.distances: List[array] = []
+        self.parents: List[array] = []
+        # Poids nominaux des couloirs modifiés (i < j), pour revenir à l'état sans congestion
+        self._poids_base: Dict[Tuple[int, int], float] = {}
+        # Poids fixés par l'opérateur (fermetures, occupation), avant congestion
+        self._poids_operateur: Dict[Tuple[int, int], float] = {}
+        self._zones_congestionnees: Tuple[Tuple[str, ...], float] = ((), 1.0)
+        # Incrémentée à chaque changement des tables
+        self.version = 0
+        self.recalculer()
+        logger.info(f"Tables de routage précalculées: {len(self.sources)} sources, {len(graphe)} nœuds")
+
+    def recalculer(self):
+        """Recalcule entièrement toutes les tables (un Dijkstra par source)"""
+        self.distances = [None] * len(self.sources)
+        self.parents = [None] * len(self.sources)
+        for i, s in self.sources.items():
+            self.distances[s], self.parents[s] = dijkstra(self.graphe, i)
+        self.version += 1
+
+    def mettre_a_jour_arete(self, a: str, b: str, minutes: float):
+        """
+        Fixe le temps de parcours d'un couloir existant (math.inf pour le
+        fermer). La valeur de l'opérateur remplace le poids nominal; la
+        congestion météo en cours s'applique par-dessus. Lève `ValueError` si
+        les deux nœuds ne sont pas reliés par un couloir.
+        """
+        if not self.connait_arete(a, b):
+            raise ValueError(f"Couloir {a} - {b} inconnu")
+        i, j = sorted((self.graphe.index[a], self.graphe.index[b]))
+        self._poids_operateur[(i, j)] = minutes
+        self._appliquer_poids(i, j, self._poids_effectif(i, j))
+
+    def appliquer_congestion(self, zones: Iterable[str], facteur: float) -> Set[str]:
+        """
+        Ralentit les couloirs des zones congestionnées (ex: `secteurs_congestionnes`
+        de la météo). Sans effet si l'ensemble des zones n'a pas changé.
+        Retourne les zones dont la congestion a changé.
+        """
+        cible = (tuple(sorted(set(zones))), facteur)
+        if cible == self._zones_congestionnees:
+            return set()
+        anciennes, ancien_facteur = self._zones_congestionnees
+        if facteur == ancien_facteur:
+            changees = set(anciennes) ^ set(cible[0])
+        else:
+            changees = set(anciennes) | set(cible[0])
+        self._zones_congestionnees = cible
+        modifications = []
+        for i, voisins in enumerate(self.graphe.voisins):
+            for j in voisins:
+                if j <= i:
+                    continue
+                poids = self._poids_effectif(i, j)
+                if poids != voisins[j]:
+                    modifications.append((i, j, poids))
+        for i, j, poids in modifications:
+            self._appliquer_poids(i, j, poids)
+        if modifications:
+            logger.info(f"Congestion appliquée aux zones {list(cible[0])}: {len(modifications)} couloirs mis à jour")
+        return changees
+
+    def _poids_effectif(self, i: int, j: int) -> float:
+        """Poids d'un couloir (i < j): valeur de l'opérateur ou nominale, puis congestion"""
+        base = self._poids_operateur.get((i, j))
+        if base is None:
+            base = self._poids_base.get((i, j), self.graphe.voisins[i][j])
+        zones, facteur = self._zones_congestionnees
+        infos = self.graphe.infos
+        if infos[i]["zone"] in zones or infos[j]["zone"] in zones:
+            return base * facteur
+        return base
+
+    def _appliquer_poids(self, i: int, j: int, minutes: float):
+        """
+        Change le poids d'un couloir (i < j) en réparant les tables.
+
+        Seuls les arbres de plus courts chemins touchés sont réparés:
+        - baisse du poids: propagation des améliorations depuis l'extrémité
+          qui en profite;
+        - hausse du poids: seul le sous-arbre sous l'arête, si elle fait partie
+          de l'arbre, est invalidé puis recalculé depuis sa frontière.
+        """
+        ancien = self.graphe.voisins[i][j]
+        if minutes == ancien:
+            return
+        self._poids_base.setdefault((i, j), ancien)
+        self.graphe.voisins[i][j] = minutes
+        self.graphe.voisins[j][i] = minutes
+
+        for s in range(len(self.distances)):
+            if minutes < ancien:
+                self._reparer_baisse(s, i, j, minutes)
+            else:
+                self._reparer_hausse(s, i, j)
+        self.version += 1
+
+    def _reparer_baisse(self, s: int, i: int, j: int, poids: float):
+        dist, parent = self.distances[s], self.parents[s]
+        tas = []
+        for u, v in ((i, j), (j, i)):
+            nd = dist[u] + poids
+            if nd < dist[v]:
+                dist[v] = nd
+                parent[v] = u
+                tas.append((nd, v))
+        if tas:
+            heapq.heapify(tas)
+            self._propager(dist, parent, tas)
+
+    def _reparer_hausse(self, s: int, i: int, j: int):
+        dist, parent = self.distances[s], self.parents[s]
+        if parent[j] == i:
+            racine = j
+        elif parent[i] == j:
+            racine = i
+        else:
+            # Arête hors de l'arbre: aucune distance ne change
+            return
+
+        # Sous-arbre dépendant de l'arête (les fils d'un nœud sont des voisins
+        # dont il est le prédécesseur)
+        voisins = self.graphe.voisins
+        affectes = {racine}
+        pile = [racine]
+        while pile:
+            u = pile.pop()
+            for v in voisins[u]:
+                if parent[v] == u and v not in affectes:
+                    affectes.add(v)
+                    pile.append(v)
+        for v in affectes:
+            dist[v] = INFINI
+            parent[v] = -1
+
+        # Meilleure entrée dans le sous-arbre depuis sa frontière
+        tas = []
+        for v in affectes:
+            for u, w in voisins[v].items():
+                if u not in affectes:
+                    nd = dist[u] + w
+                    if nd < dist[v]:
+                        dist[v] = nd
+                        parent[v] = u
+            if dist[v] < INFINI:
+                tas.append((dist[v], v))
+        heapq.heapify(tas)
+        self._propager(dist, parent, tas)
+
+    def _propager(self, dist: array, parent: array, tas: List[Tuple[float, int]]):
+        """Dijkstra partiel à partir des nœuds dont la distance vient de baisser"""
+        voisins = self.graphe.voisins
+        while tas:
+            d, u = heapq.heappop(tas)
+            if d > dist[u]:
+                continue
+            for v, w in voisins[u].items():
+                nd = d + w
+                if nd < dist[v]:
+                    dist[v] = nd
+                    parent[v] = u
+                    heapq.heappush(tas, (nd, v))
+
+    def connait(self, noeud: str) -> bool:
+        return noeud in self.graphe.index
+
+    def connait_arete(self, a: str, b: str) -> bool:
+        """Vrai si un couloir (ouvert ou fermé) relie les deux nœuds"""
+        i, j = self.graphe.index.get(a), self.graphe.index.get(b)
+        return i is not None and j is not None and j in self.graphe.voisins[i]
+
+    def temps(self, depart: str, arrivee: str) -> Optional[float]:
+        """Temps de marche en minutes (None si un des points est inconnu ou injoignable)"""
+        i, j = self.graphe.index.get(depart), self.graphe.index.get(arrivee)
+        if i is None or j is None:
+            return None
+        # Couloirs à double sens: la table de l'une ou l'autre extrémité convient
+        s = self.sources.get(i)
+        if s is not None:
+            d = self.distances[s][j]
+        else:
+            s = self.sources.get(j)
+            if s is None:
+                return None
+            d = self.distances[s][i]
+        return None if d == INFINI else d
+
+    def chemin(self, depart: str, arrivee: str) -> List[str]:
+        """Liste des nœuds du chemin le plus court (vide si injoignable)"""
+        i, j = self.graphe.index.get(depart), self.graphe.index.get(arrivee)
+        if i is None or j is None:
+            return []
+        if i in self.sources:
+            etapes = self._remonter(self.sources[i], j)
+            etapes.reverse()
+        elif j in self.sources:
+            etapes = self._remonter(self.sources[j], i)
+        else:
+            return []
+        return [self.graphe.noeuds[k] for k in etapes]
+
+    def _remonter(self, s: int, cible: int) -> List[int]:
+        """Remonte l'arbre de la source s depuis la cible"""
+        if self.distances[s][cible] == INFINI:
+            return []
+        parent = self.parents[s]
+        etapes = [cible]
+        while parent[etapes[-1]] != -1:
+            etapes.append(parent[etapes[-1]])
+        return etapes
+
+    def coordonnees(self, noeud: str) -> Optional[Dict[str, float]]:
+        i = self.graphe.index.get(noeud)
+        return None if i is None else dict(self.graphe.infos[i]["coordonnees"])
+
+    def zone(self, noeud: str) -> Optional[str]:
+        i = self.graphe.index.get(noeud)
+        return None if i is None else self.graphe.infos[i]["zone"]
+
+
+def noeud_porte(porte: str) -> str:
+    return f"porte-{porte}"
+
+
+def noeud_controle(id_controle: str) -> str:
+    return f"securite-{id_controle}"
+
+
+def noeud_zone(zone: str) -> str:
+    return f"zone-{zone}"
+
+
+def construire_graphe_terminal(topologie: "Topologie") -> GrapheTerminal:
+    """Construit le graphe du terminal à partir de la topologie de l'aéroport"""
+    graphe = GrapheTerminal()
+    coordonnees = topologie.coordonnees
+    graphe.ajouter_noeud("entree", "entree", coordonnees["entree"], nom=topologie.nom_entree)
+
+    for zone, config in topologie.zones.items():
+        graphe.ajouter_noeud(noeud_zone(zone), "zone", coordonnees[noeud_zone(zone)], zone=zone, nom=f"Zone {zone}")
+        for porte in config["portes"]:
+            graphe.ajouter_noeud(noeud_porte(porte), "porte", coordonnees[noeud_porte(porte)], zone=zone, nom=f"Porte {porte}")
+            graphe.ajouter_arete(noeud_zone(zone), noeud_porte(porte))
+
+    for zone, attentes in topologie.attentes_par_zone.items():
+        for attente in attentes:
+            graphe.ajouter_noeud(attente["id"], "salon", coordonnees[attente["id"]], zone=zone, nom=attente["nom"])
+            graphe.ajouter_arete(noeud_zone(zone), attente["id"])
+
+    for id_controle, info in topologie.controles_securite.items():
+        graphe.ajouter_noeud(noeud_controle(id_controle), "securite", coordonnees[noeud_controle(id_controle)], nom=info["position"])
+        graphe.ajouter_arete("entree", noeud_controle(id_controle))
+        for zone in info["zone_desservie"]:
+            graphe.ajouter_arete(noeud_controle(id_controle), noeud_zone(zone))
+
+    for a, b in topologie.couloirs:
+        graphe.ajouter_arete(noeud_zone(a), noeud_zone(b))
+
+    return graphe
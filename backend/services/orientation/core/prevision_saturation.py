@@ -0,0 +1,108 @@
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def sorties_programmees(
+    nb_zones: int,
+    horizons_min: np.ndarray,
+    zone: np.ndarray,
+    minutes_avant_depart: np.ndarray,
+    passagers: np.ndarray
+) -> np.ndarray:
+    """
+    Passagers attendus en départ de chaque zone avant chaque horizon.
+
+    `zone`, `minutes_avant_depart` et `passagers` décrivent les vols du
+    programme (un élément par vol). Retourne une matrice (zones x horizons)
+    cumulée: un vol qui part avant 15 minutes compte aussi à 30, 45 et 60.
+    """
+    nb_horizons = len(horizons_min)
+    sorties = np.zeros((nb_zones, nb_horizons))
+    if len(zone) == 0:
+        return sorties
+    # Premier horizon qui inclut le départ (nb_horizons: au-delà)
+    premier = np.searchsorted(horizons_min, minutes_avant_depart, side="left")
+    retenus = premier < nb_horizons
+    cases = zone[retenus] * nb_horizons + premier[retenus]
+    sorties += np.bincount(cases, weights=passagers[retenus], minlength=nb_zones * nb_horizons).reshape(nb_zones, nb_horizons)
+    return np.cumsum(sorties, axis=1)
+
+
+class PrevisionSaturation:
+    """
+    Prévision de l'occupation des zones à court terme (15 à 60 minutes).
+
+    Lissage exponentiel double de Holt à tendance amortie, tenu pour toutes
+    les zones à la fois (un vecteur numpy par composante): à chaque pas de
+    `pas_min` minutes, l'occupation observée met à jour le niveau et la
+    tendance de chaque zone. La projection à h pas vaut
+    niveau + (φ + φ² + ... + φ^h) x tendance, moins les passagers attendus en
+    départ de la zone d'ici là (programme des vols). Une alerte est levée pour
+    chaque zone dont l'occupation projetée dépasse `seuil` x capacité.
+    """
+
+    def __init__(
+        self,
+        zones: Sequence[str],
+        capacites: Sequence[float],
+        pas_min: float = 1.0,
+        horizons_min: Sequence[float] = (15, 30, 45, 60),
+        alpha: float = 0.5,
+        beta: float = 0.2,
+        amortissement: float = 0.98,
+        seuil: float = 1.0
+    ):
+        self.zones = list(zones)
+        self.index = {zone: i for i, zone in enumerate(self.zones)}
+        self.capacites = np.asarray(capacites, dtype=float)
+        self.horizons_min = np.asarray(horizons_min, dtype=float)
+        self.alpha = alpha
+        self.beta = beta
+        self.seuil = seuil
+        # Coefficient de tendance par horizon: somme des φ^k pour k = 1..h pas
+        pas = self.horizons_min / pas_min
+        if amortissement == 1.0:
+            self._coef_tendance = pas
+        else:
+            self._coef_tendance = amortissement * (1 - amortissement ** pas) / (1 - amortissement)
+        self._amortissement = amortissement
+        self.niveau = np.zeros(len(self.zones))
+        self.tendance = np.zeros(len(self.zones))
+        self.observations = 0
+
+    def mettre_a_jour(self, occupation: np.ndarray):
+        """Intègre l'occupation observée de toutes les zones (un pas de temps)"""
+        if self.observations == 0:
+            self.niveau = occupation.astype(float)
+        else:
+            prevu = self.niveau + self._amortissement * self.tendance
+            niveau = self.alpha * occupation + (1 - self.alpha) * prevu
+            self.tendance = self.beta * (niveau - self.niveau) + (1 - self.beta) * self._amortissement * self.tendance
+            self.niveau = niveau
+        self.observations += 1
+
+    def prevoir(self, sorties: Optional[np.ndarray] = None) -> np.ndarray:
+        """Occupation projetée (zones x horizons)"""
+        prevision = self.niveau[:, None] + self.tendance[:, None] * self._coef_tendance[None, :]
+        if sorties is not None:
+            prevision -= sorties
+        return np.maximum(prevision, 0.0)
+
+    def alertes(self, prevision: np.ndarray) -> List[Dict[str, Any]]:
+        """Zones dont la projection dépasse le seuil, au premier horizon concerné"""
+        depasse = (prevision > self.seuil * self.capacites[:, None]) & (self.capacites[:, None] > 0)
+        alertes = []
+        for i in np.flatnonzero(depasse.any(axis=1)):
+            k = int(np.argmax(depasse[i]))
+            alertes.append({
+                "zone": self.zones[i],
+                "horizon_min": int(self.horizons_min[k]),
+                "occupation_prevue": round(float(prevision[i, k]), 1),
+                "capacite": float(self.capacites[i]),
+                "taux": round(float(prevision[i, k] / self.capacites[i]), 3)
+            })
+        return alertes
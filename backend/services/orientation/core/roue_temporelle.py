@@ -0,0 +1,186 @@
+import asyncio
+import logging
+import math
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Echeance = Tuple[Hashable, Any]
+
+
+class Minuteur:
+    """Minuteur en attente dans une case de la roue"""
+
+    __slots__ = ("cle", "tick", "valeur", "case")
+
+    def __init__(self, cle: Hashable, tick: int, valeur: Any):
+        self.cle = cle
+        self.tick = tick
+        self.valeur = valeur
+        self.case: Optional[Dict[Hashable, "Minuteur"]] = None
+
+
+class RoueTemporelle:
+    """
+    Roue temporelle hiérarchique (Varghese & Lauck).
+
+    `niveaux` roues de `cases` cases; une case du niveau n couvre `cases**n`
+    ticks de `granularite_s` secondes. Un minuteur est rangé dans la case du
+    plus petit niveau qui contient son échéance, puis redescend d'un niveau
+    quand le tick courant atteint sa case (cascade). Au-delà de l'horizon
+    (`cases**niveaux` ticks), il attend dans la dernière case du niveau
+    supérieur et est reclassé à chaque tour.
+
+    Planifier, annuler et replanifier un minuteur (identifié par sa clé) sont
+    en O(1); les minuteurs échus d'un même tick sont rendus ensemble.
+    Précision: un tick (jamais avant l'échéance).
+    """
+
+    def __init__(
+        self,
+        granularite_s: float = 1.0,
+        cases: int = 64,
+        niveaux: int = 4,
+        horloge: Callable[[], float] = time.monotonic
+    ):
+        if cases < 2 or niveaux < 2:
+            raise ValueError("Au moins 2 niveaux de 2 cases")
+        self.granularite_s = granularite_s
+        self.cases = cases
+        self.niveaux = niveaux
+        self._horloge = horloge
+        self._origine = horloge()
+        # Dernier tick traité
+        self._tick = 0
+        self._roues: List[List[Dict[Hashable, Minuteur]]] = [
+            [{} for _ in range(cases)] for _ in range(niveaux)
+        ]
+        self._portees = [cases ** n for n in range(niveaux + 1)]
+        self._minuteurs: Dict[Hashable, Minuteur] = {}
+        # Échus au moment de leur (re)classement, rendus au prochain avancement
+        self._echus: Dict[Hashable, Minuteur] = {}
+        self._reveil = asyncio.Event()
+        self._tache: Optional[asyncio.Task] = None
+        self.declenches = 0
+
+    def __len__(self) -> int:
+        return len(self._minuteurs)
+
+    def __contains__(self, cle: Hashable) -> bool:
+        return cle in self._minuteurs
+
+    def planifier(self, cle: Hashable, delai_s: float, valeur: Any = None):
+        """Déclenche `cle` dans `delai_s` secondes; remplace un minuteur existant de même clé"""
+        ancien = self._minuteurs.get(cle)
+        if ancien is not None:
+            del ancien.case[cle]
+        if delai_s < 0:
+            delai_s = 0.0
+        minuteur = Minuteur(cle, math.ceil((self._horloge() + delai_s - self._origine) / self.granularite_s), valeur)
+        self._minuteurs[cle] = minuteur
+        self._ranger(minuteur)
+        if not self._reveil.is_set():
+            self._reveil.set()
+
+    def annuler(self, cle: Hashable) -> bool:
+        """Retire le minuteur de `cle` (False s'il n'y en a pas)"""
+        minuteur = self._minuteurs.pop(cle, None)
+        if minuteur is None:
+            return False
+        del minuteur.case[cle]
+        return True
+
+    def echeance(self, cle: Hashable) -> Optional[float]:
+        """Secondes restantes avant le déclenchement de `cle`"""
+        minuteur = self._minuteurs.get(cle)
+        if minuteur is None:
+            return None
+        return self._origine + minuteur.tick * self.granularite_s - self._horloge()
+
+    def _ranger(self, minuteur: Minuteur):
+        ecart = minuteur.tick - self._tick
+        if ecart <= 0:
+            case = self._echus
+        elif ecart < self.cases:
+            case = self._roues[0][minuteur.tick % self.cases]
+        else:
+            portees = self._portees
+            niveau = 1
+            while niveau < self.niveaux - 1 and ecart >= portees[niveau + 1]:
+                niveau += 1
+            portee = portees[niveau]
+            if ecart >= portees[self.niveaux]:
+                # Hors horizon: case cascadée en dernier, reclassé à ce moment
+                position = self._tick // portee
+            else:
+                position = minuteur.tick // portee
+            case = self._roues[niveau][position % self.cases]
+        case[minuteur.cle] = minuteur
+        minuteur.case = case
+
+    def avancer(self) -> List[Echeance]:
+        """Traite les ticks écoulés; retourne les (clé, valeur) échues, tick par tick"""
+        cible = int((self._horloge() - self._origine) // self.granularite_s)
+        lot: List[Echeance] = []
+        self._vider(self._echus, lot)
+        if not self._minuteurs:
+            self._tick = max(self._tick, cible)
+            return lot
+        while self._tick < cible and self._minuteurs:
+            self._tick += 1
+            tick = self._tick
+            # Cascades du niveau le plus haut concerné vers le niveau 1
+            niveau = 1
+            while niveau < self.niveaux and tick % self._portees[niveau] == 0:
+                niveau += 1
+            for n in range(niveau - 1, 0, -1):
+                case = self._roues[n][(tick // self._portees[n]) % self.cases]
+                if case:
+                    minuteurs = list(case.values())
+                    case.clear()
+                    for minuteur in minuteurs:
+                        self._ranger(minuteur)
+            self._vider(self._echus, lot)
+            self._vider(self._roues[0][tick % self.cases], lot)
+        self._tick = max(self._tick, cible)
+        return lot
+
+    def _vider(self, case: Dict[Hashable, Minuteur], lot: List[Echeance]):
+        if not case:
+            return
+        for cle, minuteur in case.items():
+            del self._minuteurs[cle]
+            lot.append((cle, minuteur.valeur))
+        self.declenches += len(case)
+        case.clear()
+
+    def demarrer(self, rappel: Callable[[List[Echeance]], None]):
+        """Avance la roue sur la boucle asyncio; `rappel` reçoit chaque lot de minuteurs échus"""
+        if self._tache is None or self._tache.done():
+            self._tache = asyncio.create_task(self._boucle(rappel))
+
+    async def fermer(self):
+        if self._tache is not None:
+            self._tache.cancel()
+            try:
+                await self._tache
+            except asyncio.CancelledError:
+                pass
+            self._tache = None
+
+    async def _boucle(self, rappel: Callable[[List[Echeance]], None]):
+        while True:
+            if not self._minuteurs:
+                # Roue vide: attente d'une planification
+                self._reveil.clear()
+                await self._reveil.wait()
+            prochain = self._origine + (self._tick + 1) * self.granularite_s
+            await asyncio.sleep(max(prochain - self._horloge(), 0))
+            lot = self.avancer()
+            if not lot:
+                continue
+            try:
+                rappel(lot)
+            except Exception as e:
+                logger.error(f"Erreur au déclenchement de {len(lot)} minuteurs: {e}", exc_info=True)
@@ -0,0 +1,334 @@
+import logging
+from bisect import bisect_right
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from ..schemas.orientation import (
+    ActionType,
+    AlerteSchema,
+    InstructionSchema,
+    SituationSchema,
+    TypeInstruction
+)
+
+if TYPE_CHECKING:
+    from .decision_engine import DecisionEngine
+    from .topologie import Topologie
+
+logger = logging.getLogger(__name__)
+
+# Statuts bagage qui imposent un passage au bureau des bagages
+STATUTS_BAGAGE_PROBLEME = ("MAL_ACHEMINE", "EN_VERIFICATION")
+# Classes de bagage: statut normal, ou l'un des statuts problématiques
+CLASSES_BAGAGE = (None,) + STATUTS_BAGAGE_PROBLEME
+# Classes météo: faible, dégradée (moyen/eleve), critique
+METEO_FAIBLE, METEO_DEGRADEE, METEO_CRITIQUE = 0, 1, 2
+POSITIONS_SANS_SECURITE = ("zone_embarquement", "porte")
+# Seuil au-delà duquel le passager peut attendre en salon (parcours JITB)
+SEUIL_ATTENTE_SALON_MIN = 45
+
+CleDecision = Tuple[Optional[str], int, int, bool, str]
+
+
+class Decision:
+    """Résultat précompilé pour un état discret (bagage, météo, tranche de temps, position, zone)"""
+
+    __slots__ = (
+        "niveau_urgence", "type_trajet", "probleme_bagage", "critique",
+        "instruction_bagage", "securite", "attente", "porte", "alerte_meteo", "alerte_temps"
+    )
+
+    def __init__(self):
+        self.niveau_urgence = "faible"
+        self.type_trajet = "normal"
+        self.probleme_bagage = False
+        self.critique = False
+        # Instruction complète (problème bagage), partagée
+        self.instruction_bagage: Optional[InstructionSchema] = None
+        # Étape contrôle de sécurité (choisie à la requête selon les attentes en direct)
+        self.securite = False
+        # Champs statiques des instructions salon et porte, alertes
+        self.attente: Optional[Dict[str, Any]] = None
+        self.porte: Optional[Dict[str, Any]] = None
+        self.alerte_meteo: Optional[Dict[str, Any]] = None
+        self.alerte_temps: Optional[Dict[str, Any]] = None
+
+
+class TableDecision:
+    """
+    Règles d'orientation compilées en table de décision.
+
+    L'escalade d'urgence, les seuils de temps, le choix de la zone d'attente et
+    les gabarits d'instructions et d'alertes sont évalués une fois par état
+    discret (classe de bagage, niveau météo, tranche de temps, position, zone
+    de la porte). À la requête, il ne reste qu'une lecture de table et le
+    remplissage des valeurs propres au passager. Les résultats sont identiques
+    à `analyser_situation`, `generer_instructions` et `generer_alertes`.
+    """
+
+    def __init__(self, decision_engine: "DecisionEngine", topologie: "Topologie", taille_max_modeles: int = 50000):
+        self.decision_engine = decision_engine
+        self.topologie = topologie
+        settings = decision_engine.settings
+        # Bornes des tranches de temps: chaque seuil des règles commence une tranche
+        self._bornes = sorted({
+            settings.TEMPS_CRITIQUE_MIN,
+            SEUIL_ATTENTE_SALON_MIN + 1,
+            settings.TEMPS_URGENT_MIN
+        })
+        # Valeur représentative (plus petite) de chaque tranche
+        self._representants = [0] + self._bornes
+        self._table: Dict[CleDecision, Decision] = {}
+        # Instructions contrôle de sécurité par (zone, critique), valables pour
+        # une version des attentes estimées
+        self._securite: Dict[Tuple[str, bool], InstructionSchema] = {}
+        self._version_attentes = -1
+        # Éléments de réponse déjà construits, par valeurs de remplissage
+        self._modeles: Dict[Tuple, BaseModel] = {}
+        self.taille_max_modeles = taille_max_modeles
+
+        for classe in CLASSES_BAGAGE:
+            for meteo in (METEO_FAIBLE, METEO_DEGRADEE, METEO_CRITIQUE):
+                for tranche in range(len(self._representants)):
+                    for securite in (True, False):
+                        for zone in topologie.zones:
+                            cle = (classe, meteo, tranche, securite, zone)
+                            self._table[cle] = self._compiler(cle)
+        logger.info(f"Table de décision compilée: {len(self._table)} états")
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def tranche(self, temps_disponible: int) -> int:
+        return bisect_right(self._bornes, temps_disponible)
+
+    def _compiler(self, cle: CleDecision) -> Decision:
+        """Évalue les règles pour un état discret"""
+        classe, meteo, tranche, securite, zone = cle
+        engine = self.decision_engine
+        temps = self._representants[tranche]
+        niveau_meteo = ("faible", "moyen", "critique")[meteo]
+
+        decision = Decision()
+        decision.probleme_bagage = classe is not None
+        decision.type_trajet = "probleme_bagage" if decision.probleme_bagage else "normal"
+        decision.niveau_urgence = engine.niveau_urgence(decision.probleme_bagage, niveau_meteo, temps)
+        decision.critique = decision.niveau_urgence == "critique"
+
+        if decision.probleme_bagage:
+            decision.instruction_bagage = InstructionSchema(
+                priorite=1,
+                type=TypeInstruction.CRITIQUE,
+                action=ActionType.CONTACTER_SERVICE,
+                destination="Bureau Service Bagages - Terminal 2, Zone C",
+                description=f"Votre bagage est {classe}. Veuillez vous rendre immédiatement au bureau des services bagages.",
+                temps_estime=10,
+                icon="alert-circle",
+                details={"telephone": "+33 1 XX XX XX XX", "horaires": "24/7"}
+            )
+        else:
+            decision.securite = securite
+            priorite = 2 if securite else 1
+            if temps > SEUIL_ATTENTE_SALON_MIN and not decision.critique:
+                zone_attente = self.topologie.zone_attente(zone)
+                decision.attente = {
+                    "priorite": priorite,
+                    "type": TypeInstruction.INFO,
+                    "action": ActionType.ATTENDRE,
+                    "destination": zone_attente["nom"],
+                    "description": f"{zone_attente['description']} Vous serez notifié quand il sera temps de vous diriger vers la porte.",
+                    "icon": "coffee",
+                    "details": {
+                        "zone_id": zone_attente["id"],
+                        "amenites": ["WiFi gratuit", "Prises électriques", "Toilettes"]
+                    }
+                }
+                priorite += 1
+            temps_avant_porte = 15 if decision.critique else 20
+            decision.porte = {
+                "priorite": priorite,
+                "type": (
+                    TypeInstruction.URGENT if decision.niveau_urgence in ["critique", "eleve"]
+                    else TypeInstruction.NORMAL
+                ),
+                "action": ActionType.EMBARQUER,
+                "description": f"Présentez-vous à la porte {temps_avant_porte} minutes avant le départ.",
+                "temps_estime": temps_avant_porte,
+                "icon": "plane"
+            }
+
+        if meteo == METEO_CRITIQUE:
+            decision.alerte_meteo = {
+                "niveau": "danger",
+                "prefixe": "Alerte météo critique: ",
+                "suffixe": ". Retards importants attendus.",
+                "icon": "cloud-lightning",
+                "action_recommandee": "Restez informé via l'application"
+            }
+        elif meteo == METEO_DEGRADEE:
+            decision.alerte_meteo = {
+                "niveau": "info",
+                "prefixe": "Conditions météo dégradées: ",
+                "suffixe": ". Légers retards possibles.",
+                "icon": "cloud",
+                "action_recommandee": None
+            }
+
+        if decision.critique:
+            decision.alerte_temps = {
+                "niveau": "danger",
+                "prefixe": "Temps limité: ",
+                "suffixe": " minutes avant le départ!",
+                "icon": "clock",
+                "action_recommandee": "Dirigez-vous immédiatement vers votre porte"
+            }
+        elif decision.niveau_urgence == "eleve":
+            decision.alerte_temps = {
+                "niveau": "warning",
+                "prefixe": "Embarquement proche: ",
+                "suffixe": " minutes restantes",
+                "icon": "clock",
+                "action_recommandee": "Ne tardez pas"
+            }
+        return decision
+
+    def _instruction_securite(self, zone: str, critique: bool, vol_data: Dict[str, Any]) -> InstructionSchema:
+        """Instruction contrôle de sécurité, recalculée quand les attentes estimées changent ou expirent"""
+        version = self.decision_engine.attente_controles.version
+        if version != self._version_attentes:
+            self._securite.clear()
+            self._version_attentes = version
+        instruction = self._securite.get((zone, critique))
+        if instruction is None:
+            situation = {"niveau_urgence": "critique" if critique else "faible"}
+            controle = self.decision_engine.choisir_meilleur_controle(situation, vol_data)
+            instruction = InstructionSchema(
+                priorite=1,
+                type=TypeInstruction.URGENT if critique else TypeInstruction.NORMAL,
+                action=ActionType.PASSER_SECURITE,
+                destination=f"Contrôle de Sécurité {controle['id']}",
+                description=f"Temps d'attente estimé: {controle['temps_attente']} minutes. {controle['conseil']}",
+                temps_estime=controle["temps_attente"] + 5,
+                icon="shield-check",
+                details={
+                    "position": controle["position"],
+                    "alternative": controle.get("alternative")
+                }
+            )
+            self._securite[(zone, critique)] = instruction
+        return instruction
+
+    def evaluer(
+        self,
+        meteo_data: Dict[str, Any],
+        bagage_data: Dict[str, Any],
+        vol_data: Dict[str, Any],
+        position: Optional[str]
+    ) -> Tuple[SituationSchema, List[InstructionSchema], List[AlerteSchema]]:
+        """Situation, instructions et alertes d'un passager (lecture de table)"""
+        engine = self.decision_engine
+        analyse_vol = engine.analyser_vol(meteo_data, vol_data)
+        temps_disponible = engine._minutes_avant(analyse_vol["heure_depart"])
+
+        statut = bagage_data.get("statut", "ENREGISTRE")
+        classe = statut if statut in STATUTS_BAGAGE_PROBLEME else None
+        niveau_meteo = analyse_vol["niveau_alerte_meteo"]
+        meteo = (
+            METEO_FAIBLE if niveau_meteo == "faible"
+            else METEO_CRITIQUE if niveau_meteo == "critique"
+            else METEO_DEGRADEE
+        )
+        porte = vol_data.get("porte_actuelle", "A1")
+        zone = self.topologie.zone_porte(porte)
+        cle = (classe, meteo, self.tranche(temps_disponible), position not in POSITIONS_SANS_SECURITE, zone)
+        decision = self._table.get(cle)
+        if decision is None:
+            # Zone hors configuration: compilée à la première rencontre
+            decision = self._table[cle] = self._compiler(cle)
+
+        recommandations = analyse_vol["recommandations"]
+        situation = self._modele(
+            ("situation", cle, temps_disponible, analyse_vol["perturbation_meteo"],
+             analyse_vol["changement_porte"], tuple(recommandations)),
+            lambda: SituationSchema(
+                type_trajet=decision.type_trajet,
+                niveau_urgence=decision.niveau_urgence,
+                probleme_bagage=decision.probleme_bagage,
+                perturbation_meteo=analyse_vol["perturbation_meteo"],
+                changement_porte=analyse_vol["changement_porte"],
+                temps_disponible=temps_disponible,
+                recommandations=list(recommandations)
+            )
+        )
+
+        # Instructions
+        if decision.instruction_bagage is not None:
+            instructions = [decision.instruction_bagage]
+        else:
+            instructions = []
+            if decision.securite:
+                instructions.append(self._instruction_securite(zone, decision.critique, vol_data))
+            if decision.attente is not None:
+                instructions.append(self._modele(
+                    ("attente", id(decision.attente), temps_disponible),
+                    lambda: InstructionSchema(temps_estime=temps_disponible - 25, **decision.attente)
+                ))
+            terminal = vol_data.get("terminal", "2")
+            heure_depart = vol_data.get("heure_depart")
+            instructions.append(self._modele(
+                ("porte", id(decision.porte), porte, terminal, heure_depart),
+                lambda: InstructionSchema(
+                    destination=f"Porte {porte}",
+                    details={"porte": porte, "terminal": terminal, "embarquement_prevu": heure_depart},
+                    **decision.porte
+                )
+            ))
+
+        # Alertes
+        alertes = []
+        if analyse_vol["changement_porte"]:
+            originale, actuelle = vol_data["porte_originale"], vol_data["porte_actuelle"]
+            alertes.append(self._modele(
+                ("changement_porte", originale, actuelle),
+                lambda: AlerteSchema(
+                    niveau="warning",
+                    message=f"Changement de porte: {originale} → {actuelle}",
+                    icon="alert-triangle",
+                    action_recommandee="Vérifiez les écrans d'information"
+                )
+            ))
+        if decision.alerte_meteo is not None:
+            conditions = ", ".join(meteo_data.get("impact", {}).get("conditions", []))
+            alertes.append(self._alerte(decision.alerte_meteo, conditions))
+        if decision.alerte_temps is not None:
+            alertes.append(self._alerte(decision.alerte_temps, temps_disponible))
+
+        return situation, instructions, alertes
+
+    def _alerte(self, modele: Dict[str, Any], valeur: Any) -> AlerteSchema:
+        return self._modele(
+            ("alerte", id(modele), valeur),
+            lambda: AlerteSchema(
+                niveau=modele["niveau"],
+                message=f"{modele['prefixe']}{valeur}{modele['suffixe']}",
+                icon=modele["icon"],
+                action_recommandee=modele["action_recommandee"]
+            )
+        )
+
+    def _modele(self, cle: Tuple, fabrique: Callable[[], BaseModel]) -> BaseModel:
+        """
+        Instance partagée d'un élément de réponse pour des valeurs données.
+
+        Les éléments ne dépendent que de quelques valeurs (temps disponible,
+        porte, horaire): la plupart des requêtes réutilisent une instance déjà
+        validée. Les schémas sont figés (frozen): une réponse ne peut pas modifier
+        l'instance d'une autre.
+        """
+        modele = self._modeles.get(cle)
+        if modele is None:
+            if len(self._modeles) >= self.taille_max_modeles:
+                self._modeles.clear()
+            modele = self._modeles[cle] = fabrique()
+        return modele
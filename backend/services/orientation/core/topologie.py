@@ -0,0 +1,171 @@
+import json
+import logging
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .path_optimizer import noeud_controle, noeud_porte, noeud_zone
+
+logger = logging.getLogger(__name__)
+
+# Plan livré avec le service (surchargé par TOPOLOGIE_FICHIER)
+FICHIER_DEFAUT = Path(__file__).resolve().parent.parent / "data" / "topologie.json"
+
+Coordonnees = Tuple[float, float]
+
+
+def _coordonnees(valeur: Any, contexte: str) -> Coordonnees:
+    if not isinstance(valeur, (list, tuple)) or len(valeur) != 2:
+        raise ValueError(f"{contexte}: coordonnées [x, y] attendues")
+    return float(valeur[0]), float(valeur[1])
+
+
+class Topologie:
+    """
+    Plan de l'aéroport figé, avec ses index précalculés.
+
+    Construit et validé une fois au chargement, jamais modifié ensuite: un
+    rechargement produit une nouvelle instance. À la requête, porte → zone,
+    zone → contrôles, zone → zones d'attente et point d'intérêt → coordonnées
+    sont des lectures de dictionnaire.
+    """
+
+    def __init__(self, donnees: Dict[str, Any]):
+        self.version = str(donnees.get("version", ""))
+        entree = donnees.get("entree", {})
+        self.nom_entree = entree.get("nom", "Entrée Terminal")
+
+        self.zones: Dict[str, Dict[str, Any]] = {}
+        self.zone_par_porte: Dict[str, str] = {}
+        self.coordonnees: Dict[str, Coordonnees] = {
+            "entree": _coordonnees(entree.get("coordonnees", (0, 0)), "entree")
+        }
+        zones = donnees.get("zones")
+        if not zones:
+            raise ValueError("Topologie sans zone")
+        for zone, config in zones.items():
+            portes = list(config.get("portes", []))
+            self.zones[zone] = {"portes": portes, "capacite": int(config.get("capacite", 0))}
+            x, y = self.coordonnees[noeud_zone(zone)] = _coordonnees(config.get("coordonnees"), f"zone {zone}")
+            explicites = config.get("coordonnees_portes", {})
+            for k, porte in enumerate(portes):
+                if porte in self.zone_par_porte:
+                    raise ValueError(f"Porte {porte} déclarée dans les zones {self.zone_par_porte[porte]} et {zone}")
+                self.zone_par_porte[porte] = zone
+                if porte in explicites:
+                    self.coordonnees[noeud_porte(porte)] = _coordonnees(explicites[porte], f"porte {porte}")
+                else:
+                    # Portes réparties de part et d'autre du hall de la zone
+                    self.coordonnees[noeud_porte(porte)] = (x + (k - (len(portes) - 1) / 2) * 60.0, y + 120.0)
+
+        self.couloirs: List[Tuple[str, str]] = []
+        for a, b in donnees.get("couloirs", []):
+            self._verifier_zone(a, "couloir")
+            self._verifier_zone(b, "couloir")
+            self.couloirs.append((a, b))
+
+        self.controles_securite: Dict[str, Dict[str, Any]] = {}
+        controles_par_zone: Dict[str, List[Tuple[str, Dict[str, Any]]]] = {zone: [] for zone in self.zones}
+        for id_controle, info in donnees.get("controles", {}).items():
+            desservies = list(info.get("zone_desservie", []))
+            for zone in desservies:
+                self._verifier_zone(zone, f"contrôle {id_controle}")
+            self.controles_securite[id_controle] = {
+                "temps_moyen": int(info["temps_moyen"]),
+                "position": info["position"],
+                "zone_desservie": desservies
+            }
+            self.coordonnees[noeud_controle(id_controle)] = _coordonnees(
+                info.get("coordonnees"), f"contrôle {id_controle}"
+            )
+            for zone in desservies:
+                controles_par_zone[zone].append((id_controle, self.controles_securite[id_controle]))
+        if not self.controles_securite:
+            raise ValueError("Topologie sans contrôle de sécurité")
+        # Zone desservie par aucun contrôle: tous les contrôles sont candidats
+        tous = list(self.controles_securite.items())
+        self.controles_par_zone = {zone: controles or tous for zone, controles in controles_par_zone.items()}
+        self._tous_controles = tous
+
+        self.attentes_par_zone: Dict[str, List[Dict[str, str]]] = {}
+        for attente in donnees.get("zones_attente", []):
+            zone = attente["zone"]
+            self._verifier_zone(zone, f"zone d'attente {attente.get('id')}")
+            if attente["id"] in self.coordonnees:
+                raise ValueError(f"Identifiant {attente['id']} déjà utilisé")
+            self.attentes_par_zone.setdefault(zone, []).append(
+                {"id": attente["id"], "nom": attente["nom"], "description": attente["description"]}
+            )
+            x, y = self.coordonnees[noeud_zone(zone)]
+            self.coordonnees[attente["id"]] = (
+                _coordonnees(attente["coordonnees"], f"zone d'attente {attente['id']}")
+                if "coordonnees" in attente else (x + 80.0, y - 50.0)
+            )
+        defaut = donnees.get("zone_attente_defaut")
+        if defaut not in self.attentes_par_zone:
+            raise ValueError(f"Zone d'attente par défaut {defaut} sans zone d'attente")
+        self.zone_attente_defaut = defaut
+
+    def _verifier_zone(self, zone: str, contexte: str):
+        if zone not in self.zones:
+            raise ValueError(f"{contexte}: zone {zone} inconnue")
+
+    @classmethod
+    def depuis_fichier(cls, chemin: Path) -> "Topologie":
+        """Charge et valide un plan JSON (ValueError si invalide)"""
+        try:
+            with open(chemin, encoding="utf-8") as f:
+                donnees = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            raise ValueError(f"Topologie illisible ({chemin}): {e}") from e
+        try:
+            return cls(donnees)
+        except (KeyError, TypeError, AttributeError) as e:
+            raise ValueError(f"Topologie invalide ({chemin}): {e!r}") from e
+
+    def zone_porte(self, porte: str) -> str:
+        """Zone d'une porte; pour une porte inconnue, son préfixe alphabétique (F99 → F)"""
+        zone = self.zone_par_porte.get(porte)
+        if zone is None:
+            zone = porte.rstrip("0123456789") or porte
+        return zone
+
+    def controles_zone(self, zone: str) -> List[Tuple[str, Dict[str, Any]]]:
+        """Contrôles desservant une zone (tous pour une zone inconnue)"""
+        return self.controles_par_zone.get(zone, self._tous_controles)
+
+    def zone_attente(self, zone: str) -> Dict[str, str]:
+        """Zone d'attente d'une zone de porte, sinon celle par défaut"""
+        attentes = self.attentes_par_zone.get(zone) or self.attentes_par_zone[self.zone_attente_defaut]
+        return attentes[0]
+
+    @property
+    def zones_attente(self) -> Dict[str, Dict[str, str]]:
+        """Première zone d'attente de chaque zone"""
+        return {zone: attentes[0] for zone, attentes in self.attentes_par_zone.items()}
+
+
+class RegistreTopologie:
+    """
+    Topologie courante, rechargeable à chaud.
+
+    Le nouveau plan est entièrement chargé et validé avant d'être publié d'une
+    seule affectation: un plan invalide laisse l'ancien en place.
+    """
+
+    def __init__(self, chemin: Optional[str] = None):
+        self.chemin = Path(chemin) if chemin else FICHIER_DEFAUT
+        self.courante = Topologie.depuis_fichier(self.chemin)
+        # Appelés avec chaque nouvelle topologie publiée
+        self.observateurs: List[Callable[[Topologie], None]] = []
+
+    def recharger(self) -> Topologie:
+        """Relit le fichier et publie la nouvelle topologie (ValueError si invalide)"""
+        topologie = Topologie.depuis_fichier(self.chemin)
+        for observateur in self.observateurs:
+            observateur(topologie)
+        self.courante = topologie
+        logger.info(
+            f"Topologie {topologie.version} chargée: {len(topologie.zones)} zones, "
+            f"{len(topologie.zone_par_porte)} portes"
+        )
+        return topologie
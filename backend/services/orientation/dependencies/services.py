@@ -1,41 +1,174 @@
 from functools import lru_cache
-from typing import Generator
+from typing import Optional
 from ..core.config import get_settings, Settings
+from ..core.admission import NOMS_PRIORITE, ControleAdmission
+from ..core.coalescence import Coalescence
 from ..core.decision_engine import DecisionEngine
+from ..core.occupation_zones import OccupationZones
+from ..core.topologie import RegistreTopologie
 from ..services.meteo_client import MeteoServiceClient
 from ..services.baggage_client import BagageServiceClient
 from ..services.vol_client import VolServiceClient
+from ..services.http_pool import ClientsAmont
+from ..abonnements import GestionnaireAbonnements
+from ..journal import JournalOrientations
+from ..metrics import observer_admission, observer_coalescence
+from ..prevision import PrevisionTerminal
+
+# Clients amont partagés, créés au démarrage (lifespan) et fermés à l'arrêt
+_clients_amont: Optional[ClientsAmont] = None
+# Abonnements temps réel, créés au premier abonné
+_abonnements: Optional[GestionnaireAbonnements] = None
+# Journal des orientations, démarré par le lifespan (absent sinon)
+_journal: Optional[JournalOrientations] = None
+# Alertes prédictives de saturation, démarrées par le lifespan (absentes sinon)
+_prevision: Optional[PrevisionTerminal] = None
+
+
+@lru_cache()
+def get_registre_topologie() -> RegistreTopologie:
+    """Retourne le registre de la topologie de l'aéroport"""
+    return RegistreTopologie(get_settings().TOPOLOGIE_FICHIER)
+
 
 @lru_cache()
 def get_decision_engine() -> DecisionEngine:
     """Retourne une instance du moteur de décision"""
     settings = get_settings()
-    return DecisionEngine(settings)
+    registre = get_registre_topologie()
+    engine = DecisionEngine(settings, registre.courante)
+    # Rechargement à chaud: le moteur bascule sur chaque nouvelle topologie
+    registre.observateurs.append(engine.appliquer_topologie)
+    return engine
+
 
-def get_meteo_client() -> Generator[MeteoServiceClient, None, None]:
-    """Retourne un client météo"""
+@lru_cache()
+def get_occupation_zones() -> OccupationZones:
+    """Retourne le suivi de l'occupation des zones"""
     settings = get_settings()
-    client = MeteoServiceClient(settings.METEO_SERVICE_URL)
-    try:
-        yield client
-    finally:
-        # Cleanup sera géré par FastAPI
-        pass
-
-def get_bagage_client() -> Generator[BagageServiceClient, None, None]:
-    """Retourne un client bagages"""
+    return OccupationZones(
+        fenetre_s=settings.OCCUPATION_FENETRE_S,
+        granularite_s=settings.OCCUPATION_GRANULARITE_S
+    )
+
+
+@lru_cache()
+def get_coalescence_orientations() -> Coalescence:
+    """Retourne le regroupement des orientations identiques en cours"""
+    coalescence = Coalescence("orientation")
+    observer_coalescence(coalescence)
+    return coalescence
+
+
+@lru_cache()
+def get_admission() -> ControleAdmission:
+    """Retourne le contrôle d'admission des orientations"""
     settings = get_settings()
-    client = BagageServiceClient(settings.BAGAGE_SERVICE_URL)
-    try:
-        yield client
-    finally:
-        pass
-
-def get_vol_client() -> Generator[VolServiceClient, None, None]:
-    """Retourne un client vols"""
+    admission = ControleAdmission(
+        settings.ADMISSION_CONCURRENCE_MAX,
+        settings.ADMISSION_FILE_MAX,
+        [settings.ADMISSION_ATTENTE_MAX_S[nom] for nom in NOMS_PRIORITE]
+    )
+    observer_admission(admission)
+    return admission
+
+
+def demarrer_clients_amont() -> ClientsAmont:
+    """Crée les clients amont partagés (idempotent)"""
+    global _clients_amont
+    if _clients_amont is None:
+        _clients_amont = ClientsAmont(get_settings())
+    return _clients_amont
+
+
+async def fermer_clients_amont():
+    """Ferme les pools de connexions des clients amont"""
+    global _clients_amont
+    if _clients_amont is not None:
+        await _clients_amont.close()
+        _clients_amont = None
+
+
+def get_clients_amont() -> ClientsAmont:
+    """Retourne les clients amont (créés à la demande si le lifespan n'a pas tourné)"""
+    return demarrer_clients_amont()
+
+
+def get_meteo_client() -> MeteoServiceClient:
+    """Retourne le client météo partagé"""
+    return get_clients_amont().meteo
+
+
+def get_bagage_client() -> BagageServiceClient:
+    """Retourne le client bagages partagé"""
+    return get_clients_amont().bagage
+
+
+def get_vol_client() -> VolServiceClient:
+    """Retourne le client vols partagé"""
+    return get_clients_amont().vol
+
+
+def get_gestionnaire_abonnements() -> GestionnaireAbonnements:
+    """Retourne le gestionnaire des abonnements temps réel"""
+    global _abonnements
+    if _abonnements is None:
+        clients = get_clients_amont()
+        _abonnements = GestionnaireAbonnements(
+            get_settings(), get_decision_engine(), clients.meteo, clients.bagage, clients.vol, get_journal()
+        )
+    return _abonnements
+
+
+async def fermer_abonnements():
+    """Arrête la revalidation des abonnements"""
+    global _abonnements
+    if _abonnements is not None:
+        await _abonnements.fermer()
+        _abonnements = None
+
+
+def demarrer_journal() -> Optional[JournalOrientations]:
+    """Démarre l'écrivain du journal des orientations (si activé)"""
+    global _journal
     settings = get_settings()
-    client = VolServiceClient(settings.VOL_SERVICE_URL)
-    try:
-        yield client
-    finally:
-        pass
+    if _journal is None and settings.JOURNAL_ACTIF:
+        from libs.common.database import AsyncSessionLocal
+        _journal = JournalOrientations(settings, AsyncSessionLocal)
+        _journal.demarrer()
+    return _journal
+
+
+def get_journal() -> Optional[JournalOrientations]:
+    """Retourne le journal des orientations, None s'il n'est pas démarré"""
+    return _journal
+
+
+async def fermer_journal():
+    """Vide la file du journal en base puis arrête l'écrivain"""
+    global _journal
+    if _journal is not None:
+        await _journal.fermer()
+        _journal = None
+
+
+def demarrer_prevision() -> PrevisionTerminal:
+    """Démarre la prévision périodique de saturation des zones"""
+    global _prevision
+    if _prevision is None:
+        _prevision = PrevisionTerminal(get_settings(), get_decision_engine(), get_occupation_zones())
+        _prevision.demarrer()
+    return _prevision
+
+
+def get_prevision() -> Optional[PrevisionTerminal]:
+    """Retourne la prévision de saturation, None si elle n'est pas démarrée"""
+    return _prevision
+
+
+async def fermer_prevision():
+    """Arrête la prévision de saturation"""
+    global _prevision
+    if _prevision is not None:
+        await _prevision.fermer()
+        _prevision = None
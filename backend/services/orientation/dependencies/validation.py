@@ -7,12 +7,16 @@ class OrientationValidator:
     @staticmethod
     def validate_numero_vol(numero_vol: str) -> str:
         """Valide le format du numéro de vol"""
-        if not numero_vol or len(numero_vol) < 5:
+        numero_vol = numero_vol.strip() if numero_vol else ""
+        if (
+            not 5 <= len(numero_vol) <= 10
+            or not numero_vol.replace('-', '').replace('_', '').isalnum()
+        ):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Numéro de vol invalide"
             )
-        return numero_vol.upper().strip()
+        return numero_vol.upper()
     
     @staticmethod
     def validate_id_bagage(id_bagage: str) -> str:
@@ -22,7 +26,8 @@ class OrientationValidator:
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="ID bagage invalide"
             )
-        return id_bagage.strip()
+        # Même forme que les événements bagage (abonnements, caches)
+        return id_bagage.upper().strip()
     
     @staticmethod
     def validate_position(position: Optional[str]) -> Optional[str]:
@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import time
+from datetime import timezone
+from typing import Any, AsyncContextManager, Callable, Dict, List, Optional
+
+from sqlalchemy import insert
+
+from .core.config import Settings
+from .models.orientation import NiveauUrgence, OrientationLog, StatutBagage
+from .schemas.orientation import OrientationResponse
+
+logger = logging.getLogger(__name__)
+
+_STATUTS_BAGAGE = {statut.value: statut for statut in StatutBagage}
+
+
+class JournalOrientations:
+    """
+    Historique des orientations, écrit en base hors du chemin des requêtes.
+
+    `enregistrer` dépose l'orientation dans une file bornée sans attendre; une
+    tâche de fond la vide par insertions groupées, dès que `JOURNAL_LOT_MAX`
+    lignes sont prêtes ou `JOURNAL_DELAI_S` après la première. File pleine:
+    l'orientation est abandonnée et comptée (la requête n'est jamais ralentie).
+    À l'arrêt, la file est vidée dans la limite de `JOURNAL_ARRET_DELAI_S`.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        fabrique_session: Callable[[], AsyncContextManager[Any]]
+    ):
+        self.settings = settings
+        self.fabrique_session = fabrique_session
+        self._file: asyncio.Queue = asyncio.Queue(maxsize=settings.JOURNAL_FILE_MAX)
+        self._tache: Optional[asyncio.Task] = None
+        # Lot en cours de constitution et écriture en cours, repris à l'arrêt
+        self._lot: List = []
+        self._ecriture: Optional[asyncio.Future] = None
+        # Compteurs: reçues, écrites, abandonnées (file pleine), perdues (échec d'écriture)
+        self.recues = 0
+        self.ecrites = 0
+        self.abandonnees = 0
+        self.perdues = 0
+        self.lots = 0
+
+    def statistiques(self) -> Dict[str, int]:
+        return {
+            "en_attente": self._file.qsize(),
+            "recues": self.recues,
+            "ecrites": self.ecrites,
+            "abandonnees": self.abandonnees,
+            "perdues": self.perdues,
+            "lots": self.lots
+        }
+
+    def enregistrer(
+        self,
+        numero_vol: str,
+        id_bagage: str,
+        position_estimee: Optional[str],
+        reponse: OrientationResponse,
+        meteo_data: Dict[str, Any],
+        bagage_data: Dict[str, Any]
+    ) -> bool:
+        """Dépose une orientation à journaliser; False si elle est abandonnée"""
+        self.recues += 1
+        try:
+            # Conversion en ligne différée à l'écriture, hors requête
+            self._file.put_nowait((
+                numero_vol, id_bagage, position_estimee, reponse,
+                meteo_data.get("impact"), bagage_data.get("statut")
+            ))
+        except asyncio.QueueFull:
+            self.abandonnees += 1
+            if self.abandonnees % 1000 == 1:
+                logger.warning(f"Journal des orientations saturé: {self.abandonnees} orientations abandonnées")
+            return False
+        return True
+
+    def demarrer(self):
+        if self._tache is None or self._tache.done():
+            self._tache = asyncio.create_task(self._boucle())
+
+    async def fermer(self):
+        """Arrête l'écrivain après avoir vidé la file (délai borné)"""
+        if self._tache is None:
+            return
+        self._tache.cancel()
+        try:
+            await self._tache
+        except asyncio.CancelledError:
+            pass
+        self._tache = None
+
+        try:
+            await asyncio.wait_for(self._vider(), timeout=self.settings.JOURNAL_ARRET_DELAI_S)
+        except asyncio.TimeoutError:
+            restantes = self._file.qsize() + len(self._lot)
+            self.perdues += restantes
+            logger.warning(f"Arrêt du journal: {restantes} orientations non écrites")
+
+    async def _vider(self):
+        if self._ecriture is not None:
+            await self._ecriture
+            self._ecriture = None
+        await self._ecrire(self._prendre_lot(self._lot))
+        self._lot = []
+        while not self._file.empty():
+            await self._ecrire(self._prendre_lot())
+
+    def _prendre_lot(self, lot: Optional[List] = None) -> List:
+        lot = lot if lot is not None else []
+        while len(lot) < self.settings.JOURNAL_LOT_MAX and not self._file.empty():
+            lot.append(self._file.get_nowait())
+        return lot
+
+    async def _boucle(self):
+        """Regroupe les orientations par taille ou par délai et les écrit"""
+        lot_max = self.settings.JOURNAL_LOT_MAX
+        delai = self.settings.JOURNAL_DELAI_S
+        while True:
+            self._lot.append(await self._file.get())
+            echeance = time.monotonic() + delai
+            while len(self._lot) < lot_max:
+                self._prendre_lot(self._lot)
+                restant = echeance - time.monotonic()
+                if len(self._lot) >= lot_max or restant <= 0:
+                    break
+                try:
+                    self._lot.append(await asyncio.wait_for(self._file.get(), timeout=restant))
+                except asyncio.TimeoutError:
+                    break
+            lot, self._lot = self._lot, []
+            # Une annulation (arrêt) n'interrompt pas l'écriture en cours
+            self._ecriture = asyncio.ensure_future(self._ecrire(lot))
+            await asyncio.shield(self._ecriture)
+            self._ecriture = None
+
+    async def _ecrire(self, lot: List):
+        if not lot:
+            return
+        try:
+            lignes = [self._ligne(*element) for element in lot]
+            async with self.fabrique_session() as session:
+                await session.execute(insert(OrientationLog), lignes)
+                await session.commit()
+        except Exception as e:
+            self.perdues += len(lot)
+            logger.error(f"Écriture du journal des orientations échouée ({len(lot)} lignes): {e}")
+            return
+        self.ecrites += len(lot)
+        self.lots += 1
+
+    @staticmethod
+    def _ligne(
+        numero_vol: str,
+        id_bagage: str,
+        position_estimee: Optional[str],
+        reponse: OrientationResponse,
+        impact_meteo: Optional[Dict[str, Any]],
+        statut_bagage: Optional[str]
+    ) -> Dict[str, Any]:
+        situation = reponse.situation
+        horodatage = reponse.timestamp
+        if horodatage.tzinfo is not None:
+            horodatage = horodatage.astimezone(timezone.utc).replace(tzinfo=None)
+        return {
+            "numero_vol": numero_vol,
+            "id_bagage": id_bagage,
+            "position_estimee": position_estimee,
+            "niveau_urgence": NiveauUrgence(situation.niveau_urgence),
+            "instructions": [i.model_dump(mode="json") for i in reponse.instructions],
+            "parcours": [e.model_dump(mode="json") for e in reponse.parcours],
+            "alertes": [a.model_dump(mode="json") for a in reponse.alertes],
+            "impact_meteo": impact_meteo,
+            "statut_bagage": _STATUTS_BAGAGE.get(statut_bagage),
+            "temps_disponible": situation.temps_disponible,
+            "created_at": horodatage,
+            "updated_at": horodatage
+        }
@@ -4,21 +4,41 @@ from contextlib import asynccontextmanager
 import logging
 
 from .core.config import get_settings
-from .routers import orientation
+from .routers import orientation, admin
+from . import metrics
 from .middleware.logging import setup_logging
+from .dependencies.services import (
+    demarrer_clients_amont,
+    demarrer_journal,
+    demarrer_prevision,
+    fermer_abonnements,
+    fermer_clients_amont,
+    fermer_journal,
+    fermer_prevision
+)
+
+settings = get_settings()
 
 # Configuration du logging
-setup_logging()
+setup_logging(settings.LOG_LEVEL)
 logger = logging.getLogger(__name__)
 
-settings = get_settings()
-
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Gestion du cycle de vie de l'application"""
     logger.info(f"Démarrage du service {settings.SERVICE_NAME} v{settings.VERSION}")
+    # Pools de connexions partagés vers les services amont
+    demarrer_clients_amont()
+    # Historique des orientations, écrit en base par lots
+    demarrer_journal()
+    # Alertes prédictives de saturation des zones
+    demarrer_prevision()
     yield
+    await fermer_prevision()
+    await fermer_abonnements()
+    await fermer_journal()
+    await fermer_clients_amont()
     logger.info("Arrêt du service")
 
 
@@ -42,7 +62,9 @@ app.add_middleware(
 )
 
 # Inclusion des routers
+app.include_router(admin.router)
 app.include_router(orientation.router)
+app.include_router(metrics.router)
 
 
 @app.get("/", tags=["Root"])
@@ -2,8 +2,8 @@ import logging
 import sys
 from datetime import datetime
 
-def setup_logging():
-    """Configure le système de logging"""
+def setup_logging(niveau: str = "INFO"):
+    """Configure le système de logging (détail par requête au niveau DEBUG)"""
     
     # Format des logs
     log_format = (
@@ -13,7 +13,7 @@ def setup_logging():
     
     # Configuration du logger racine
     logging.basicConfig(
-        level=logging.INFO,
+        level=niveau.upper(),
         format=log_format,
         handlers=[
             logging.StreamHandler(sys.stdout),
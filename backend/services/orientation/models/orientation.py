@@ -1,9 +1,8 @@
 from sqlalchemy import Column, String, Integer, Float, DateTime, JSON, Enum
-from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 import enum
 
-Base = declarative_base()
+from libs.common.base import Base
 
 class NiveauUrgence(str, enum.Enum):
     FAIBLE = "faible"
@@ -33,7 +32,7 @@ class OrientationLog(Base):
     
     # Contexte
     impact_meteo = Column(JSON, nullable=True)
-    statut_bagage = Column(Enum(StatutBagage), nullable=False)
+    statut_bagage = Column(Enum(StatutBagage), nullable=True)  # None si statut inconnu
     temps_disponible = Column(Integer, nullable=False)  # en minutes
     
     # Métadonnées
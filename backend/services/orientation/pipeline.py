@@ -0,0 +1,333 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from fastapi import HTTPException, status
+
+from .core.admission import CRITIQUE, ELEVEE, NORMALE
+from .core.config import Settings
+from .core.decision_engine import DecisionEngine
+from .core.table_decision import STATUTS_BAGAGE_PROBLEME
+from .dependencies.validation import OrientationValidator
+from .journal import JournalOrientations
+from .schemas.orientation import (
+    OrientationResponse,
+    OrientationBatchItem,
+    PassagerLotSchema,
+    EtapeParcoursSchema
+)
+from .services.meteo_client import MeteoServiceClient, meteo_par_defaut
+from .services.baggage_client import BagageServiceClient, bagage_par_defaut
+from .services.vol_client import VolServiceClient
+from .metrics import ETAPES, REPLIS, compter_urgence
+
+logger = logging.getLogger(__name__)
+
+
+async def _appel_borne(
+    nom: str,
+    appel: Awaitable[Dict[str, Any]],
+    delai: float,
+    defaut: Callable[[], Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Exécute un appel amont borné dans le temps, avec repli sur une valeur par défaut"""
+    debut = time.perf_counter()
+    try:
+        return await asyncio.wait_for(appel, timeout=delai)
+    except asyncio.TimeoutError:
+        logger.warning(f"Service {nom} hors délai ({delai:.2f}s), valeur par défaut utilisée")
+        REPLIS.labels(nom, "hors_delai").inc()
+        return defaut()
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Erreur service {nom}: {e}, valeur par défaut utilisée")
+        REPLIS.labels(nom, "erreur").inc()
+        return defaut()
+    finally:
+        # Cache compris: la durée vue par la requête
+        ETAPES[f"amont_{nom}"].observe(time.perf_counter() - debut)
+
+
+def _vol_indisponible(numero_vol: str) -> Callable[[], Dict[str, Any]]:
+    """Le vol n'a pas de valeur par défaut: sans lui, pas d'orientation possible"""
+    def _lever() -> Dict[str, Any]:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=f"Service vols indisponible pour le vol {numero_vol}"
+        )
+    return _lever
+
+
+async def collecter_donnees(
+    settings: Settings,
+    meteo_client: MeteoServiceClient,
+    bagage_client: BagageServiceClient,
+    vol_client: VolServiceClient,
+    numero_vol: str,
+    id_bagage: str
+) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+    """
+    Récupère météo, bagage et vol en parallèle.
+
+    Chaque service amont a son propre délai, plafonné par le budget total
+    de la requête. Un service météo ou bagages en retard est remplacé par sa
+    valeur par défaut; un vol indisponible interrompt la requête.
+    """
+    budget = settings.BUDGET_ORIENTATION_S
+
+    meteo_data, bagage_data, vol_data = await asyncio.gather(
+        _appel_borne(
+            "meteo",
+            meteo_client.get_meteo_summary(),
+            min(settings.TIMEOUT_METEO_S, budget),
+            meteo_par_defaut
+        ),
+        _appel_borne(
+            "bagages",
+            bagage_client.get_bagage_status(id_bagage),
+            min(settings.TIMEOUT_BAGAGE_S, budget),
+            lambda: bagage_par_defaut(id_bagage)
+        ),
+        _appel_borne(
+            "vols",
+            vol_client.get_vol_info(numero_vol),
+            min(settings.TIMEOUT_VOL_S, budget),
+            _vol_indisponible(numero_vol)
+        ),
+        return_exceptions=True
+    )
+
+    # Seul le vol peut lever (pas de repli possible)
+    for resultat in (vol_data, meteo_data, bagage_data):
+        if isinstance(resultat, BaseException):
+            raise resultat
+
+    return meteo_data, bagage_data, vol_data
+
+
+async def charger_meteo(settings: Settings, meteo_client: MeteoServiceClient) -> Dict[str, Any]:
+    """Lecture bornée du résumé météo pour les traitements groupés"""
+    return await _appel_borne(
+        "meteo",
+        meteo_client.get_meteo_summary(),
+        settings.TIMEOUT_METEO_S,
+        meteo_par_defaut
+    )
+
+
+async def charger_vol(
+    settings: Settings,
+    vol_client: VolServiceClient,
+    numero_vol: str
+) -> Tuple[str, Union[Dict[str, Any], HTTPException]]:
+    """Lecture bornée d'un vol pour les traitements groupés (l'erreur est retournée, pas levée)"""
+    try:
+        vol_data = await _appel_borne(
+            "vols",
+            vol_client.get_vol_info(numero_vol),
+            settings.TIMEOUT_VOL_S,
+            _vol_indisponible(numero_vol)
+        )
+    except HTTPException as e:
+        return numero_vol, e
+    return numero_vol, vol_data
+
+
+def calculer_orientation(
+    decision_engine: DecisionEngine,
+    numero_vol: str,
+    position_estimee: Optional[str],
+    meteo_data: Dict[str, Any],
+    bagage_data: Dict[str, Any],
+    vol_data: Dict[str, Any]
+) -> OrientationResponse:
+    """Calcule l'orientation d'un passager à partir des données amont"""
+    debut = time.perf_counter()
+    # Congestion météo sur le graphe du terminal (sans effet si inchangée)
+    decision_engine.appliquer_meteo(meteo_data)
+    t_congestion = time.perf_counter()
+
+    # Situation, instructions et alertes: lecture de la table de décision
+    situation, instructions, alertes = decision_engine.table.evaluer(
+        meteo_data, bagage_data, vol_data, position_estimee
+    )
+    t_situation = time.perf_counter()
+
+    # Génération du parcours
+    parcours = decision_engine.generer_parcours_jitb(
+        {"niveau_urgence": situation.niveau_urgence, "temps_disponible": situation.temps_disponible},
+        vol_data,
+        position_estimee
+    )
+    t_parcours = time.perf_counter()
+
+    reponse = OrientationResponse(
+        success=True,
+        numero_vol=numero_vol,
+        timestamp=datetime.now(timezone.utc), # Use timezone-aware datetime
+        situation=situation,
+        instructions=instructions,
+        alertes=alertes,
+        parcours=[EtapeParcoursSchema(**etape) for etape in parcours]
+    )
+    fin = time.perf_counter()
+    ETAPES["congestion"].observe(t_congestion - debut)
+    ETAPES["situation"].observe(t_situation - t_congestion)
+    ETAPES["parcours"].observe(t_parcours - t_situation)
+    ETAPES["reponse"].observe(fin - t_parcours)
+    compter_urgence(situation.niveau_urgence)
+    return reponse
+
+
+def priorite_orientation(
+    settings: Settings,
+    vol_client: VolServiceClient,
+    bagage_client: BagageServiceClient,
+    numero_vol: str,
+    id_bagage: str
+) -> int:
+    """
+    Priorité d'admission d'une requête, estimée sans appel amont.
+
+    D'après les dernières données connues: problème bagage ou départ à moins
+    de TEMPS_CRITIQUE_MIN, critique; départ à moins de TEMPS_URGENT_MIN ou
+    vol encore inconnu, élevée; sinon normale.
+    """
+    bagage = bagage_client.derniers_bons.get(id_bagage)
+    if bagage is not None and bagage.get("statut") in STATUTS_BAGAGE_PROBLEME:
+        return CRITIQUE
+    vol_data = vol_client.derniers_bons.get(numero_vol)
+    if vol_data is None:
+        return ELEVEE
+    temps_disponible = DecisionEngine._minutes_avant(DecisionEngine._lire_heure_depart(vol_data))
+    if temps_disponible < settings.TEMPS_CRITIQUE_MIN:
+        return CRITIQUE
+    if temps_disponible < settings.TEMPS_URGENT_MIN:
+        return ELEVEE
+    return NORMALE
+
+
+def orientation_degradee(
+    decision_engine: DecisionEngine,
+    meteo_client: MeteoServiceClient,
+    bagage_client: BagageServiceClient,
+    vol_client: VolServiceClient,
+    numero_vol: str,
+    id_bagage: str,
+    position_estimee: Optional[str]
+) -> Optional[Tuple[OrientationResponse, Dict[str, Any], Dict[str, Any], Dict[str, Any]]]:
+    """
+    Orientation calculée sur les seules dernières données connues, sans
+    appel amont (requête délestée). None si le vol n'a jamais été lu.
+    """
+    vol_data = vol_client.derniers_bons.get(numero_vol)
+    if vol_data is None:
+        return None
+    meteo_data = meteo_client.dernier_resume or meteo_par_defaut()
+    bagage_data = bagage_client.derniers_bons.get(id_bagage) or bagage_par_defaut(id_bagage)
+    reponse = calculer_orientation(
+        decision_engine, numero_vol, position_estimee, meteo_data, bagage_data, vol_data
+    )
+    return reponse, meteo_data, bagage_data, vol_data
+
+
+def duree_cache_s(settings: Settings, reponse: OrientationResponse) -> int:
+    """
+    Durée de fraîcheur HTTP (max-age) d'une orientation.
+
+    Longue pour un passager ayant des heures devant lui, courte près de
+    l'embarquement. Au-delà, le client revalide par ETag.
+    """
+    situation = reponse.situation
+    if situation.niveau_urgence == "faible" and situation.temps_disponible >= settings.CACHE_HTTP_LONG_MIN:
+        return settings.CACHE_HTTP_MAX_AGE_LONG_S
+    return settings.CACHE_HTTP_MAX_AGE_S.get(situation.niveau_urgence, 0)
+
+
+async def orienter_lot(
+    settings: Settings,
+    decision_engine: DecisionEngine,
+    meteo_client: MeteoServiceClient,
+    bagage_client: BagageServiceClient,
+    vol_client: VolServiceClient,
+    passagers: List[PassagerLotSchema],
+    journal: Optional[JournalOrientations] = None
+) -> AsyncIterator[OrientationBatchItem]:
+    """
+    Calcule l'orientation d'une liste de passagers.
+
+    Les appels amont sont dédoublonnés: une seule lecture météo, une lecture
+    par vol distinct et une lecture groupée des bagages. Les résultats sont
+    produits vol par vol, dès que les données de chaque vol sont disponibles.
+    Les orientations calculées sont déposées dans le journal (si actif).
+    """
+    groupes: Dict[str, List[Tuple[int, str, Optional[str]]]] = {}
+    for index, passager in enumerate(passagers):
+        try:
+            numero_vol = OrientationValidator.validate_numero_vol(passager.numero_vol)
+            id_bagage = OrientationValidator.validate_id_bagage(passager.id_bagage)
+            position = OrientationValidator.validate_position(passager.position_estimee)
+        except HTTPException as e:
+            yield OrientationBatchItem(
+                index=index,
+                numero_vol=passager.numero_vol,
+                id_bagage=passager.id_bagage,
+                status_code=e.status_code,
+                erreur=e.detail
+            )
+            continue
+        groupes.setdefault(numero_vol, []).append((index, id_bagage, position))
+
+    if not groupes:
+        return
+
+    taches_vols = [
+        asyncio.ensure_future(charger_vol(settings, vol_client, numero_vol))
+        for numero_vol in groupes
+    ]
+    ids_bagage = [id_bagage for membres in groupes.values() for _, id_bagage, _ in membres]
+
+    meteo_data, bagages = await asyncio.gather(
+        charger_meteo(settings, meteo_client),
+        bagage_client.get_bagages_status(
+            ids_bagage,
+            concurrence_max=settings.BATCH_CONCURRENCE_BAGAGES,
+            delai_s=settings.TIMEOUT_BAGAGE_S
+        )
+    )
+
+    for prochain in asyncio.as_completed(taches_vols):
+        numero_vol, vol_data = await prochain
+        for index, id_bagage, position in groupes[numero_vol]:
+            item = OrientationBatchItem(
+                index=index,
+                numero_vol=numero_vol,
+                id_bagage=id_bagage,
+                status_code=status.HTTP_200_OK
+            )
+            if isinstance(vol_data, HTTPException):
+                item.status_code = vol_data.status_code
+                item.erreur = vol_data.detail
+            else:
+                try:
+                    item.orientation = calculer_orientation(
+                        decision_engine,
+                        numero_vol,
+                        position,
+                        meteo_data,
+                        bagages[id_bagage],
+                        vol_data
+                    )
+                except Exception as e:
+                    logger.error(f"Erreur orientation {numero_vol}/{id_bagage}: {e}", exc_info=True)
+                    item.status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+                    item.erreur = "Erreur lors du calcul de l'orientation"
+                else:
+                    if journal is not None:
+                        journal.enregistrer(
+                            numero_vol, id_bagage, position, item.orientation, meteo_data, bagages[id_bagage]
+                        )
+            yield item
@@ -0,0 +1,151 @@
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .core.config import Settings
+from .core.decision_engine import DecisionEngine
+from .core.occupation_zones import OccupationZones
+from .core.prevision_saturation import PrevisionSaturation, sorties_programmees
+
+logger = logging.getLogger(__name__)
+
+
+class PrevisionTerminal:
+    """
+    Alertes prédictives de saturation des zones d'embarquement.
+
+    Toutes les `PREVISION_PAS_S` secondes, l'occupation courante des zones de
+    la topologie est intégrée au lissage (une observation par pas), puis
+    projetée à chaque horizon de `PREVISION_HORIZONS_MIN`, déduction faite
+    des passagers des vols qui auront quitté leur zone de porte d'ici là.
+    Le programme des vols est alimenté par les orientations (porte et heure
+    de départ du vol demandé).
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        decision_engine: DecisionEngine,
+        occupation: OccupationZones,
+        horloge: Callable[[], float] = time.time
+    ):
+        self.settings = settings
+        self.decision_engine = decision_engine
+        self.occupation = occupation
+        self._horloge = horloge
+        # Vol -> (porte, heure de départ en secondes epoch)
+        self.programme: Dict[str, Tuple[str, float]] = {}
+        self.modele: Optional[PrevisionSaturation] = None
+        self.prevision: Optional[np.ndarray] = None
+        self.alertes: List[Dict[str, Any]] = []
+        self.calcule_a: Optional[float] = None
+        self._tache: Optional[asyncio.Task] = None
+
+    def noter_vol(self, numero_vol: str, porte: str, heure_depart: float):
+        """Ajoute ou met à jour un vol du programme (heure de départ en secondes epoch)"""
+        self.programme[numero_vol] = (porte, heure_depart)
+
+    def _modele(self) -> PrevisionSaturation:
+        """
+        Modèle aligné sur les zones de la topologie courante: réinitialisé si
+        elles changent, capacités reprises à chaque pas (rechargement à chaud)
+        sans perdre le lissage.
+        """
+        zones = self.decision_engine.topologie.zones
+        capacites = [config["capacite"] for config in zones.values()]
+        if self.modele is None or self.modele.zones != list(zones):
+            settings = self.settings
+            self.modele = PrevisionSaturation(
+                list(zones),
+                capacites,
+                pas_min=settings.PREVISION_PAS_S / 60,
+                horizons_min=settings.PREVISION_HORIZONS_MIN,
+                alpha=settings.PREVISION_ALPHA,
+                beta=settings.PREVISION_BETA,
+                amortissement=settings.PREVISION_AMORTISSEMENT,
+                seuil=settings.PREVISION_SEUIL
+            )
+        elif not np.array_equal(self.modele.capacites, capacites):
+            self.modele.capacites = np.asarray(capacites, dtype=float)
+        return self.modele
+
+    def _sorties(self, modele: PrevisionSaturation, maintenant: float) -> np.ndarray:
+        """Départs attendus par zone et par horizon; les vols partis sont retirés du programme"""
+        topologie = self.decision_engine.topologie
+        zones, minutes, passagers = [], [], []
+        for numero_vol, (porte, heure_depart) in list(self.programme.items()):
+            if heure_depart <= maintenant:
+                del self.programme[numero_vol]
+                continue
+            zone = topologie.zone_porte(porte)
+            i = modele.index.get(zone)
+            if i is None:
+                continue
+            nombre = self.occupation.par_vol.get(numero_vol, {}).get(zone, 0)
+            if nombre:
+                zones.append(i)
+                minutes.append((heure_depart - maintenant) / 60)
+                passagers.append(nombre)
+        return sorties_programmees(
+            len(modele.zones),
+            modele.horizons_min,
+            np.asarray(zones, dtype=np.intp),
+            np.asarray(minutes, dtype=float),
+            np.asarray(passagers, dtype=float)
+        )
+
+    def calculer(self) -> List[Dict[str, Any]]:
+        """Un pas de prévision: observation, projection et alertes"""
+        modele = self._modele()
+        presents = self.occupation.instantane()
+        modele.mettre_a_jour(np.array([presents.get(zone, 0) for zone in modele.zones], dtype=float))
+        maintenant = self._horloge()
+        self.prevision = modele.prevoir(self._sorties(modele, maintenant))
+        anciennes = {alerte["zone"] for alerte in self.alertes}
+        self.alertes = modele.alertes(self.prevision)
+        self.calcule_a = maintenant
+        for alerte in self.alertes:
+            if alerte["zone"] not in anciennes:
+                logger.warning(
+                    f"Saturation prévue zone {alerte['zone']} dans {alerte['horizon_min']} min: "
+                    f"{alerte['occupation_prevue']:.0f}/{alerte['capacite']:.0f} passagers"
+                )
+        return self.alertes
+
+    def etat(self) -> Dict[str, Any]:
+        """Dernière prévision par zone et alertes en cours"""
+        if self.modele is None or self.prevision is None:
+            return {"calcule_a": None, "horizons_min": list(self.settings.PREVISION_HORIZONS_MIN), "zones": {}, "alertes": []}
+        return {
+            "calcule_a": self.calcule_a,
+            "horizons_min": [int(h) for h in self.modele.horizons_min],
+            "zones": {
+                zone: [round(float(v), 1) for v in self.prevision[i]]
+                for i, zone in enumerate(self.modele.zones)
+            },
+            "alertes": self.alertes
+        }
+
+    def demarrer(self):
+        if self._tache is None or self._tache.done():
+            self._tache = asyncio.create_task(self._boucle())
+
+    async def fermer(self):
+        if self._tache is not None:
+            self._tache.cancel()
+            try:
+                await self._tache
+            except asyncio.CancelledError:
+                pass
+            self._tache = None
+
+    async def _boucle(self):
+        while True:
+            await asyncio.sleep(self.settings.PREVISION_PAS_S)
+            try:
+                self.calculer()
+            except Exception as e:
+                logger.error(f"Erreur de prévision de saturation: {e}", exc_info=True)
@@ -0,0 +1,313 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+import logging
+import math
+
+from services.auth.dependencies.permissions import allow
+from services.auth.core.roles import UserRole
+from ..schemas.orientation import (
+    EvenementVolSchema,
+    MiseAJourAreteSchema,
+    PositionPassagerSchema,
+    ReleveControleSchema
+)
+from ..core.coalescence import Coalescence
+from ..core.decision_engine import DecisionEngine
+from ..core.index_inverse import CONTROLE, dependances_noeud
+from ..core.occupation_zones import ZONE_ENTREE, ZONE_SECURITE, OccupationZones
+from ..core.topologie import RegistreTopologie
+from ..services.baggage_client import BagageServiceClient
+from ..services.meteo_client import MeteoServiceClient
+from ..services.vol_client import VolServiceClient
+from ..abonnements import GestionnaireAbonnements
+from ..journal import JournalOrientations
+from ..prevision import PrevisionTerminal
+from ..dependencies.validation import OrientationValidator
+from ..dependencies.services import (
+    get_bagage_client,
+    get_coalescence_orientations,
+    get_decision_engine,
+    get_gestionnaire_abonnements,
+    get_journal,
+    get_meteo_client,
+    get_occupation_zones,
+    get_prevision,
+    get_registre_topologie,
+    get_vol_client
+)
+
+
+# Réservé aux administrateurs: ces routes modifient l'orientation de tous les passagers
+router = APIRouter(
+    prefix="/api/orientation/admin",
+    tags=["Administration"],
+    dependencies=[Depends(allow(UserRole.ADMIN))]
+)
+
+logger = logging.getLogger(__name__)
+
+
+@router.post(
+    "/vols/{numero_vol}/evenements",
+    summary="Signaler un événement vol",
+    description=(
+        "Invalide le vol en cache suite à un changement de porte, un retard ou une annulation; "
+        "la nouvelle porte et la nouvelle heure de départ, si fournies, sont reprises aussitôt"
+    )
+)
+async def signaler_evenement_vol(
+    numero_vol: str,
+    evenement: EvenementVolSchema,
+    vol_client: VolServiceClient = Depends(get_vol_client),
+    abonnements: GestionnaireAbonnements = Depends(get_gestionnaire_abonnements)
+):
+    """Hook d'invalidation appelé par les événements de vol"""
+    numero_vol = numero_vol.upper().strip()
+    logger.info(f"Événement {evenement.type.value} reçu pour le vol {numero_vol}")
+    # Ce worker, le cache partagé et les autres workers; les valeurs portées
+    # par l'événement réamorcent les caches
+    changements = evenement.model_dump(
+        mode="json", include={"porte_actuelle", "heure_depart"}, exclude_none=True
+    )
+    invalide = await vol_client.invalider_partout(numero_vol, changements)
+    # Les passagers abonnés au vol reçoivent leur nouvelle orientation
+    abonnements.notifier_vol(numero_vol)
+    return {
+        "numero_vol": numero_vol,
+        "evenement": evenement.type,
+        "invalide": invalide
+    }
+
+
+@router.post(
+    "/bagages/{id_bagage}/evenements",
+    summary="Signaler un changement de statut bagage",
+    description="Revalide l'orientation des passagers abonnés à ce bagage"
+)
+async def signaler_evenement_bagage(
+    id_bagage: str,
+    bagage_client: BagageServiceClient = Depends(get_bagage_client),
+    abonnements: GestionnaireAbonnements = Depends(get_gestionnaire_abonnements)
+):
+    """Hook appelé par les événements du service bagages"""
+    id_bagage = OrientationValidator.validate_id_bagage(id_bagage)
+    # Le statut en cache est périmé: la revalidation doit relire le service
+    await bagage_client.invalider_partout(id_bagage)
+    abonnements.notifier_bagage(id_bagage)
+    return {"id_bagage": id_bagage}
+
+
+@router.get(
+    "/cache",
+    summary="Statistiques des caches"
+)
+async def statistiques_cache(
+    meteo_client: MeteoServiceClient = Depends(get_meteo_client),
+    vol_client: VolServiceClient = Depends(get_vol_client),
+    bagage_client: BagageServiceClient = Depends(get_bagage_client),
+    coalescence: Coalescence = Depends(get_coalescence_orientations)
+):
+    """Compteurs des caches météo, vols et bagages (local et partagé), et des orientations partagées"""
+    age_meteo = meteo_client.cache_resume.age
+    return {
+        "meteo": {
+            "version": meteo_client.cache_resume.version,
+            "age_s": round(age_meteo, 1) if age_meteo is not None else None
+        },
+        "vols": vol_client.cache.stats(),
+        "bagages": bagage_client.cache.stats() if bagage_client.cache is not None else None,
+        "partage": vol_client.partage.stats() if vol_client.partage is not None else None,
+        "orientations": {
+            "en_cours": len(coalescence),
+            "calculs": coalescence.calculs,
+            "partages": coalescence.partages
+        }
+    }
+
+
+@router.post(
+    "/topologie/recharger",
+    summary="Recharger la topologie de l'aéroport",
+    description="Relit le plan (zones, portes, contrôles, zones d'attente) et le publie sans redémarrage"
+)
+async def recharger_topologie(
+    registre: RegistreTopologie = Depends(get_registre_topologie)
+):
+    """Publie le nouveau plan; un plan invalide laisse l'ancien en place"""
+    try:
+        topologie = registre.recharger()
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return {
+        "version": topologie.version,
+        "zones": len(topologie.zones),
+        "portes": len(topologie.zone_par_porte),
+        "controles": len(topologie.controles_securite)
+    }
+
+
+@router.post(
+    "/topologie/aretes",
+    summary="Mettre à jour les temps de parcours",
+    description="Met à jour en direct le temps de parcours de couloirs (occupation, fermeture)"
+)
+async def mettre_a_jour_aretes(
+    mises_a_jour: List[MiseAJourAreteSchema],
+    decision_engine: DecisionEngine = Depends(get_decision_engine),
+    abonnements: GestionnaireAbonnements = Depends(get_gestionnaire_abonnements)
+):
+    """Répare incrémentalement les tables de routage"""
+    parcours = decision_engine.parcours
+    for maj in mises_a_jour:
+        for noeud in (maj.depart, maj.arrivee):
+            if not parcours.connait(noeud):
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Nœud {noeud} inconnu"
+                )
+        if not parcours.connait_arete(maj.depart, maj.arrivee):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Couloir {maj.depart} - {maj.arrivee} inconnu"
+            )
+    for maj in mises_a_jour:
+        parcours.mettre_a_jour_arete(
+            maj.depart,
+            maj.arrivee,
+            math.inf if maj.minutes is None else maj.minutes
+        )
+    # Passagers dont le parcours traverse les zones, portes ou contrôles touchés
+    abonnements.notifier(
+        dependance
+        for maj in mises_a_jour
+        for noeud in (maj.depart, maj.arrivee)
+        for dependance in dependances_noeud(decision_engine, noeud)
+    )
+    return {"mises_a_jour": len(mises_a_jour)}
+
+
+
+@router.get(
+    "/journal",
+    summary="Statistiques du journal des orientations"
+)
+async def statistiques_journal(journal: Optional[JournalOrientations] = Depends(get_journal)):
+    """Compteurs de l'écrivain du journal (None s'il n'est pas démarré)"""
+    return journal.statistiques() if journal is not None else None
+
+
+@router.post(
+    "/controles/{id_controle}/releves",
+    summary="Relevé d'un contrôle de sécurité",
+    description="Compteurs d'arrivées et de passages d'un contrôle, pour l'estimation de l'attente en direct"
+)
+async def enregistrer_releve_controle(
+    id_controle: str,
+    releve: ReleveControleSchema,
+    decision_engine: DecisionEngine = Depends(get_decision_engine),
+    abonnements: GestionnaireAbonnements = Depends(get_gestionnaire_abonnements)
+):
+    """Alimente l'estimateur d'attente du contrôle"""
+    id_controle = id_controle.upper().strip()
+    if id_controle not in decision_engine.controles_securite:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Contrôle {id_controle} inconnu"
+        )
+    attente = decision_engine.attente_controles.enregistrer(
+        id_controle,
+        arrivees=releve.arrivees,
+        passages=releve.passages,
+        files_ouvertes=releve.files_ouvertes,
+        file_attente=releve.file_attente
+    )
+    abonnements.notifier([(CONTROLE, id_controle)])
+    return {"id_controle": id_controle, "attente_estimee_min": round(attente, 1)}
+
+
+@router.get(
+    "/controles",
+    summary="Attente aux contrôles de sécurité"
+)
+async def attente_controles(
+    decision_engine: DecisionEngine = Depends(get_decision_engine)
+):
+    """Attente utilisée par le moteur de décision pour chaque contrôle"""
+    return {
+        id_controle: {
+            "attente_min": decision_engine.temps_attente_controle(id_controle),
+            "en_direct": decision_engine.attente_controles.attente(id_controle) is not None
+        }
+        for id_controle in decision_engine.controles_securite
+    }
+
+
+@router.post(
+    "/zones/positions",
+    summary="Événements de positionnement",
+    description="Zones où des passagers ont été détectés (Wi-Fi, balises); zone nulle: passager sorti du terminal"
+)
+async def enregistrer_positions(
+    positions: List[PositionPassagerSchema],
+    decision_engine: DecisionEngine = Depends(get_decision_engine),
+    occupation: OccupationZones = Depends(get_occupation_zones)
+):
+    """Alimente le suivi de l'occupation des zones"""
+    connues = set(decision_engine.topologie.zones) | {ZONE_ENTREE, ZONE_SECURITE}
+    for position in positions:
+        if position.zone is not None and position.zone not in connues:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Zone {position.zone} inconnue"
+            )
+    for position in positions:
+        occupation.observer(position.id_passager, position.zone)
+    return {"positions": len(positions)}
+
+
+@router.get(
+    "/zones/occupation",
+    summary="Occupation des zones",
+    description="Passagers présents par zone sur la fenêtre glissante, rapportés à la capacité de la zone"
+)
+async def occupation_zones(
+    decision_engine: DecisionEngine = Depends(get_decision_engine),
+    occupation: OccupationZones = Depends(get_occupation_zones)
+):
+    """Instantané pour le tableau de bord densité (lecture des totaux, sans agrégation)"""
+    presents = occupation.instantane()
+    zones = {}
+    for zone, config in decision_engine.topologie.zones.items():
+        nombre = presents.pop(zone, 0)
+        capacite = config["capacite"]
+        zones[zone] = {
+            "occupation": nombre,
+            "capacite": capacite,
+            "taux": round(nombre / capacite, 3) if capacite else None
+        }
+    # Zones côté ville (sans capacité) et zones retirées de la topologie
+    for zone, nombre in presents.items():
+        zones[zone] = {"occupation": nombre, "capacite": None, "taux": None}
+    return {
+        "fenetre_s": occupation.fenetre_s,
+        "passagers": len(occupation),
+        "zones": zones
+    }
+
+
+@router.get(
+    "/zones/prevision",
+    summary="Prévision de saturation des zones",
+    description="Occupation projetée de chaque zone aux horizons de prévision et zones en alerte"
+)
+async def prevision_zones(prevision: Optional[PrevisionTerminal] = Depends(get_prevision)):
+    """Dernière prévision calculée par la tâche périodique (503 si elle ne tourne pas)"""
+    if prevision is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Prévision de saturation non démarrée"
+        )
+    return prevision.etat()
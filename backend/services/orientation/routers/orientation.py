@@ -1,28 +1,51 @@
-from ..utils import generer_alertes, generer_instructions, log_orientation
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from ..utils import log_orientation
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, WebSocket, status, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from typing import Optional
+import anyio
 from datetime import datetime, timezone
 import logging
+import time
 
 from ..schemas.orientation import (
     OrientationRequest,
     OrientationResponse,
-    InstructionSchema,
-    AlerteSchema,
-    EtapeParcoursSchema,
-    SituationSchema,
+    OrientationBatchRequest,
+    OrientationBatchResponse,
     TypeInstruction,
     ActionType
 )
+from ..core.admission import NOMS_PRIORITE, ControleAdmission, Surcharge
+from ..core.coalescence import Coalescence
+from ..core.config import Settings, get_settings
 from ..core.decision_engine import DecisionEngine
+from ..core.occupation_zones import OccupationZones, zone_de_position
+from ..abonnements import GestionnaireAbonnements
+from ..journal import JournalOrientations
+from ..metrics import DEGRADATIONS, ETAPES
+from ..prevision import PrevisionTerminal
+from ..pipeline import (
+    calculer_orientation,
+    collecter_donnees,
+    duree_cache_s,
+    orientation_degradee,
+    orienter_lot,
+    priorite_orientation
+)
 from ..services.meteo_client import MeteoServiceClient
 from ..services.baggage_client import BagageServiceClient
 from ..services.vol_client import VolServiceClient
 from ..dependencies.services import (
+    get_admission,
     get_decision_engine,
     get_meteo_client,
     get_bagage_client,
-    get_vol_client
+    get_vol_client,
+    get_gestionnaire_abonnements,
+    get_journal,
+    get_coalescence_orientations,
+    get_occupation_zones,
+    get_prevision
 )
 from ..dependencies.validation import OrientationValidator
 
@@ -35,6 +58,17 @@ router = APIRouter(
 logger = logging.getLogger(__name__)
 
 
+def _etag_correspond(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparaison faible If-None-Match / ETag (RFC 9110)"""
+    if not if_none_match:
+        return False
+    for candidat in if_none_match.split(","):
+        candidat = candidat.strip()
+        if candidat == "*" or candidat.removeprefix("W/") == etag:
+            return True
+    return False
+
+
 @router.get(
     "/{numero_vol}/{id_bagage}",
     response_model=OrientationResponse,
@@ -49,7 +83,15 @@ async def get_orientation(
     meteo_client: MeteoServiceClient = Depends(get_meteo_client),
     bagage_client: BagageServiceClient = Depends(get_bagage_client),
     vol_client: VolServiceClient = Depends(get_vol_client),
-    background_tasks: BackgroundTasks = None
+    settings: Settings = Depends(get_settings),
+    journal: Optional[JournalOrientations] = Depends(get_journal),
+    occupation: Optional[OccupationZones] = Depends(get_occupation_zones),
+    prevision: Optional[PrevisionTerminal] = Depends(get_prevision),
+    coalescence: Coalescence = Depends(get_coalescence_orientations),
+    admission: ControleAdmission = Depends(get_admission),
+    background_tasks: BackgroundTasks = None,
+    request: Request = None,
+    response: Response = None
 ):
     """
     Endpoint principal pour obtenir l'orientation d'un passager.
@@ -60,59 +102,106 @@ async def get_orientation(
         position_estimee: Position actuelle du passager (optionnel)
     
     Returns:
-        OrientationResponse avec instructions détaillées
+        OrientationResponse avec instructions détaillées, ou 304 si
+        l'orientation n'a pas changé depuis l'ETag envoyé (If-None-Match).
+        En surcharge, une requête délestée reçoit une orientation calculée
+        sur les dernières données connues (en-tête X-Orientation-Degradee),
+        à défaut 503 avec Retry-After.
     """
     try:
         # Validation
+        debut = time.perf_counter()
         numero_vol = OrientationValidator.validate_numero_vol(numero_vol)
         id_bagage = OrientationValidator.validate_id_bagage(id_bagage)
         position_estimee = OrientationValidator.validate_position(position_estimee)
+        ETAPES["validation"].observe(time.perf_counter() - debut)
         
-        logger.info(f"Calcul orientation pour vol {numero_vol}, bagage {id_bagage}")
-        
-        # 1. Récupération des données en parallèle
-        meteo_data = await meteo_client.get_meteo_summary()
-        bagage_data = await bagage_client.get_bagage_status(id_bagage)
-        vol_data = await vol_client.get_vol_info(numero_vol)
-        
-        # 2. Analyse de la situation
-        situation = decision_engine.analyser_situation(
-            meteo_data, bagage_data, vol_data
-        )
-        
-        # 3. Génération des instructions
-        instructions = generer_instructions(
-            decision_engine,
-            situation,
-            position_estimee,
-            vol_data,
-            bagage_data
-        )
-        
-        # 4. Génération des alertes
-        alertes = generer_alertes(situation, meteo_data, vol_data)
-        
-        # 5. Génération du parcours
-        parcours = decision_engine.generer_parcours_jitb(
-            situation, vol_data, position_estimee
-        )
+        logger.debug("Calcul orientation pour vol %s, bagage %s", numero_vol, id_bagage)
+
+        # Départ imminent ou problème bagage connus: servis en premier
+        priorite = priorite_orientation(settings, vol_client, bagage_client, numero_vol, id_bagage)
+
+        async def _calculer():
+            # Seul le calcul (lectures amont comprises) occupe une place
+            async with admission.admettre(priorite):
+                # 1. Récupération des données en parallèle
+                meteo_data, bagage_data, vol_data = await collecter_donnees(
+                    settings,
+                    meteo_client,
+                    bagage_client,
+                    vol_client,
+                    numero_vol,
+                    id_bagage
+                )
+
+                # 2-5. Analyse, instructions, alertes et parcours
+                reponse = calculer_orientation(
+                    decision_engine,
+                    numero_vol,
+                    position_estimee,
+                    meteo_data,
+                    bagage_data,
+                    vol_data
+                )
+                return reponse, meteo_data, bagage_data, vol_data
+
+        # Requêtes identiques simultanées (famille, relances de l'application):
+        # un seul calcul, partagé. La suite reste propre à chaque requête.
+        degradee = False
+        try:
+            reponse, meteo_data, bagage_data, vol_data = await coalescence.executer(
+                (numero_vol, id_bagage, position_estimee), _calculer
+            )
+        except Surcharge as e:
+            # Délestage: dernières données connues, sans appel amont
+            resultat = orientation_degradee(
+                decision_engine, meteo_client, bagage_client, vol_client,
+                numero_vol, id_bagage, position_estimee
+            )
+            if resultat is None:
+                DEGRADATIONS.labels(NOMS_PRIORITE[priorite], "503").inc()
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail=f"Service surchargé, réessayez dans {settings.ADMISSION_RETRY_AFTER_S}s",
+                    headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER_S)}
+                ) from e
+            DEGRADATIONS.labels(NOMS_PRIORITE[priorite], "degradee").inc()
+            reponse, meteo_data, bagage_data, vol_data = resultat
+            degradee = True
         
-        # 6. Log en arrière-plan (optionnel)
+        # 6. Occupation des zones: le passager est vu à sa position estimée,
+        # le vol rejoint le programme des départs de la prévision de saturation
+        porte = vol_data.get("porte_actuelle", "A1")
+        if occupation is not None:
+            zone = zone_de_position(decision_engine.topologie, position_estimee, porte)
+            if zone is not None:
+                occupation.observer(id_bagage, zone, numero_vol)
+        if prevision is not None:
+            heure_depart = DecisionEngine._lire_heure_depart(vol_data)
+            if heure_depart is not None:
+                prevision.noter_vol(numero_vol, porte, heure_depart.timestamp())
+
+        # 7. Log (niveau DEBUG) et journal en base en arrière-plan (optionnel)
         if background_tasks:
             background_tasks.add_task(
                 log_orientation,
-                numero_vol, id_bagage, situation, instructions
+                journal, numero_vol, id_bagage, position_estimee, reponse, meteo_data, bagage_data
             )
-        
-        return OrientationResponse(
-            success=True,
-            numero_vol=numero_vol,
-            timestamp=datetime.now(timezone.utc), # Use timezone-aware datetime
-            situation=SituationSchema(**situation),
-            instructions=[InstructionSchema(**inst) for inst in instructions],
-            alertes=[AlerteSchema(**alert) for alert in alertes],
-            parcours=[EtapeParcoursSchema(**etape) for etape in parcours]
-        )
+
+        # 8. Cache HTTP (ETag du contenu et fraîcheur selon l'urgence) et
+        # sérialisation, faite une seule fois ici plutôt que par FastAPI
+        debut = time.perf_counter()
+        entetes = {"X-Orientation-Degradee": "1"} if degradee else {}
+        if response is not None:
+            etag = reponse.etag()
+            # Réponse dégradée: à redemander une fois la charge retombée
+            max_age = settings.ADMISSION_RETRY_AFTER_S if degradee else duree_cache_s(settings, reponse)
+            entetes.update({"ETag": etag, "Cache-Control": f"max-age={max_age}"})
+            if request is not None and _etag_correspond(request.headers.get("if-none-match"), etag):
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=entetes)
+        corps = reponse.model_dump_json()
+        ETAPES["serialisation"].observe(time.perf_counter() - debut)
+        return Response(content=corps, media_type="application/json", headers=entetes)
         
     except HTTPException:
         raise
@@ -135,7 +224,14 @@ async def post_orientation(
     decision_engine: DecisionEngine = Depends(get_decision_engine),
     meteo_client: MeteoServiceClient = Depends(get_meteo_client),
     bagage_client: BagageServiceClient = Depends(get_bagage_client),
-    vol_client: VolServiceClient = Depends(get_vol_client)
+    vol_client: VolServiceClient = Depends(get_vol_client),
+    settings: Settings = Depends(get_settings),
+    occupation: OccupationZones = Depends(get_occupation_zones),
+    prevision: Optional[PrevisionTerminal] = Depends(get_prevision),
+    coalescence: Coalescence = Depends(get_coalescence_orientations),
+    admission: ControleAdmission = Depends(get_admission),
+    journal: Optional[JournalOrientations] = Depends(get_journal),
+    background_tasks: BackgroundTasks = None
 ):
     """Endpoint POST pour obtenir l'orientation"""
     return await get_orientation(
@@ -145,9 +241,123 @@ async def post_orientation(
         decision_engine=decision_engine,
         meteo_client=meteo_client,
         bagage_client=bagage_client,
-        vol_client=vol_client
+        vol_client=vol_client,
+        settings=settings,
+        occupation=occupation,
+        prevision=prevision,
+        coalescence=coalescence,
+        admission=admission,
+        journal=journal,
+        background_tasks=background_tasks
+    )
+
+
+@router.post(
+    "/batch",
+    response_model=OrientationBatchResponse,
+    summary="Obtenir l'orientation d'une liste de passagers",
+    description=(
+        "Calcule l'orientation de plusieurs passagers en dédoublonnant les appels amont. "
+        "Avec `Accept: application/x-ndjson` (ou `?format=ndjson`), les résultats sont "
+        "envoyés en flux, une ligne JSON par passager, dès qu'ils sont prêts."
+    )
+)
+async def post_orientation_batch(
+    requete: OrientationBatchRequest,
+    request: Request,
+    format: Optional[str] = None,
+    decision_engine: DecisionEngine = Depends(get_decision_engine),
+    meteo_client: MeteoServiceClient = Depends(get_meteo_client),
+    bagage_client: BagageServiceClient = Depends(get_bagage_client),
+    vol_client: VolServiceClient = Depends(get_vol_client),
+    settings: Settings = Depends(get_settings),
+    journal: Optional[JournalOrientations] = Depends(get_journal)
+):
+    """Endpoint d'orientation par lot (kiosques, applications compagnies, notifications)"""
+    if len(requete.passagers) > settings.BATCH_TAILLE_MAX:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Lot limité à {settings.BATCH_TAILLE_MAX} passagers"
+        )
+
+    logger.debug("Calcul orientation par lot pour %d passagers", len(requete.passagers))
+
+    resultats = orienter_lot(
+        settings,
+        decision_engine,
+        meteo_client,
+        bagage_client,
+        vol_client,
+        requete.passagers,
+        journal
     )
 
+    if format == "ndjson" or "application/x-ndjson" in request.headers.get("accept", ""):
+        async def _flux():
+            async for item in resultats:
+                yield item.model_dump_json() + "\n"
+        return StreamingResponse(_flux(), media_type="application/x-ndjson")
+
+    items = sorted([item async for item in resultats], key=lambda item: item.index)
+    return OrientationBatchResponse(
+        success=True,
+        total=len(items),
+        erreurs=sum(1 for item in items if item.erreur is not None),
+        resultats=items
+    )
+
+
+@router.websocket("/ws/{numero_vol}/{id_bagage}")
+async def orientation_temps_reel(
+    websocket: WebSocket,
+    numero_vol: str,
+    id_bagage: str,
+    position_estimee: Optional[str] = None,
+    abonnements: GestionnaireAbonnements = Depends(get_gestionnaire_abonnements)
+):
+    """
+    Orientation poussée en temps réel (remplace le polling).
+
+    L'orientation courante est envoyée à la connexion, puis à chaque
+    changement (porte, horaire, bagage, météo, attente aux contrôles,
+    temps disponible). Messages: OrientationResponse en JSON, ou
+    `{"success": false, "status_code", "detail"}` si le vol est indisponible.
+    """
+    try:
+        numero_vol = OrientationValidator.validate_numero_vol(numero_vol)
+        id_bagage = OrientationValidator.validate_id_bagage(id_bagage)
+        position_estimee = OrientationValidator.validate_position(position_estimee)
+    except HTTPException as e:
+        await websocket.close(code=1008, reason=str(e.detail))
+        return
+
+    await websocket.accept()
+    abonnement, file = abonnements.abonner(numero_vol, id_bagage, position_estimee)
+
+    async def _envoyer():
+        while True:
+            await websocket.send_text(await file.get())
+
+    async def _ecouter():
+        # Le client n'envoie rien: on attend seulement sa déconnexion
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+
+    try:
+        async with anyio.create_task_group() as groupe:
+            async def _jusqua_fin(tache):
+                try:
+                    await tache()
+                finally:
+                    groupe.cancel_scope.cancel()
+
+            groupe.start_soon(_jusqua_fin, _envoyer)
+            groupe.start_soon(_jusqua_fin, _ecouter)
+    except Exception as e:
+        logger.debug(f"WebSocket orientation {numero_vol}/{id_bagage} fermé: {e}")
+    finally:
+        abonnements.desabonner(abonnement, file)
+
 
 @router.get(
     "/health",
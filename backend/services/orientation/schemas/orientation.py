@@ -1,4 +1,6 @@
-from pydantic import BaseModel, Field, validator
+import hashlib
+
+from pydantic import BaseModel, ConfigDict, Field, validator
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from enum import Enum
@@ -16,7 +18,16 @@ class ActionType(str, Enum):
     EMBARQUER = "EMBARQUER"
     CONTACTER_SERVICE = "CONTACTER_SERVICE"
 
+class TypeEvenementVol(str, Enum):
+    CHANGEMENT_PORTE = "CHANGEMENT_PORTE"
+    RETARD = "RETARD"
+    ANNULATION = "ANNULATION"
+    AUTRE = "AUTRE"
+
 class InstructionSchema(BaseModel):
+    # Instances partagées entre réponses par la table de décision
+    model_config = ConfigDict(frozen=True)
+
     priorite: int = Field(..., ge=1, description="Priorité de l'instruction")
     type: TypeInstruction
     action: ActionType
@@ -27,6 +38,9 @@ class InstructionSchema(BaseModel):
     details: Optional[Dict[str, Any]] = None
 
 class AlerteSchema(BaseModel):
+    # Instances partagées entre réponses par la table de décision
+    model_config = ConfigDict(frozen=True)
+
     niveau: str = Field(..., description="Niveau d'alerte: info, warning, danger")
     message: str
     icon: str
@@ -42,6 +56,9 @@ class EtapeParcoursSchema(BaseModel):
     coordonnees: Optional[Dict[str, float]] = None
 
 class SituationSchema(BaseModel):
+    # Instances partagées entre réponses par la table de décision
+    model_config = ConfigDict(frozen=True)
+
     type_trajet: str
     niveau_urgence: str
     probleme_bagage: bool
@@ -61,6 +78,26 @@ class OrientationRequest(BaseModel):
             raise ValueError('Numéro de vol invalide')
         return v.upper()
 
+class EvenementVolSchema(BaseModel):
+    type: TypeEvenementVol
+    porte_actuelle: Optional[str] = None
+    heure_depart: Optional[datetime] = None
+
+class MiseAJourAreteSchema(BaseModel):
+    depart: str = Field(..., description="Nœud du graphe du terminal (ex: securite-A, zone-C, porte-C5)")
+    arrivee: str
+    minutes: Optional[float] = Field(None, ge=0, description="Temps de parcours; null pour fermer le couloir")
+
+class ReleveControleSchema(BaseModel):
+    arrivees: int = Field(0, ge=0, description="Passagers arrivés dans la file depuis le dernier relevé")
+    passages: int = Field(0, ge=0, description="Passagers scannés depuis le dernier relevé")
+    files_ouvertes: Optional[int] = Field(None, ge=1, description="Nombre de files ouvertes")
+    file_attente: Optional[int] = Field(None, ge=0, description="Longueur de file observée, si connue")
+
+class PositionPassagerSchema(BaseModel):
+    id_passager: str = Field(..., min_length=1, description="Identifiant du passager (ex: identifiant bagage)")
+    zone: Optional[str] = Field(None, description="Zone observée (entree, securite, A, B...); null si le passager a quitté le terminal")
+
 class OrientationResponse(BaseModel):
     success: bool
     numero_vol: str
@@ -69,6 +106,11 @@ class OrientationResponse(BaseModel):
     instructions: List[InstructionSchema]
     alertes: List[AlerteSchema]
     parcours: List[EtapeParcoursSchema]
+
+    def etag(self) -> str:
+        """ETag HTTP: empreinte du contenu, hors horodatage"""
+        contenu = self.model_dump_json(exclude={"timestamp"}).encode()
+        return f'"{hashlib.blake2b(contenu, digest_size=16).hexdigest()}"'
     
     class Config:
         json_schema_extra = {
@@ -89,4 +131,28 @@ class OrientationResponse(BaseModel):
                 "alertes": [],
                 "parcours": []
             }
-        }
\ No newline at end of file
+        }
+
+class PassagerLotSchema(BaseModel):
+    # Validé passager par passager dans le lot: une entrée invalide n'échoue
+    # que sa propre ligne (voir OrientationValidator)
+    numero_vol: str
+    id_bagage: str
+    position_estimee: Optional[str] = Field(None, description="entree, securite, zone_embarquement, porte")
+
+class OrientationBatchRequest(BaseModel):
+    passagers: List[PassagerLotSchema] = Field(..., min_length=1)
+
+class OrientationBatchItem(BaseModel):
+    index: int = Field(..., description="Position du passager dans la requête")
+    numero_vol: str
+    id_bagage: str
+    status_code: int
+    orientation: Optional[OrientationResponse] = None
+    erreur: Optional[str] = None
+
+class OrientationBatchResponse(BaseModel):
+    success: bool
+    total: int
+    erreurs: int
+    resultats: List[OrientationBatchItem]
@@ -1,31 +1,225 @@
 from asyncio.log import logger
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import asyncio
 import httpx
 
+from ..core.cache import CacheLRU
+from ..core.disjoncteur import CircuitOuvert, Disjoncteur
+from ..metrics import REPLIS
+from .cache_partage import BAGAGES, CachePartage
+
+
+def bagage_par_defaut(id_bagage: str) -> Dict[str, Any]:
+    """Statut bagage neutre utilisé quand le service Bagages ne répond pas"""
+    return {
+        "id": id_bagage,
+        "statut": "ENREGISTRE",
+        "position": "Inconnu",
+        "horodatage": datetime.now().isoformat()
+    }
+
 
 class BagageServiceClient:
     """Client pour communiquer avec le service de traçabilité bagages"""
     
-    def __init__(self, base_url: str):
+    def __init__(
+        self,
+        base_url: str,
+        client: Optional[httpx.AsyncClient] = None,
+        disjoncteur: Optional[Disjoncteur] = None,
+        derniers_bons_taille_max: int = 20000,
+        derniers_bons_ttl_s: float = 3600.0,
+        cache_taille_max: int = 5000,
+        cache_ttl_s: float = 0.0,
+        partage: Optional[CachePartage] = None,
+        partage_ttl_s: float = 10.0
+    ):
         self.base_url = base_url
-        self.client = httpx.AsyncClient(timeout=10.0)
+        # Client partagé (pool de connexions) si fourni, sinon client dédié
+        self.client = client or httpx.AsyncClient(timeout=10.0)
+        self.disjoncteur = disjoncteur or Disjoncteur("bagages")
+        # Dernier statut obtenu par bagage, servi quand le service est en panne
+        self.derniers_bons: CacheLRU[Dict[str, Any]] = CacheLRU(derniers_bons_taille_max, derniers_bons_ttl_s)
+        # Statuts récents (L1, désactivé si cache_ttl_s vaut 0) devant le
+        # cache partagé entre workers (L2); invalidés par les événements bagage
+        self.cache: Optional[CacheLRU[Dict[str, Any]]] = (
+            CacheLRU(cache_taille_max, cache_ttl_s) if cache_ttl_s > 0 else None
+        )
+        self.partage = partage
+        self.partage_ttl_s = partage_ttl_s
+        # Lectures en cours par bagage, et invalidations survenues pendant
+        # celles-ci: un statut lu avant une invalidation n'est pas mis en cache
+        self._chargements: Dict[str, int] = {}
+        self._generations: Dict[str, int] = {}
+        if partage is not None:
+            partage.abonner(BAGAGES, self.invalider, self._vider_cache)
     
     async def get_bagage_status(self, id_bagage: str) -> Dict[str, Any]:
-        """Récupère le statut d'un bagage"""
+        """Récupère le statut d'un bagage (dernier statut connu si le service est en panne)"""
+        if self.cache is not None:
+            bagage = self.cache.get(id_bagage)
+            if bagage is not None:
+                return bagage
+        generation = self._debut_chargement(id_bagage)
         try:
-            response = await self.client.get(f"{self.base_url}/api/bag/{id_bagage}")
+            bagage = await self.partage.lire(BAGAGES, id_bagage) if self.partage is not None else None
+            depuis_partage = bagage is not None
+            if bagage is None:
+                bagage = await self._charger(id_bagage)
+        finally:
+            frais = self._fin_chargement(id_bagage, generation)
+        if bagage is None:
+            return self._repli(id_bagage)
+        if frais:
+            self._memoriser(id_bagage, bagage)
+            if self.partage is not None and not depuis_partage:
+                await self.partage.ecrire(BAGAGES, id_bagage, bagage, self.partage_ttl_s)
+        return bagage
+
+    async def _charger(self, id_bagage: str) -> Optional[Dict[str, Any]]:
+        """Appel réel au service Bagages; None si le service est en panne"""
+        try:
+            response = await self.disjoncteur.executer(lambda: self._requete(id_bagage))
             response.raise_for_status()
             return response.json()
+        except CircuitOuvert:
+            return None
         except httpx.HTTPError as e:
             logger.error(f"Erreur récupération bagage {id_bagage}: {e}")
-            # Statut par défaut
-            return {
-                "id": id_bagage,
-                "statut": "ENREGISTRE",
-                "position": "Inconnu",
-                "horodatage": datetime.now().isoformat()
-            }
+            return None
+
+    def _debut_chargement(self, id_bagage: str) -> int:
+        """Génération du bagage au début d'une lecture (cache partagé ou service)"""
+        self._chargements[id_bagage] = self._chargements.get(id_bagage, 0) + 1
+        return self._generations.get(id_bagage, 0)
+
+    def _fin_chargement(self, id_bagage: str, generation: int) -> bool:
+        """Vrai si aucune invalidation n'a eu lieu pendant la lecture"""
+        frais = self._generations.get(id_bagage, 0) == generation
+        restants = self._chargements[id_bagage] - 1
+        if restants:
+            self._chargements[id_bagage] = restants
+        else:
+            # Plus de lecture en cours: la génération ne sert plus
+            del self._chargements[id_bagage]
+            self._generations.pop(id_bagage, None)
+        return frais
+
+    def _memoriser(self, id_bagage: str, bagage: Dict[str, Any]):
+        self.derniers_bons.set(id_bagage, bagage)
+        if self.cache is not None:
+            self.cache.set(id_bagage, bagage)
+
+    async def _requete(self, id_bagage: str) -> httpx.Response:
+        """Appel au service Bagages; seules les erreurs 5xx comptent comme panne"""
+        response = await self.client.get(f"{self.base_url}/api/bag/{id_bagage}")
+        if response.status_code >= 500:
+            response.raise_for_status()
+        return response
+
+    def _repli(self, id_bagage: str) -> Dict[str, Any]:
+        bagage = self.derniers_bons.get(id_bagage)
+        if bagage is not None:
+            REPLIS.labels("bagages", "dernier_bon").inc()
+            return bagage
+        REPLIS.labels("bagages", "defaut").inc()
+        return bagage_par_defaut(id_bagage)
     
+    async def get_bagages_status(
+        self,
+        ids_bagage: Iterable[str],
+        concurrence_max: int = 20,
+        delai_s: float = 10.0
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Récupère le statut de plusieurs bagages (identifiants dédoublonnés).
+
+        Les statuts en cache local, puis en cache partagé (un seul MGET
+        pipeliné), sont servis sans appel. Le service Bagages n'expose pas de
+        lecture groupée: les appels restants partent en parallèle sur le pool
+        de connexions, bornés par `concurrence_max`. Un bagage en erreur ou
+        hors délai reçoit son dernier statut connu, à défaut le statut par
+        défaut.
+        """
+        ids = list(dict.fromkeys(ids_bagage))
+        statuts: Dict[str, Dict[str, Any]] = {}
+        manquants = []
+        for id_bagage in ids:
+            bagage = self.cache.get(id_bagage) if self.cache is not None else None
+            if bagage is None:
+                manquants.append(id_bagage)
+            else:
+                statuts[id_bagage] = bagage
+        generations = {id_bagage: self._debut_chargement(id_bagage) for id_bagage in manquants}
+        try:
+            charges = await self._charger_plusieurs(manquants, concurrence_max, delai_s)
+        finally:
+            frais = {
+                id_bagage for id_bagage, generation in generations.items()
+                if self._fin_chargement(id_bagage, generation)
+            }
+
+        a_partager = {}
+        for id_bagage, (bagage, depuis_partage) in charges.items():
+            if bagage is None:
+                statuts[id_bagage] = self._repli(id_bagage)
+                continue
+            statuts[id_bagage] = bagage
+            if id_bagage in frais:
+                self._memoriser(id_bagage, bagage)
+                if not depuis_partage:
+                    a_partager[id_bagage] = bagage
+        if a_partager and self.partage is not None:
+            await self.partage.ecrire_plusieurs(BAGAGES, a_partager, self.partage_ttl_s)
+        return {id_bagage: statuts[id_bagage] for id_bagage in ids}
+
+    async def _charger_plusieurs(
+        self,
+        ids_bagage: List[str],
+        concurrence_max: int,
+        delai_s: float
+    ) -> Dict[str, Tuple[Optional[Dict[str, Any]], bool]]:
+        """Statuts lus dans le cache partagé (vrai) ou auprès du service (faux); None en erreur"""
+        charges: Dict[str, Tuple[Optional[Dict[str, Any]], bool]] = {}
+        manquants = ids_bagage
+        if manquants and self.partage is not None:
+            trouves = await self.partage.lire_plusieurs(BAGAGES, manquants)
+            charges.update((id_bagage, (bagage, True)) for id_bagage, bagage in trouves.items())
+            manquants = [id_bagage for id_bagage in manquants if id_bagage not in trouves]
+
+        semaphore = asyncio.Semaphore(concurrence_max)
+
+        async def _un_bagage(id_bagage: str) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                try:
+                    return await asyncio.wait_for(self._charger(id_bagage), timeout=delai_s)
+                except asyncio.TimeoutError:
+                    logger.error(f"Bagage {id_bagage} hors délai")
+                    return None
+
+        resultats = await asyncio.gather(*[_un_bagage(id_bagage) for id_bagage in manquants])
+        charges.update((id_bagage, (bagage, False)) for id_bagage, bagage in zip(manquants, resultats))
+        return charges
+
+    def invalider(self, id_bagage: str) -> bool:
+        """Oublie le statut en cache local (changement de statut signalé)"""
+        if id_bagage in self._chargements:
+            self._generations[id_bagage] = self._generations.get(id_bagage, 0) + 1
+        if self.cache is None:
+            return False
+        return self.cache.invalider(id_bagage)
+
+    async def invalider_partout(self, id_bagage: str) -> bool:
+        """Invalide le statut dans ce worker, dans le cache partagé et dans les autres workers"""
+        invalide = self.invalider(id_bagage)
+        if self.partage is not None:
+            await self.partage.invalider(BAGAGES, id_bagage)
+        return invalide
+
+    def _vider_cache(self):
+        if self.cache is not None:
+            self.cache.vider()
+
     async def close(self):
         await self.client.aclose()
\ No newline at end of file
@@ -0,0 +1,234 @@
+import asyncio
+import json
+import logging
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+
+from redis.asyncio import Redis
+
+from ..core.disjoncteur import CircuitOuvert, Disjoncteur
+
+try:
+    import orjson
+except ImportError:  # paquet optionnel: repli sur json compact
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+METEO, VOLS, BAGAGES = "meteo", "vols", "bagages"
+
+
+def serialiser(valeur: Any) -> bytes:
+    """JSON compact (orjson si présent); les deux encodages se relisent l'un l'autre"""
+    if orjson is not None:
+        return orjson.dumps(valeur)
+    return json.dumps(valeur, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def deserialiser(donnees: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(donnees)
+    return json.loads(donnees)
+
+
+class CachePartage:
+    """
+    Niveau L2 des caches amont: Redis partagé par tous les workers et réplicas.
+
+    Les caches locaux (L1) de chaque client restent devant: Redis n'est lu
+    qu'en cas de miss local, et un nouveau worker démarre avec un L2 déjà
+    chaud. Les lectures groupées partent en MGET pipelinés, les
+    invalidations sont publiées sur un canal pub/sub écouté par tous les
+    workers pour purger leur L1 (chaque worker ignore les siennes: il a
+    déjà mis à jour son L1).
+
+    Redis reste facultatif: toute erreur (ou disjoncteur "redis" ouvert)
+    compte comme un miss, et le service retombe sur ses appels amont.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        prefixe: str = "orientation",
+        disjoncteur: Optional[Disjoncteur] = None,
+        mget_lot: int = 500,
+        reconnexion_s: float = 1.0
+    ):
+        self.redis = redis
+        self.prefixe = prefixe
+        self.canal = f"{prefixe}:invalidations"
+        # Émetteur des invalidations publiées par ce processus
+        self.origine = uuid.uuid4().hex
+        self.disjoncteur = disjoncteur or Disjoncteur("redis")
+        self.mget_lot = mget_lot
+        self.reconnexion_s = reconnexion_s
+        # Purges L1 par espace: (invalider une clé, tout vider)
+        self._abonnes: Dict[str, List[Tuple[Callable[[str], Any], Callable[[], Any]]]] = {}
+        self._ecoute: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+        self.erreurs = 0
+
+    def _cle(self, espace: str, cle: str) -> str:
+        return f"{self.prefixe}:{espace}:{cle}"
+
+    async def _executer(self, operation: Callable[[], Awaitable[T]], defaut: T) -> T:
+        """Exécute une opération Redis; `defaut` si Redis est indisponible"""
+        try:
+            return await self.disjoncteur.executer(operation)
+        except CircuitOuvert:
+            return defaut
+        except Exception as e:
+            self.erreurs += 1
+            logger.warning(f"Cache partagé indisponible: {e}")
+            return defaut
+
+    async def lire(self, espace: str, cle: str) -> Optional[Any]:
+        """Valeur partagée, None si absente ou Redis indisponible"""
+        donnees = await self._executer(lambda: self.redis.get(self._cle(espace, cle)), None)
+        if donnees is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return deserialiser(donnees)
+
+    async def lire_plusieurs(self, espace: str, cles: Iterable[str]) -> Dict[str, Any]:
+        """Valeurs partagées trouvées, en un aller-retour (MGET par lots de `mget_lot`)"""
+        cles = list(cles)
+        if not cles:
+            return {}
+
+        async def _mget() -> List[Optional[bytes]]:
+            pipeline = self.redis.pipeline(transaction=False)
+            for debut in range(0, len(cles), self.mget_lot):
+                pipeline.mget([self._cle(espace, cle) for cle in cles[debut:debut + self.mget_lot]])
+            return [donnees for lot in await pipeline.execute() for donnees in lot]
+
+        resultats = await self._executer(_mget, [])
+        trouves = {
+            cle: deserialiser(donnees)
+            for cle, donnees in zip(cles, resultats)
+            if donnees is not None
+        }
+        self.hits += len(trouves)
+        self.misses += len(cles) - len(trouves)
+        return trouves
+
+    async def ecrire(self, espace: str, cle: str, valeur: Any, ttl_s: float):
+        await self.ecrire_plusieurs(espace, {cle: valeur}, ttl_s)
+
+    async def ecrire_plusieurs(self, espace: str, valeurs: Dict[str, Any], ttl_s: float):
+        """Écrit les valeurs avec une durée de vie, en un aller-retour"""
+        if not valeurs:
+            return
+        ttl_ms = max(int(ttl_s * 1000), 1)
+
+        async def _set():
+            pipeline = self.redis.pipeline(transaction=False)
+            for cle, valeur in valeurs.items():
+                pipeline.set(self._cle(espace, cle), serialiser(valeur), px=ttl_ms)
+            await pipeline.execute()
+
+        await self._executer(_set, None)
+
+    async def invalider(self, espace: str, cle: str):
+        """Supprime la valeur partagée et purge le L1 de tous les workers"""
+        async def _invalider():
+            pipeline = self.redis.pipeline(transaction=False)
+            pipeline.delete(self._cle(espace, cle))
+            pipeline.publish(self.canal, self._message(espace, cle))
+            await pipeline.execute()
+
+        await self._executer(_invalider, None)
+
+    async def remplacer(self, espace: str, cle: str, valeur: Any, ttl_s: float):
+        """Écrit la nouvelle valeur partagée puis purge le L1 des autres workers"""
+        ttl_ms = max(int(ttl_s * 1000), 1)
+
+        async def _remplacer():
+            # Écriture avant publication: pas de fenêtre sans valeur partagée
+            # où un autre worker relirait l'ancienne valeur en amont
+            pipeline = self.redis.pipeline(transaction=False)
+            pipeline.set(self._cle(espace, cle), serialiser(valeur), px=ttl_ms)
+            pipeline.publish(self.canal, self._message(espace, cle))
+            await pipeline.execute()
+
+        await self._executer(_remplacer, None)
+
+    def _message(self, espace: str, cle: str) -> str:
+        return f"{self.origine}:{espace}:{cle}"
+
+    def abonner(self, espace: str, invalider: Callable[[str], Any], vider: Callable[[], Any]):
+        """Enregistre la purge du L1 d'un espace sur les invalidations publiées"""
+        self._abonnes.setdefault(espace, []).append((invalider, vider))
+
+    def demarrer(self):
+        """Lance l'écoute des invalidations (idempotent)"""
+        if self._ecoute is None or self._ecoute.done():
+            self._ecoute = asyncio.create_task(self._ecouter())
+
+    async def fermer(self):
+        if self._ecoute is not None:
+            self._ecoute.cancel()
+            try:
+                await self._ecoute
+            except asyncio.CancelledError:
+                pass
+            self._ecoute = None
+        await self.redis.aclose()
+
+    async def _ecouter(self):
+        """Applique les invalidations publiées; se réabonne après une coupure"""
+        coupure = False
+        while True:
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.canal)
+                if coupure:
+                    # Des invalidations ont pu être manquées pendant la coupure
+                    self._vider_tout()
+                    coupure = False
+                while True:
+                    # Attente bornée: indépendante du socket_timeout des commandes
+                    message = await pubsub.get_message(timeout=1.0)
+                    if message is not None:
+                        self._appliquer(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if not coupure:
+                    logger.warning(f"Écoute des invalidations interrompue: {e}")
+                coupure = True
+                await asyncio.sleep(self.reconnexion_s)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    def _appliquer(self, donnees: Any):
+        if isinstance(donnees, bytes):
+            donnees = donnees.decode()
+        origine, _, donnees = str(donnees).partition(":")
+        if origine == self.origine:
+            return
+        espace, _, cle = donnees.partition(":")
+        for invalider, _ in self._abonnes.get(espace, ()):
+            invalider(cle)
+
+    def _vider_tout(self):
+        for abonnes in self._abonnes.values():
+            for _, vider in abonnes:
+                vider()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "erreurs": self.erreurs,
+            "taux_hit": round(self.hits / total, 4) if total else 0.0,
+            "disjoncteur": self.disjoncteur.etat
+        }
@@ -0,0 +1,110 @@
+import importlib.util
+import logging
+from typing import Optional
+
+import httpx
+from redis.asyncio import Redis
+
+from ..core.config import Settings
+from ..core.disjoncteur import Disjoncteur
+from ..metrics import observer_disjoncteur
+from .meteo_client import MeteoServiceClient
+from .baggage_client import BagageServiceClient
+from .cache_partage import CachePartage
+from .vol_client import VolServiceClient
+
+logger = logging.getLogger(__name__)
+
+
+def creer_client_http(settings: Settings) -> httpx.AsyncClient:
+    """Crée un client HTTP avec un pool de connexions keep-alive"""
+    http2 = settings.HTTP2_ACTIVE
+    if http2 and importlib.util.find_spec("h2") is None:
+        # HTTP/2 nécessite le paquet optionnel `h2` (httpx[http2])
+        logger.warning("HTTP/2 demandé mais le paquet 'h2' est absent, repli sur HTTP/1.1")
+        http2 = False
+
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(settings.HTTP_TIMEOUT_S, connect=settings.HTTP_CONNECT_TIMEOUT_S),
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNEXIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_S
+        ),
+        http2=http2
+    )
+
+
+def creer_disjoncteur(settings: Settings, nom: str) -> Disjoncteur:
+    """Crée le disjoncteur d'un service amont, exporté en métriques"""
+    disjoncteur = Disjoncteur(
+        nom,
+        fenetre=settings.DISJONCTEUR_FENETRE,
+        appels_min=settings.DISJONCTEUR_APPELS_MIN,
+        taux_echec=settings.DISJONCTEUR_TAUX_ECHEC,
+        latence_max_s=settings.DISJONCTEUR_LATENCE_MAX_S,
+        duree_ouverture_s=settings.DISJONCTEUR_OUVERTURE_S,
+        essais=settings.DISJONCTEUR_ESSAIS
+    )
+    observer_disjoncteur(disjoncteur)
+    return disjoncteur
+
+
+def creer_cache_partage(settings: Settings) -> Optional[CachePartage]:
+    """Crée le cache partagé Redis (None s'il n'est pas configuré)"""
+    if not settings.CACHE_PARTAGE_URL:
+        return None
+    redis = Redis.from_url(
+        settings.CACHE_PARTAGE_URL,
+        socket_timeout=settings.CACHE_PARTAGE_TIMEOUT_S,
+        socket_connect_timeout=settings.CACHE_PARTAGE_TIMEOUT_S
+    )
+    return CachePartage(redis, disjoncteur=creer_disjoncteur(settings, "redis"))
+
+
+class ClientsAmont:
+    """Clients des services amont partagés pendant toute la vie de l'application"""
+
+    def __init__(self, settings: Settings):
+        self.partage = creer_cache_partage(settings)
+        self.meteo = MeteoServiceClient(
+            settings.METEO_SERVICE_URL,
+            client=creer_client_http(settings),
+            cache_ttl_s=settings.METEO_CACHE_TTL_S,
+            staleness_max_s=settings.METEO_STALENESS_MAX_S,
+            disjoncteur=creer_disjoncteur(settings, "meteo"),
+            partage=self.partage,
+            partage_ttl_s=settings.CACHE_PARTAGE_TTL_METEO_S,
+            dernier_bon_max_s=settings.METEO_DERNIER_BON_MAX_S
+        )
+        self.bagage = BagageServiceClient(
+            settings.BAGAGE_SERVICE_URL,
+            client=creer_client_http(settings),
+            disjoncteur=creer_disjoncteur(settings, "bagages"),
+            derniers_bons_taille_max=settings.DERNIERS_BONS_TAILLE_MAX,
+            derniers_bons_ttl_s=settings.DERNIERS_BONS_TTL_S,
+            cache_taille_max=settings.BAGAGE_CACHE_TAILLE_MAX,
+            cache_ttl_s=settings.BAGAGE_CACHE_TTL_S,
+            partage=self.partage,
+            partage_ttl_s=settings.CACHE_PARTAGE_TTL_BAGAGE_S
+        )
+        self.vol = VolServiceClient(
+            settings.VOL_SERVICE_URL,
+            client=creer_client_http(settings),
+            cache_taille_max=settings.VOL_CACHE_TAILLE_MAX,
+            cache_ttl_s=settings.VOL_CACHE_TTL_S,
+            disjoncteur=creer_disjoncteur(settings, "vols"),
+            derniers_bons_ttl_s=settings.DERNIERS_BONS_TTL_S,
+            partage=self.partage,
+            partage_ttl_s=settings.CACHE_PARTAGE_TTL_VOL_S
+        )
+        if self.partage is not None:
+            # Invalidations publiées par les autres workers
+            self.partage.demarrer()
+
+    async def close(self):
+        """Ferme les pools de connexions"""
+        for client in (self.meteo, self.bagage, self.vol):
+            await client.close()
+        if self.partage is not None:
+            await self.partage.fermer()
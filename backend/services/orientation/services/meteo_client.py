@@ -1,35 +1,110 @@
 import httpx
-from typing import Dict, Any
+from typing import Callable, Dict, Any, Optional
 import logging
+import time
+
+from ..core.cache import CacheRevalidation
+from ..core.disjoncteur import Disjoncteur
+from ..metrics import REPLIS
+from .cache_partage import METEO, CachePartage
 
 logger = logging.getLogger(__name__)
 
+
+def meteo_par_defaut() -> Dict[str, Any]:
+    """Résumé météo neutre utilisé quand le service Météo ne répond pas"""
+    return {
+        "niveau_alerte": "faible",
+        "impact": {
+            "capacite_horaire_reduite": 0.0,
+            "retard_moyen": 0,
+            "pistes_principales_disponibles": 3,
+            "secteurs_congestionnes": [],
+            "conditions": []
+        }
+    }
+
+
 class MeteoServiceClient:
     """Client pour communiquer avec le service Météo IA"""
     
-    def __init__(self, base_url: str):
+    def __init__(
+        self,
+        base_url: str,
+        client: Optional[httpx.AsyncClient] = None,
+        cache_ttl_s: float = 30.0,
+        staleness_max_s: float = 600.0,
+        disjoncteur: Optional[Disjoncteur] = None,
+        partage: Optional[CachePartage] = None,
+        partage_ttl_s: float = 15.0,
+        dernier_bon_max_s: float = 1800.0,
+        horloge: Callable[[], float] = time.monotonic
+    ):
         self.base_url = base_url
-        self.client = httpx.AsyncClient(timeout=10.0)
+        # Client partagé (pool de connexions) si fourni, sinon client dédié
+        self.client = client or httpx.AsyncClient(timeout=10.0)
+        # Le résumé est le même pour tous les passagers de l'aéroport
+        self.cache_resume: CacheRevalidation[Dict[str, Any]] = CacheRevalidation(
+            cache_ttl_s, staleness_max_s, horloge
+        )
+        self.disjoncteur = disjoncteur or Disjoncteur("meteo")
+        # Dernier résumé obtenu, servi au-delà de staleness_max_s si le service est
+        # en panne, tant qu'il a moins de dernier_bon_max_s
+        self.dernier_resume: Optional[Dict[str, Any]] = None
+        self._dernier_resume_a = 0.0
+        self.dernier_bon_max_s = dernier_bon_max_s
+        self._horloge = horloge
+        # Cache partagé entre workers (L2): un seul appel au service Météo par
+        # `partage_ttl_s` pour tous les workers et réplicas
+        self.partage = partage
+        self.partage_ttl_s = partage_ttl_s
     
     async def get_meteo_summary(self) -> Dict[str, Any]:
-        """Récupère le résumé météo"""
+        """
+        Récupère le résumé météo (partagé, ne pas modifier).
+
+        Servi depuis le cache; une valeur périmée reste servie jusqu'à
+        `staleness_max_s` si le service Météo est indisponible, puis le
+        dernier résumé connu jusqu'à `dernier_bon_max_s`, à défaut un
+        résumé neutre.
+        """
+        resume = await self.cache_resume.obtenir(self._charger_resume)
+        if resume is not None:
+            return resume
+        if (
+            self.dernier_resume is not None
+            and self._horloge() - self._dernier_resume_a <= self.dernier_bon_max_s
+        ):
+            REPLIS.labels("meteo", "dernier_bon").inc()
+            return self.dernier_resume
+        REPLIS.labels("meteo", "defaut").inc()
+        return meteo_par_defaut()
+
+    async def _charger_resume(self) -> Dict[str, Any]:
+        """Résumé du cache partagé, sinon appel au service Météo (lève en cas d'erreur ou disjoncteur ouvert)"""
+        if self.partage is not None:
+            resume = await self.partage.lire(METEO, "resume")
+            if resume is not None:
+                self._memoriser(resume)
+                return resume
+        resume = await self.disjoncteur.executer(self._requete_resume)
+        self._memoriser(resume)
+        if self.partage is not None:
+            await self.partage.ecrire(METEO, "resume", resume, self.partage_ttl_s)
+        return resume
+
+    def _memoriser(self, resume: Dict[str, Any]):
+        self.dernier_resume = resume
+        self._dernier_resume_a = self._horloge()
+
+    async def _requete_resume(self) -> Dict[str, Any]:
         try:
             response = await self.client.get(f"{self.base_url}/api/meteo/summary")
             response.raise_for_status()
             return response.json()
         except httpx.HTTPError as e:
             logger.error(f"Erreur récupération météo: {e}")
-            # Retour par défaut en cas d'erreur
-            return {
-                "niveau_alerte": "faible",
-                "impact": {
-                    "capacite_horaire_reduite": 0.0,
-                    "retard_moyen": 0,
-                    "pistes_principales_disponibles": 3,
-                    "secteurs_congestionnes": [],
-                    "conditions": []
-                }
-            }
+            raise
     
     async def get_forecast(self, hours: int = 3) -> Dict[str, Any]:
         """Récupère les prévisions météo"""
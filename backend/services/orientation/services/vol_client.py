@@ -1,29 +1,186 @@
-from fastapi import HTTPException
-from typing import Any, Dict
-import logging 
+from fastapi import HTTPException, status
+from typing import Any, Dict, Optional
+import asyncio
+import logging
 import httpx
 
+from ..core.cache import CacheLRU, consommer_exception
+from ..core.disjoncteur import CircuitOuvert, Disjoncteur
+from ..metrics import REPLIS
+from .cache_partage import VOLS, CachePartage
+
 
 class VolServiceClient:
     """Client pour communiquer avec le service de gestion des vols"""
-    
-    def __init__(self, base_url: str):
+
+    def __init__(
+        self,
+        base_url: str,
+        client: Optional[httpx.AsyncClient] = None,
+        cache_taille_max: int = 2000,
+        cache_ttl_s: float = 60.0,
+        disjoncteur: Optional[Disjoncteur] = None,
+        derniers_bons_ttl_s: float = 3600.0,
+        partage: Optional[CachePartage] = None,
+        partage_ttl_s: float = 60.0
+    ):
         self.logger = logging.getLogger(__name__) # Initialize logger
         self.base_url = base_url
-        self.client = httpx.AsyncClient(timeout=10.0)
-    
+        # Client partagé (pool de connexions) si fourni, sinon client dédié
+        self.client = client or httpx.AsyncClient(timeout=10.0)
+        # Quelques centaines de vols couvrent tout le trafic de la journée
+        self.cache: CacheLRU[Dict[str, Any]] = CacheLRU(cache_taille_max, cache_ttl_s)
+        # Requêtes en cours par vol: les passagers d'un même vol partagent l'appel
+        self._en_cours: Dict[str, asyncio.Task] = {}
+        # Lectures en cours et compteur d'invalidations par vol: une réponse
+        # obtenue avant une invalidation ne doit pas être remise en cache.
+        # Les deux ne portent que sur les vols en cours de lecture.
+        self._chargements: Dict[str, int] = {}
+        self._generations: Dict[str, int] = {}
+        self.disjoncteur = disjoncteur or Disjoncteur("vols")
+        # Dernières informations obtenues par vol, servies quand le service est en panne
+        self.derniers_bons: CacheLRU[Dict[str, Any]] = CacheLRU(cache_taille_max, derniers_bons_ttl_s)
+        # Cache partagé entre workers (L2), consulté avant le service des vols
+        self.partage = partage
+        self.partage_ttl_s = partage_ttl_s
+        if partage is not None:
+            partage.abonner(VOLS, self.invalider, self.cache.vider)
+
     async def get_vol_info(self, numero_vol: str) -> Dict[str, Any]:
-        """Récupère les informations d'un vol"""
+        """Récupère les informations d'un vol (partagées, ne pas modifier)"""
+        vol = self.cache.get(numero_vol)
+        if vol is not None:
+            return vol
+
+        tache = self._en_cours.get(numero_vol)
+        if tache is None:
+            tache = asyncio.create_task(self._charger_vol(numero_vol))
+            self._en_cours[numero_vol] = tache
+            tache.add_done_callback(lambda t: self._terminer(numero_vol, t))
+            tache.add_done_callback(consommer_exception)
+        return await asyncio.shield(tache)
+
+    def _terminer(self, numero_vol: str, tache: asyncio.Task):
+        """Retire la requête terminée (sauf si une invalidation l'a déjà remplacée)"""
+        if self._en_cours.get(numero_vol) is tache:
+            del self._en_cours[numero_vol]
+
+    async def _charger_vol(self, numero_vol: str) -> Dict[str, Any]:
+        """
+        Appel réel au service des vols, avec mise en cache du résultat.
+
+        404 seulement si le service répond que le vol n'existe pas; service
+        en panne: dernières informations connues du vol, sinon 503.
+        """
+        generation = self._debut_chargement(numero_vol)
         try:
-            response = await self.client.get(f"{self.base_url}/api/vol/{numero_vol}")
+            vol = await self.partage.lire(VOLS, numero_vol) if self.partage is not None else None
+            depuis_partage = vol is not None
+            if vol is None:
+                vol = await self._lire_service(numero_vol)
+        finally:
+            frais = self._fin_chargement(numero_vol, generation)
+        if vol is None:
+            return self._repli(numero_vol)
+        if frais:
+            self.cache.set(numero_vol, vol)
+            self.derniers_bons.set(numero_vol, vol)
+            if self.partage is not None and not depuis_partage:
+                await self.partage.ecrire(VOLS, numero_vol, vol, self.partage_ttl_s)
+        return vol
+
+    async def _lire_service(self, numero_vol: str) -> Optional[Dict[str, Any]]:
+        """Vol lu au service des vols; None si le service est en panne"""
+        try:
+            response = await self.disjoncteur.executer(lambda: self._requete(numero_vol))
+            if response.status_code == status.HTTP_404_NOT_FOUND:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Vol {numero_vol} non trouvé"
+                )
             response.raise_for_status()
             return response.json()
-        except httpx.RequestError as e: # Use RequestError for connection issues
+        except CircuitOuvert:
+            return None
+        except httpx.HTTPError as e:
             self.logger.error(f"Erreur récupération vol {numero_vol}: {e}")
-            raise HTTPException(
-                status_code=404,
-                detail=f"Vol {numero_vol} non trouvé"
-            )
-    
+            return None
+
+    def _debut_chargement(self, numero_vol: str) -> int:
+        """Génération du vol au début d'une lecture (cache partagé ou service)"""
+        self._chargements[numero_vol] = self._chargements.get(numero_vol, 0) + 1
+        return self._generations.get(numero_vol, 0)
+
+    def _fin_chargement(self, numero_vol: str, generation: int) -> bool:
+        """Vrai si aucune invalidation n'a eu lieu pendant la lecture"""
+        frais = self._generations.get(numero_vol, 0) == generation
+        restants = self._chargements[numero_vol] - 1
+        if restants:
+            self._chargements[numero_vol] = restants
+        else:
+            # Plus de lecture en cours: la génération ne sert plus
+            del self._chargements[numero_vol]
+            self._generations.pop(numero_vol, None)
+        return frais
+
+    async def _requete(self, numero_vol: str) -> httpx.Response:
+        """Appel au service des vols; seules les erreurs 5xx comptent comme panne"""
+        response = await self.client.get(f"{self.base_url}/api/vol/{numero_vol}")
+        if response.status_code >= 500:
+            response.raise_for_status()
+        return response
+
+    def _repli(self, numero_vol: str) -> Dict[str, Any]:
+        vol = self.derniers_bons.get(numero_vol)
+        if vol is not None:
+            REPLIS.labels("vols", "dernier_bon").inc()
+            return vol
+        REPLIS.labels("vols", "indisponible").inc()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Service vols indisponible pour le vol {numero_vol}"
+        )
+
+    def invalider(self, numero_vol: str) -> bool:
+        """
+        Invalide le vol en cache.
+
+        Appelé par les événements de changement de porte ou de retard pour que
+        la prochaine orientation relise `porte_actuelle` et `heure_depart`.
+        Les dernières informations connues, désormais fausses, sont oubliées.
+        """
+        if numero_vol in self._chargements:
+            self._generations[numero_vol] = self._generations.get(numero_vol, 0) + 1
+        self._en_cours.pop(numero_vol, None)
+        self.derniers_bons.invalider(numero_vol)
+        invalide = self.cache.invalider(numero_vol)
+        if invalide:
+            self.logger.info(f"Cache vol {numero_vol} invalidé")
+        return invalide
+
+    async def invalider_partout(self, numero_vol: str, changements: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Invalide le vol dans ce worker, dans le cache partagé et dans les autres workers.
+
+        Si l'événement porte les nouvelles valeurs (`changements`, ex: porte,
+        heure de départ), le vol connu est remis en cache avec ces valeurs:
+        la prochaine orientation n'attend pas le service des vols.
+        """
+        connu = None
+        if changements:
+            connu = self.cache.get(numero_vol) or self.derniers_bons.get(numero_vol)
+        invalide = self.invalider(numero_vol)
+        if connu is None:
+            if self.partage is not None:
+                await self.partage.invalider(VOLS, numero_vol)
+            return invalide
+        vol = {**connu, **changements}
+        self.cache.set(numero_vol, vol)
+        self.derniers_bons.set(numero_vol, vol)
+        if self.partage is not None:
+            # Nouvelle valeur écrite en L2 avant la purge des autres workers
+            await self.partage.remplacer(VOLS, numero_vol, vol, self.partage_ttl_s)
+        return invalide
+
     async def close(self):
         await self.client.aclose()
@@ -1,7 +1,8 @@
 from asyncio.log import logger
 from typing import Optional
 from .core.decision_engine import DecisionEngine
-from .schemas.orientation import ActionType, TypeInstruction
+from .journal import JournalOrientations
+from .schemas.orientation import ActionType, OrientationResponse, TypeInstruction
 
 
 def generer_instructions(
@@ -56,7 +57,7 @@ def generer_instructions(
     
     # Cas 3: Zone d'attente (JITB)
     if situation["temps_disponible"] > 45 and situation["niveau_urgence"] != "critique":
-        zone = vol_data.get("porte_actuelle", "A1")[0]
+        zone = decision_engine.topologie.zone_porte(vol_data.get("porte_actuelle", "A1"))
         zone_attente = decision_engine._trouver_zone_attente_optimale(zone, situation)
         
         instructions.append({
@@ -151,16 +152,18 @@ def generer_alertes(situation: dict, meteo_data: dict, vol_data: dict) -> list:
 
 
 async def log_orientation(
+    journal: Optional[JournalOrientations],
     numero_vol: str,
     id_bagage: str,
-    situation: dict,
-    instructions: list
+    position_estimee: Optional[str],
+    reponse: OrientationResponse,
+    meteo_data: dict,
+    bagage_data: dict
 ):
-    """Log l'orientation en arrière-plan (optionnel)"""
-    logger.info(
-        f"Orientation calculée - Vol: {numero_vol}, "
-        f"Bagage: {id_bagage}, "
-        f"Urgence: {situation['niveau_urgence']}, "
-        f"Instructions: {len(instructions)}"
+    """Log l'orientation (DEBUG) en arrière-plan et la dépose dans le journal (si actif)"""
+    logger.debug(
+        "Orientation calculée - Vol: %s, Bagage: %s, Urgence: %s, Instructions: %d",
+        numero_vol, id_bagage, reponse.situation.niveau_urgence, len(reponse.instructions)
     )
-    
\ No newline at end of file
+    if journal is not None:
+        journal.enregistrer(numero_vol, id_bagage, position_estimee, reponse, meteo_data, bagage_data)
@@ -40,6 +40,13 @@ def disable_otlp():
     os.environ["OTEL_EXPORTER_OTLP_ENABLED"] = "false"
 
 
+@pytest.fixture(autouse=True)
+def qr_codes_temporaires(tmp_path, monkeypatch):
+    # Les QR codes des bagages créés en test ne sont pas écrits dans l'arborescence
+    from services.baggage.core import utils
+    monkeypatch.setattr(utils, "QR_CODES_DIR", str(tmp_path / "qr_codes"))
+
+
 
 @pytest_asyncio.fixture
 async def client(db_session):
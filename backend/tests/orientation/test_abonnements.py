@@ -0,0 +1,221 @@
+import asyncio
+import json
+import pytest
+import pytest_asyncio
+import httpx
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+
+from services.orientation.abonnements import GestionnaireAbonnements
+from services.orientation.core.config import Settings
+from services.orientation.core.decision_engine import DecisionEngine
+from services.orientation.core.roue_temporelle import RoueTemporelle
+from services.orientation.dependencies.services import get_gestionnaire_abonnements
+from services.orientation.main import app
+from services.orientation.services.meteo_client import MeteoServiceClient
+from services.orientation.services.baggage_client import BagageServiceClient
+from services.orientation.services.vol_client import VolServiceClient
+
+
+def _gestionnaire(etat):
+    depart = (datetime.now() + timedelta(hours=2)).isoformat()
+
+    def handler(request):
+        chemin = request.url.path
+        etat["appels"] += 1
+        if chemin.startswith("/api/meteo"):
+            return httpx.Response(200, json={"niveau_alerte": "faible", "impact": {}})
+        if chemin.startswith("/api/bag/"):
+            return httpx.Response(200, json={"id": chemin.rsplit("/", 1)[1], "statut": etat["statut"]})
+        return httpx.Response(200, json={
+            "numero": chemin.rsplit("/", 1)[1], "heure_depart": depart,
+            "porte_originale": "G20", "porte_actuelle": etat["porte"]
+        })
+
+    def http():
+        return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    settings = Settings()
+    return GestionnaireAbonnements(
+        settings,
+        DecisionEngine(settings),
+        MeteoServiceClient("http://meteo", client=http()),
+        BagageServiceClient("http://bagages", client=http()),
+        VolServiceClient("http://vols", client=http())
+    )
+
+
+class Horloge:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+class TestGestionnaireAbonnements:
+    """Tests du recalcul incrémental des orientations poussées"""
+
+    @pytest.fixture
+    def etat(self):
+        return {"porte": "G20", "statut": "EN_SOUTE", "appels": 0}
+
+    @pytest_asyncio.fixture
+    async def gestionnaire(self, etat):
+        gestionnaire = _gestionnaire(etat)
+        yield gestionnaire
+        await gestionnaire.fermer()
+        for client in (gestionnaire.meteo_client, gestionnaire.bagage_client, gestionnaire.vol_client):
+            await client.close()
+
+    async def test_premiere_orientation_envoyee(self, gestionnaire):
+        _, file = gestionnaire.abonner("AF1234", "BAG12345", "entree")
+
+        message = json.loads(await asyncio.wait_for(file.get(), timeout=2))
+
+        assert message["success"] is True
+        assert message["numero_vol"] == "AF1234"
+
+    async def test_sans_changement_ni_recalcul_ni_envoi(self, gestionnaire):
+        cle = ("AF1234", "BAG12345", "entree")
+        _, file = gestionnaire.abonner(*cle)
+        await gestionnaire.revalider([cle])
+        await gestionnaire.revalider([cle])
+
+        assert gestionnaire.recalculs == 1
+        assert file.qsize() == 1
+
+    async def test_recalcul_sans_envoi_si_orientation_identique(self, gestionnaire):
+        cle = ("AF1234", "BAG12345", "entree")
+        _, file = gestionnaire.abonner(*cle)
+        await gestionnaire.revalider([cle])
+
+        # Le contrôle A ne dessert pas la zone G: l'orientation ne change pas
+        gestionnaire.decision_engine.attente_controles.enregistrer("A", arrivees=50, passages=5)
+        await gestionnaire.revalider([cle])
+
+        assert gestionnaire.recalculs == 2
+        assert gestionnaire.envois == 1
+
+    async def test_changement_porte_pousse(self, gestionnaire, etat):
+        cle = ("AF1234", "BAG12345", "entree")
+        _, file = gestionnaire.abonner(*cle)
+        premier = json.loads(await asyncio.wait_for(file.get(), timeout=2))
+
+        etat["porte"] = "C5"
+        gestionnaire.vol_client.invalider("AF1234")
+        gestionnaire.notifier_vol("AF1234")
+        second = json.loads(await asyncio.wait_for(file.get(), timeout=2))
+
+        assert premier["situation"]["changement_porte"] is False
+        assert second["situation"]["changement_porte"] is True
+
+    async def test_orientations_poussees_journalisees(self, gestionnaire, etat):
+        lignes = []
+
+        class Journal:
+            def enregistrer(self, numero_vol, id_bagage, position, reponse, meteo_data, bagage_data):
+                lignes.append((numero_vol, id_bagage, reponse.situation.changement_porte))
+
+        gestionnaire.journal = Journal()
+        cle = ("AF1234", "BAG12345", "entree")
+        gestionnaire.abonner(*cle)
+        await gestionnaire.revalider([cle])
+        await gestionnaire.revalider([cle])
+        etat["porte"] = "C5"
+        gestionnaire.vol_client.invalider("AF1234")
+        await gestionnaire.revalider([cle])
+
+        # Une ligne par orientation envoyée, pas par revalidation
+        assert lignes == [("AF1234", "BAG12345", False), ("AF1234", "BAG12345", True)]
+
+    async def test_abonnes_partagent_le_calcul(self, gestionnaire):
+        cle = ("AF1234", "BAG12345", "entree")
+        abonnement, file_1 = gestionnaire.abonner(*cle)
+        await gestionnaire.revalider([cle])
+        _, file_2 = gestionnaire.abonner(*cle)
+
+        # Le second client reçoit la dernière orientation sans recalcul
+        assert file_2.qsize() == 1
+        assert gestionnaire.recalculs == 1
+
+        gestionnaire.desabonner(abonnement, file_1)
+        gestionnaire.desabonner(abonnement, file_2)
+        assert len(gestionnaire) == 0
+
+    async def test_depart_porte_planifie_puis_notifie(self, gestionnaire, etat):
+        horloge = Horloge()
+        gestionnaire.departs = RoueTemporelle(horloge=horloge)
+        cle = ("AF1234", "BAG12345", "entree")
+        _, file = gestionnaire.abonner(*cle)
+        await gestionnaire.revalider([cle])
+        file.get_nowait()
+
+        # Départ dans 2h: notification à 2h - (marche salon → porte + 20min de marge)
+        marche = gestionnaire.decision_engine.parcours.temps("restaurant-g", "porte-G20")
+        assert gestionnaire.departs.echeance(cle) == pytest.approx(7200 - (marche + 20) * 60, abs=5)
+
+        # Changement de porte: replanifiée avec la nouvelle marche
+        etat["porte"] = "G24"
+        gestionnaire.vol_client.invalider("AF1234")
+        await gestionnaire.revalider([cle])
+        file.get_nowait()
+        marche = gestionnaire.decision_engine.parcours.temps("restaurant-g", "porte-G24")
+        assert gestionnaire.departs.echeance(cle) == pytest.approx(7200 - (marche + 20) * 60, abs=5)
+
+        horloge.t += 7200
+        gestionnaire._notifier_departs(gestionnaire.departs.avancer())
+        message = json.loads(file.get_nowait())
+
+        assert message["type"] == "depart_porte"
+        assert message["porte"] == "G24"
+        assert gestionnaire.notifications == 1
+        assert len(gestionnaire.departs) == 0
+
+    async def test_desabonnement_annule_le_depart(self, gestionnaire):
+        cle = ("AF1234", "BAG12345", "entree")
+        abonnement, file = gestionnaire.abonner(*cle)
+        await gestionnaire.revalider([cle])
+        assert cle in gestionnaire.departs
+
+        gestionnaire.desabonner(abonnement, file)
+        assert cle not in gestionnaire.departs
+
+    async def test_evenement_revalide_les_seuls_concernes(self, gestionnaire):
+        porte_g = ("AF1234", "BAG12345", "entree")
+        porte_b = ("AF1234", "BAG67890", "porte")
+        gestionnaire.abonner(*porte_g)
+        gestionnaire.abonner(*porte_b)
+        await gestionnaire.revalider([porte_g, porte_b])
+
+        # Relevé au contrôle C: seul le passager qui doit encore le passer
+        gestionnaire.notifier([("controle", "C")])
+        assert gestionnaire._a_revalider(periodique=False) == [porte_g]
+
+        # Congestion météo de la zone G: les deux passagers de l'AF1234 (porte G20)
+        gestionnaire.decision_engine.appliquer_meteo({"impact": {"secteurs_congestionnes": ["G"]}})
+        assert sorted(gestionnaire._a_revalider(periodique=False)) == sorted([porte_g, porte_b])
+        gestionnaire.notifier([("zone", "A")])
+        assert gestionnaire._a_revalider(periodique=False) == []
+
+
+class TestOrientationWebSocket:
+    """Tests de la route WebSocket"""
+
+    def test_orientation_recue_a_la_connexion(self):
+        etat = {"porte": "G20", "statut": "EN_SOUTE", "appels": 0}
+        gestionnaire = _gestionnaire(etat)
+        app.dependency_overrides[get_gestionnaire_abonnements] = lambda: gestionnaire
+        try:
+            with TestClient(app) as client:
+                with client.websocket_connect("/api/orientation/ws/af1234/bag12345?position_estimee=entree") as ws:
+                    message = ws.receive_json()
+                    # Même forme que l'identifiant des événements bagage
+                    cles = list(gestionnaire._abonnements)
+        finally:
+            app.dependency_overrides.clear()
+
+        assert message["success"] is True
+        assert message["numero_vol"] == "AF1234"
+        assert cles == [("AF1234", "BAG12345", "entree")]
+        assert len(gestionnaire) == 0
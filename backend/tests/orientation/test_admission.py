@@ -0,0 +1,89 @@
+import asyncio
+import pytest
+
+from services.orientation.core.admission import CRITIQUE, ELEVEE, NORMALE, ControleAdmission, Surcharge
+
+
+class TestControleAdmission:
+    """Places de calcul, file par priorité et délestage"""
+
+    @staticmethod
+    def _admission(concurrence_max=1, file_max=10, attente_max_s=(1.0, 1.0, 1.0)):
+        admission = ControleAdmission(concurrence_max, file_max, attente_max_s)
+        decisions = []
+        admission.observateurs.append(lambda priorite, resultat: decisions.append((priorite, resultat)))
+        return admission, decisions
+
+    async def test_file_servie_par_priorite(self):
+        admission, _ = self._admission()
+        ordre = []
+        liberer = asyncio.Event()
+
+        async def requete(nom, priorite):
+            async with admission.admettre(priorite):
+                ordre.append(nom)
+                await liberer.wait()
+
+        premiere = asyncio.create_task(requete("premiere", NORMALE))
+        await asyncio.sleep(0)
+        taches = [
+            asyncio.create_task(requete("normale", NORMALE)),
+            asyncio.create_task(requete("elevee", ELEVEE)),
+            asyncio.create_task(requete("critique", CRITIQUE)),
+        ]
+        await asyncio.sleep(0)
+        assert admission.en_cours == 1
+        assert len(admission) == 3
+
+        liberer.set()
+        await asyncio.gather(premiere, *taches)
+
+        assert ordre == ["premiere", "critique", "elevee", "normale"]
+        assert admission.en_cours == 0
+
+    async def test_budget_d_attente(self):
+        admission, decisions = self._admission(attente_max_s=(1.0, 1.0, 0.01))
+        await admission.entrer(NORMALE)
+
+        with pytest.raises(Surcharge) as erreur:
+            await admission.entrer(NORMALE)
+
+        assert erreur.value.priorite == NORMALE
+        assert len(admission) == 0
+        assert decisions == [("normale", "admise"), ("normale", "expiree")]
+        admission.sortir()
+        assert admission.en_cours == 0
+
+    async def test_file_pleine_evince_la_moins_prioritaire(self):
+        admission, decisions = self._admission(file_max=1)
+        await admission.entrer(NORMALE)
+        normale = asyncio.create_task(admission.entrer(NORMALE))
+        await asyncio.sleep(0)
+
+        # Même priorité: refusée; plus prioritaire: prend la place
+        with pytest.raises(Surcharge):
+            await admission.entrer(NORMALE)
+        critique = asyncio.create_task(admission.entrer(CRITIQUE))
+        await asyncio.sleep(0)
+
+        with pytest.raises(Surcharge):
+            await normale
+        admission.sortir()
+        await critique
+        assert ("normale", "rejetee") in decisions
+        assert ("normale", "evincee") in decisions
+        assert decisions[-1] == ("critique", "attente")
+        assert admission.en_cours == 1
+
+    async def test_annulation_en_attente(self):
+        admission, _ = self._admission()
+        await admission.entrer(NORMALE)
+        attente = asyncio.create_task(admission.entrer(CRITIQUE))
+        await asyncio.sleep(0)
+
+        attente.cancel()
+        await asyncio.gather(attente, return_exceptions=True)
+        admission.sortir()
+
+        assert len(admission) == 0
+        assert admission.en_cours == 0
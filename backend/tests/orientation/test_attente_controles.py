@@ -0,0 +1,114 @@
+import pytest
+
+from services.orientation.core.attente_controles import EstimateurAttenteControles, attente_erlang_c
+from services.orientation.core.config import Settings
+from services.orientation.core.decision_engine import DecisionEngine
+
+
+class Horloge:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+class TestErlangC:
+    """Tests du modèle de file M/M/c"""
+
+    def test_une_file_mm1(self):
+        # M/M/1: Wq = rho / (mu - lambda)
+        assert attente_erlang_c(2.0, 3.0, 1) == pytest.approx((2 / 3) / (3 - 2))
+
+    def test_deux_files(self):
+        # M/M/2, lambda=3, mu=2: P(attente)=9/14, Wq = P / (c*mu - lambda)
+        assert attente_erlang_c(3.0, 2.0, 2) == pytest.approx((9 / 14) / (4 - 3))
+
+    def test_sature_et_vide(self):
+        assert attente_erlang_c(10.0, 3.0, 2) == float("inf")
+        assert attente_erlang_c(0.0, 3.0, 2) == 0.0
+
+
+class TestEstimateurAttente:
+    """Tests de l'estimation en continu de l'attente aux contrôles"""
+
+    @pytest.fixture
+    def horloge(self):
+        return Horloge()
+
+    @pytest.fixture
+    def estimateur(self, horloge):
+        return EstimateurAttenteControles(fenetre_s=600, granularite_s=10, debit_file_min=3.0, horloge=horloge)
+
+    def test_sans_releve(self, estimateur):
+        assert estimateur.attente("A") is None
+
+    def test_rush_file_qui_grossit(self, estimateur, horloge):
+        # 2 files à 3 pax/min, 20 arrivées/min pendant 5 min
+        for minute in range(5):
+            horloge.t = minute * 60
+            estimateur.enregistrer("A", arrivees=20, passages=6, files_ouvertes=2)
+
+        # 70 passagers en file, écoulés à ~6/min
+        assert estimateur.attente("A") == pytest.approx(70 / 6, rel=0.2)
+
+    def test_fenetre_glissante(self, estimateur, horloge):
+        estimateur.enregistrer("A", arrivees=100, passages=40, files_ouvertes=2)
+        en_rush = estimateur.attente("A")
+
+        # Dix minutes plus tard, le rush est sorti de la fenêtre et la file résorbée
+        horloge.t = 700
+        estimateur.enregistrer("A", arrivees=1, passages=1, file_attente=0)
+
+        assert estimateur.attente("A") < en_rush
+        assert estimateur._fenetres["A"].somme_arrivees == 1
+
+    def test_estimation_perimee(self, estimateur, horloge):
+        estimateur.enregistrer("A", arrivees=10, passages=5, files_ouvertes=1)
+        horloge.t = 601
+
+        assert estimateur.attente("A") is None
+
+    def test_version_a_l_expiration(self, estimateur, horloge):
+        estimateur.enregistrer("A", arrivees=10, passages=5, files_ouvertes=1)
+        horloge.t = 300
+        estimateur.enregistrer("B", arrivees=10, passages=5, files_ouvertes=1)
+        version = estimateur.version
+
+        horloge.t = 600
+        assert estimateur.version == version
+        # A sort de la fenêtre, puis B: les mémos des lecteurs sont périmés
+        horloge.t = 601
+        assert estimateur.version == version + 1
+        assert estimateur.version == version + 1
+        horloge.t = 901
+        assert estimateur.version == version + 2
+
+    def test_publication_par_remplacement(self, estimateur):
+        avant = estimateur.estimations
+        estimateur.enregistrer("B", arrivees=5, passages=5)
+
+        # Les lecteurs en cours gardent un instantané cohérent
+        assert "B" not in avant
+        assert "B" in estimateur.estimations
+        assert estimateur.version == 1
+
+
+class TestControleEnDirect:
+    """Le moteur de décision suit les attentes mesurées"""
+
+    def test_bascule_vers_controle_moins_charge(self):
+        engine = DecisionEngine(Settings())
+        situation = {"niveau_urgence": "faible"}
+        vol_data = {"porte_actuelle": "C5"}
+
+        # Sans relevé: temps moyens statiques (C=10 < B=20)
+        assert engine.choisir_meilleur_controle(situation, vol_data)["id"] == "C"
+
+        engine.attente_controles.enregistrer("C", arrivees=60, passages=6, files_ouvertes=1)
+        engine.attente_controles.enregistrer("B", arrivees=2, passages=2, files_ouvertes=3)
+        controle = engine.choisir_meilleur_controle(situation, vol_data)
+
+        assert controle["id"] == "B"
+        assert controle["alternative"] == "C"
+        assert controle["temps_attente"] < 20
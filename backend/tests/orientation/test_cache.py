@@ -0,0 +1,235 @@
+import asyncio
+import pytest
+import httpx
+
+from services.orientation.core.cache import CacheLRU, CacheRevalidation
+from services.orientation.services.meteo_client import MeteoServiceClient
+from services.orientation.services.vol_client import VolServiceClient
+
+
+class Horloge:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+class TestCacheRevalidation:
+    """Tests du cache single-flight / stale-while-revalidate"""
+
+    async def test_un_seul_appel_pour_appels_concurrents(self):
+        appels = 0
+
+        async def charger():
+            nonlocal appels
+            appels += 1
+            await asyncio.sleep(0.05)
+            return {"niveau_alerte": "moyen"}
+
+        cache = CacheRevalidation(ttl_s=30, staleness_max_s=600)
+        resultats = await asyncio.gather(*[cache.obtenir(charger) for _ in range(50)])
+
+        assert appels == 1
+        assert all(r == {"niveau_alerte": "moyen"} for r in resultats)
+
+    async def test_valeur_perimee_servie_pendant_rafraichissement(self):
+        horloge = Horloge()
+        valeurs = iter(["v1", "v2"])
+        appels = 0
+
+        async def charger():
+            nonlocal appels
+            appels += 1
+            await asyncio.sleep(0.01)
+            return next(valeurs)
+
+        cache = CacheRevalidation(ttl_s=30, staleness_max_s=600, horloge=horloge)
+        assert await cache.obtenir(charger) == "v1"
+
+        horloge.t = 60
+        # Valeur périmée servie immédiatement, un seul rafraîchissement lancé
+        assert await cache.obtenir(charger) == "v1"
+        assert await cache.obtenir(charger) == "v1"
+        await asyncio.sleep(0.05)
+        assert appels == 2
+        assert await cache.obtenir(charger) == "v2"
+
+    async def test_staleness_max_quand_service_indisponible(self):
+        horloge = Horloge()
+        panne = False
+
+        async def charger():
+            if panne:
+                raise httpx.ConnectError("down")
+            return "v1"
+
+        cache = CacheRevalidation(ttl_s=30, staleness_max_s=600, horloge=horloge)
+        await cache.obtenir(charger)
+
+        panne = True
+        horloge.t = 300
+        assert await cache.obtenir(charger) == "v1"
+        horloge.t = 700
+        assert await cache.obtenir(charger) is None
+
+
+class TestMeteoClientCache:
+    """Tests du cache dans le client météo"""
+
+    async def test_resume_mis_en_cache(self):
+        appels = 0
+
+        def handler(request):
+            nonlocal appels
+            appels += 1
+            return httpx.Response(200, json={"niveau_alerte": "critique", "impact": {}})
+
+        client = MeteoServiceClient(
+            "http://meteo", client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        )
+        for _ in range(5):
+            resume = await client.get_meteo_summary()
+        await client.close()
+
+        assert appels == 1
+        assert resume["niveau_alerte"] == "critique"
+
+    async def test_repli_par_defaut_sans_valeur(self):
+        def handler(request):
+            return httpx.Response(503)
+
+        client = MeteoServiceClient(
+            "http://meteo", client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        )
+        resume = await client.get_meteo_summary()
+        await client.close()
+
+        assert resume["niveau_alerte"] == "faible"
+
+    async def test_dernier_resume_borne_en_age(self):
+        horloge = Horloge()
+        reponses = [httpx.Response(200, json={"niveau_alerte": "critique", "impact": {}})]
+
+        def handler(request):
+            return reponses.pop(0) if reponses else httpx.Response(503)
+
+        client = MeteoServiceClient(
+            "http://meteo",
+            client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+            cache_ttl_s=30,
+            staleness_max_s=600,
+            dernier_bon_max_s=1800,
+            horloge=horloge
+        )
+        await client.get_meteo_summary()
+
+        # Service en panne: au-delà de staleness_max_s, dernier résumé connu...
+        horloge.t = 1000
+        assert (await client.get_meteo_summary())["niveau_alerte"] == "critique"
+        # ... puis résumé neutre au-delà de dernier_bon_max_s
+        horloge.t = 2000
+        assert (await client.get_meteo_summary())["niveau_alerte"] == "faible"
+        await client.close()
+
+
+class TestCacheLRU:
+    """Tests du cache LRU avec durée de vie"""
+
+    def test_expiration_et_compteurs(self):
+        horloge = Horloge()
+        cache = CacheLRU(taille_max=10, ttl_s=60, horloge=horloge)
+        cache.set("AF1234", {"porte_actuelle": "A1"})
+
+        assert cache.get("AF1234") == {"porte_actuelle": "A1"}
+        horloge.t = 61
+        assert cache.get("AF1234") is None
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_eviction_lru(self):
+        cache = CacheLRU(taille_max=2, ttl_s=60)
+        cache.set("AF1", 1)
+        cache.set("AF2", 2)
+        cache.get("AF1")
+        cache.set("AF3", 3)
+
+        assert cache.get("AF2") is None
+        assert cache.get("AF1") == 1
+        assert len(cache) == 2
+
+
+class TestVolClientCache:
+    """Tests du cache dans le client vols"""
+
+    @staticmethod
+    def _client(portes):
+        appels = []
+
+        def handler(request):
+            appels.append(request.url.path)
+            return httpx.Response(200, json={"numero": "AF1234", "porte_actuelle": portes[len(appels) - 1]})
+
+        client = VolServiceClient(
+            "http://vols", client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        )
+        return client, appels
+
+    async def test_un_appel_par_vol(self):
+        client, appels = self._client(["A1"])
+        resultats = await asyncio.gather(*[client.get_vol_info("AF1234") for _ in range(20)])
+        await client.close()
+
+        assert len(appels) == 1
+        assert all(r["porte_actuelle"] == "A1" for r in resultats)
+
+    async def test_invalidation_changement_porte(self):
+        client, appels = self._client(["A1", "F10"])
+        assert (await client.get_vol_info("AF1234"))["porte_actuelle"] == "A1"
+        assert (await client.get_vol_info("AF1234"))["porte_actuelle"] == "A1"
+
+        assert client.invalider("AF1234") is True
+        assert (await client.get_vol_info("AF1234"))["porte_actuelle"] == "F10"
+        await client.close()
+
+        assert len(appels) == 2
+        assert client.cache.stats()["invalidations"] == 1
+
+    async def test_invalidation_pendant_la_lecture(self):
+        en_vol = asyncio.Event()
+        reprise = asyncio.Event()
+        appels = []
+
+        async def handler(request):
+            appels.append(request.url.path)
+            if len(appels) == 1:
+                en_vol.set()
+                await reprise.wait()
+                return httpx.Response(200, json={"numero": "AF1234", "porte_actuelle": "A1"})
+            return httpx.Response(200, json={"numero": "AF1234", "porte_actuelle": "F10"})
+
+        client = VolServiceClient("http://vols", client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+        tache = asyncio.create_task(client.get_vol_info("AF1234"))
+        await en_vol.wait()
+        client.invalider("AF1234")
+        reprise.set()
+        await tache
+
+        assert client.cache.get("AF1234") is None
+        assert (await client.get_vol_info("AF1234"))["porte_actuelle"] == "F10"
+        # Générations oubliées une fois les lectures terminées, y compris sans lecture en cours
+        client.invalider("KL5678")
+        assert client._generations == {} and client._chargements == {}
+        await client.close()
+
+    async def test_evenement_reamorce_le_cache(self):
+        client, appels = self._client(["A1"])
+        await client.get_vol_info("AF1234")
+
+        await client.invalider_partout("AF1234", {"porte_actuelle": "F10", "heure_depart": "2026-10-18T12:00:00"})
+        vol = await client.get_vol_info("AF1234")
+        await client.close()
+
+        assert len(appels) == 1
+        assert vol == {"numero": "AF1234", "porte_actuelle": "F10", "heure_depart": "2026-10-18T12:00:00"}
+        assert client.derniers_bons.get("AF1234") == vol
@@ -0,0 +1,292 @@
+import asyncio
+import json
+import pytest
+import httpx
+
+from services.orientation.core.disjoncteur import OUVERT, Disjoncteur
+from services.orientation.services import cache_partage
+from services.orientation.services.baggage_client import BagageServiceClient
+from services.orientation.services.cache_partage import BAGAGES, CachePartage, deserialiser, serialiser
+from services.orientation.services.meteo_client import MeteoServiceClient
+from services.orientation.services.vol_client import VolServiceClient
+
+
+class FauxRedis:
+    """Redis en mémoire: GET/MGET/SET/DELETE, pipelines et pub/sub (un serveur partagé par plusieurs clients)"""
+
+    def __init__(self, serveur=None):
+        self.serveur = serveur if serveur is not None else {"valeurs": {}, "abonnes": [], "pipelines": 0}
+        self.panne = False
+
+    def client(self):
+        return FauxRedis(self.serveur)
+
+    def _verifier(self):
+        if self.panne:
+            raise ConnectionError("redis down")
+
+    async def get(self, cle):
+        self._verifier()
+        return self.serveur["valeurs"].get(cle)
+
+    def pipeline(self, transaction=True):
+        return FauxPipeline(self)
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        return FauxPubSub(self)
+
+    async def aclose(self):
+        pass
+
+
+class FauxPipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commandes = []
+
+    def mget(self, cles):
+        self.commandes.append(lambda v: [v.get(cle) for cle in cles])
+
+    def set(self, cle, valeur, px=None):
+        self.commandes.append(lambda v: v.__setitem__(cle, valeur))
+
+    def delete(self, cle):
+        self.commandes.append(lambda v: v.pop(cle, None))
+
+    def publish(self, canal, message):
+        def _publier(_):
+            for abonne in self.redis.serveur["abonnes"]:
+                abonne.put_nowait({"type": "message", "data": message.encode()})
+        self.commandes.append(_publier)
+
+    async def execute(self):
+        self.redis._verifier()
+        self.redis.serveur["pipelines"] += 1
+        return [commande(self.redis.serveur["valeurs"]) for commande in self.commandes]
+
+
+class FauxPubSub:
+    def __init__(self, redis):
+        self.redis = redis
+        self.file = asyncio.Queue()
+
+    async def subscribe(self, canal):
+        self.redis._verifier()
+        self.redis.serveur["abonnes"].append(self.file)
+
+    async def get_message(self, timeout=0.0):
+        try:
+            return await asyncio.wait_for(self.file.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def aclose(self):
+        if self.file in self.redis.serveur["abonnes"]:
+            self.redis.serveur["abonnes"].remove(self.file)
+
+
+def http_vols(appels, portes):
+    def handler(request):
+        appels.append(request.url.path)
+        return httpx.Response(200, json={"numero": "AF1234", "porte_actuelle": portes[len(appels) - 1]})
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def http_bagages(appels):
+    def handler(request):
+        identifiant = request.url.path.rsplit("/", 1)[1]
+        appels.append(identifiant)
+        return httpx.Response(200, json={"id": identifiant, "statut": "EN_SOUTE"})
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+class TestSerialisation:
+    """JSON compact, relisible avec ou sans orjson"""
+
+    def test_aller_retour(self, monkeypatch):
+        valeur = {"numero": "AF1234", "porte_actuelle": "Échelle G21", "passagers": [1, 2]}
+        compact = serialiser(valeur)
+        monkeypatch.setattr(cache_partage, "orjson", None)
+
+        assert serialiser(valeur) == compact
+        assert deserialiser(compact) == valeur
+        assert b" " not in serialiser({"a": [1, 2]})
+        assert json.loads(compact) == valeur
+
+
+class TestCachePartage:
+    """Cache L2 partagé entre workers"""
+
+    async def test_nouveau_worker_deja_chaud(self):
+        redis = FauxRedis()
+        appels = []
+        worker_a = VolServiceClient("http://vols", client=http_vols(appels, ["A1"]), partage=CachePartage(redis.client()))
+        worker_b = VolServiceClient("http://vols", client=http_vols(appels, ["A1"]), partage=CachePartage(redis.client()))
+
+        await worker_a.get_vol_info("AF1234")
+        vol = await worker_b.get_vol_info("AF1234")
+        await worker_b.get_vol_info("AF1234")
+
+        assert vol["porte_actuelle"] == "A1"
+        assert len(appels) == 1
+        assert worker_b.partage.hits == 1
+        assert worker_b.cache.stats()["hits"] == 1
+
+    async def test_meteo_un_appel_pour_tous_les_workers(self):
+        redis = FauxRedis()
+        appels = []
+
+        def handler(request):
+            appels.append(request.url.path)
+            return httpx.Response(200, json={"niveau_alerte": "moyen", "impact": {}})
+
+        workers = [
+            MeteoServiceClient(
+                "http://meteo",
+                client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+                partage=CachePartage(redis.client())
+            )
+            for _ in range(4)
+        ]
+        resumes = [await worker.get_meteo_summary() for worker in workers]
+
+        assert len(appels) == 1
+        assert all(resume["niveau_alerte"] == "moyen" for resume in resumes)
+
+    async def test_lot_bagages_un_seul_aller_retour(self):
+        redis = FauxRedis()
+        appels = []
+        worker_a = BagageServiceClient("http://bagages", client=http_bagages(appels), partage=CachePartage(redis.client()))
+        worker_b = BagageServiceClient("http://bagages", client=http_bagages(appels), partage=CachePartage(redis.client()))
+        await worker_a.get_bagages_status([f"BAG{k}" for k in range(6)])
+        appels.clear()
+        redis.serveur["pipelines"] = 0
+
+        statuts = await worker_b.get_bagages_status([f"BAG{k}" for k in range(10)])
+
+        assert sorted(appels) == ["BAG6", "BAG7", "BAG8", "BAG9"]
+        assert list(statuts) == [f"BAG{k}" for k in range(10)]
+        # Un MGET pipeliné pour les 10 bagages, une écriture groupée des 4 manquants
+        assert redis.serveur["pipelines"] == 2
+        assert f"orientation:{BAGAGES}:BAG9" in redis.serveur["valeurs"]
+
+    async def test_mget_par_lots(self):
+        redis = FauxRedis()
+        partage = CachePartage(redis, mget_lot=3)
+        await partage.ecrire_plusieurs(BAGAGES, {f"BAG{k}": {"k": k} for k in range(7)}, ttl_s=10)
+
+        trouves = await partage.lire_plusieurs(BAGAGES, [f"BAG{k}" for k in range(10)])
+
+        assert trouves == {f"BAG{k}": {"k": k} for k in range(7)}
+        assert partage.stats()["misses"] == 3
+
+    async def test_invalidation_purge_les_autres_workers(self):
+        redis = FauxRedis()
+        appels = []
+        portes = ["A1", "F10"]
+        worker_a = VolServiceClient("http://vols", client=http_vols(appels, portes), partage=CachePartage(redis.client()))
+        worker_b = VolServiceClient("http://vols", client=http_vols(appels, portes), partage=CachePartage(redis.client()))
+        worker_b.partage.demarrer()
+        try:
+            await asyncio.sleep(0)
+            assert (await worker_a.get_vol_info("AF1234"))["porte_actuelle"] == "A1"
+            assert (await worker_b.get_vol_info("AF1234"))["porte_actuelle"] == "A1"
+
+            await worker_a.invalider_partout("AF1234")
+            await asyncio.sleep(0.01)
+
+            assert (await worker_b.get_vol_info("AF1234"))["porte_actuelle"] == "F10"
+            assert len(appels) == 2
+        finally:
+            await worker_b.partage.fermer()
+
+    async def test_evenement_vol_repris_par_tous_les_workers(self):
+        redis = FauxRedis()
+        appels = []
+        worker_a = VolServiceClient("http://vols", client=http_vols(appels, ["A1", "A1"]), partage=CachePartage(redis.client()))
+        worker_b = VolServiceClient("http://vols", client=http_vols(appels, ["A1", "A1"]), partage=CachePartage(redis.client()))
+        worker_a.partage.demarrer()
+        worker_b.partage.demarrer()
+        try:
+            await asyncio.sleep(0)
+            await worker_a.get_vol_info("AF1234")
+            await worker_b.get_vol_info("AF1234")
+
+            await worker_a.invalider_partout("AF1234", {"porte_actuelle": "F10"})
+            # La valeur partagée n'a jamais disparu: aucun worker ne relit l'ancienne en amont
+            assert deserialiser(redis.serveur["valeurs"][f"orientation:{VOLS}:AF1234"])["porte_actuelle"] == "F10"
+            await asyncio.sleep(0.01)
+
+            # Le worker émetteur ignore sa propre invalidation et garde la nouvelle valeur
+            assert worker_a.cache.get("AF1234")["porte_actuelle"] == "F10"
+            assert worker_a.derniers_bons.get("AF1234")["porte_actuelle"] == "F10"
+            assert worker_b.cache.get("AF1234") is None
+            assert (await worker_b.get_vol_info("AF1234"))["porte_actuelle"] == "F10"
+            assert len(appels) == 1
+        finally:
+            await worker_a.partage.fermer()
+            await worker_b.partage.fermer()
+
+    async def test_redis_indisponible(self):
+        redis = FauxRedis()
+        redis.panne = True
+        appels = []
+        partage = CachePartage(redis, disjoncteur=Disjoncteur("redis", appels_min=2))
+        client = BagageServiceClient("http://bagages", client=http_bagages(appels), partage=partage)
+
+        statuts = await client.get_bagages_status(["BAG1", "BAG2"])
+        bagage = await client.get_bagage_status("BAG3")
+
+        # Redis en panne: les statuts viennent du service, le disjoncteur coupe Redis
+        assert statuts["BAG2"]["statut"] == "EN_SOUTE"
+        assert bagage["id"] == "BAG3"
+        assert len(appels) == 3
+        assert partage.disjoncteur.etat == OUVERT
+
+    async def test_cache_local_bagage_invalide(self):
+        appels = []
+        client = BagageServiceClient("http://bagages", client=http_bagages(appels), cache_ttl_s=5)
+
+        await client.get_bagage_status("BAG1")
+        await client.get_bagage_status("BAG1")
+        assert await client.invalider_partout("BAG1") is True
+        await client.get_bagage_status("BAG1")
+
+        assert appels == ["BAG1", "BAG1"]
+
+    async def test_evenement_pendant_la_lecture_bagage(self):
+        redis = FauxRedis()
+        appels = []
+        en_vol = asyncio.Event()
+        reprise = asyncio.Event()
+
+        async def handler(request):
+            appels.append(request.url.path)
+            if len(appels) == 1:
+                en_vol.set()
+                await reprise.wait()
+                return httpx.Response(200, json={"id": "BAG1", "statut": "EN_SOUTE"})
+            return httpx.Response(200, json={"id": "BAG1", "statut": "MAL_ACHEMINE"})
+
+        client = BagageServiceClient(
+            "http://bagages",
+            client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+            cache_ttl_s=5,
+            partage=CachePartage(redis)
+        )
+        for lecture in (client.get_bagage_status, lambda id_bagage: client.get_bagages_status([id_bagage])):
+            appels.clear()
+            en_vol.clear()
+            reprise.clear()
+            tache = asyncio.create_task(lecture("BAG1"))
+            await en_vol.wait()
+            # Statut changé pendant l'appel: l'ancienne réponse ne doit pas être mise en cache
+            await client.invalider_partout("BAG1")
+            reprise.set()
+            await tache
+
+            assert client.cache.get("BAG1") is None
+            assert f"orientation:{BAGAGES}:BAG1" not in redis.serveur["valeurs"]
+            assert (await client.get_bagage_status("BAG1"))["statut"] == "MAL_ACHEMINE"
+            assert client._generations == {} and client._chargements == {}
+            await client.invalider_partout("BAG1")
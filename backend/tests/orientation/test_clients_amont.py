@@ -0,0 +1,45 @@
+import importlib.util
+import logging
+import pytest
+
+from services.orientation.core.config import Settings
+from services.orientation.dependencies import services as deps
+from services.orientation.services import http_pool
+from services.orientation.services.http_pool import ClientsAmont, creer_client_http
+
+
+class TestClientsAmont:
+    """Tests des clients amont partagés"""
+
+    async def test_clients_partages_entre_requetes(self):
+        await deps.fermer_clients_amont()
+        try:
+            assert deps.get_meteo_client() is deps.get_meteo_client()
+            assert deps.get_vol_client() is deps.get_clients_amont().vol
+        finally:
+            await deps.fermer_clients_amont()
+
+    async def test_fermeture_des_pools(self):
+        clients = ClientsAmont(Settings())
+        http = clients.bagage.client
+        await clients.close()
+        assert http.is_closed
+
+    async def test_http2_sans_h2_repli_http1(self, monkeypatch, caplog):
+        find_spec = importlib.util.find_spec
+
+        def sans_h2(nom, *args):
+            return None if nom == "h2" else find_spec(nom, *args)
+
+        # Indépendant de la présence de `h2` dans l'environnement de test
+        monkeypatch.setattr(importlib.util, "find_spec", sans_h2)
+
+        with caplog.at_level(logging.WARNING, logger=http_pool.__name__):
+            client = creer_client_http(Settings(HTTP2_ACTIVE=True))
+        try:
+            # Pool httpx en HTTP/1.1 seulement
+            assert client._transport._pool._http2 is False
+            assert client._transport._pool._http1 is True
+            assert "repli sur HTTP/1.1" in caplog.text
+        finally:
+            await client.aclose()
@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from services.orientation.core.coalescence import CALCUL, PARTAGE, Coalescence
+
+
+class TestCoalescence:
+    """Requêtes identiques simultanées: un seul calcul"""
+
+    async def test_calcul_partage(self):
+        coalescence = Coalescence("test")
+        appels = 0
+
+        async def calcul():
+            nonlocal appels
+            appels += 1
+            await asyncio.sleep(0.02)
+            return {"porte": "G20"}
+
+        resultats = await asyncio.gather(*[coalescence.executer(("AF1234", "BAG1", None), calcul) for _ in range(5)])
+        autre = await coalescence.executer(("AF1234", "BAG2", None), calcul)
+
+        assert appels == 2
+        assert all(r is resultats[0] for r in resultats)
+        assert autre == {"porte": "G20"}
+        assert (coalescence.calculs, coalescence.partages) == (2, 4)
+        # Rien n'est gardé une fois le calcul terminé
+        assert len(coalescence) == 0
+
+    async def test_exception_partagee(self):
+        coalescence = Coalescence("test")
+
+        async def calcul():
+            await asyncio.sleep(0.01)
+            raise ValueError("vol inconnu")
+
+        resultats = await asyncio.gather(
+            coalescence.executer("cle", calcul), coalescence.executer("cle", calcul), return_exceptions=True
+        )
+
+        assert all(isinstance(r, ValueError) for r in resultats)
+        assert coalescence.calculs == 1
+
+    async def test_abandon_du_premier_client(self):
+        coalescence = Coalescence("test")
+        observes = []
+        coalescence.observateurs.append(lambda nom, resultat: observes.append(resultat))
+
+        async def calcul():
+            await asyncio.sleep(0.02)
+            return 42
+
+        premier = asyncio.create_task(coalescence.executer("cle", calcul))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(coalescence.executer("cle", calcul))
+        await asyncio.sleep(0)
+        premier.cancel()
+
+        assert await second == 42
+        with pytest.raises(asyncio.CancelledError):
+            await premier
+        assert observes == [CALCUL, PARTAGE]
@@ -0,0 +1,155 @@
+import pytest
+import httpx
+from fastapi import HTTPException
+from httpx import ASGITransport, AsyncClient
+
+from services.orientation.core.disjoncteur import DEMI_OUVERT, FERME, OUVERT, CircuitOuvert, Disjoncteur
+from services.orientation.main import app
+from services.orientation.metrics import observer_disjoncteur
+from services.orientation.services.baggage_client import BagageServiceClient
+from services.orientation.services.vol_client import VolServiceClient
+
+
+class Horloge:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+async def _echec():
+    raise httpx.ConnectError("down")
+
+
+async def _succes():
+    return "ok"
+
+
+class TestDisjoncteur:
+    """Tests des transitions du disjoncteur"""
+
+    @pytest.fixture
+    def horloge(self):
+        return Horloge()
+
+    @pytest.fixture
+    def disjoncteur(self, horloge):
+        return Disjoncteur("test", fenetre=10, appels_min=4, taux_echec=0.5, duree_ouverture_s=15, horloge=horloge)
+
+    async def _appeler(self, disjoncteur, appel):
+        try:
+            return await disjoncteur.executer(appel)
+        except (httpx.HTTPError, CircuitOuvert) as e:
+            return e
+
+    async def test_ouverture_sur_taux_echec(self, disjoncteur):
+        for appel in (_succes, _echec, _succes):
+            await self._appeler(disjoncteur, appel)
+        assert disjoncteur.etat == FERME
+
+        await self._appeler(disjoncteur, _echec)  # 2 échecs sur 4
+        assert disjoncteur.etat == OUVERT
+        assert isinstance(await self._appeler(disjoncteur, _succes), CircuitOuvert)
+
+    async def test_appels_lents_comptes_comme_echecs(self, disjoncteur, horloge):
+        async def _lent():
+            horloge.t += 2
+            return "ok"
+
+        for _ in range(4):
+            assert await self._appeler(disjoncteur, _lent) == "ok"
+        assert disjoncteur.etat == OUVERT
+
+    async def test_demi_ouvert_referme_sur_succes(self, disjoncteur, horloge):
+        for _ in range(4):
+            await self._appeler(disjoncteur, _echec)
+        horloge.t = 16
+
+        assert disjoncteur.autoriser()
+        assert disjoncteur.etat == DEMI_OUVERT
+        # Un seul appel d'essai à la fois
+        assert not disjoncteur.autoriser()
+        disjoncteur.enregistrer(False)
+        assert disjoncteur.etat == FERME
+
+    async def test_demi_ouvert_rouvre_sur_echec(self, disjoncteur, horloge):
+        for _ in range(4):
+            await self._appeler(disjoncteur, _echec)
+        horloge.t = 16
+
+        await self._appeler(disjoncteur, _echec)
+        assert disjoncteur.etat == OUVERT
+        horloge.t = 20
+        assert isinstance(await self._appeler(disjoncteur, _succes), CircuitOuvert)
+
+    async def test_metriques_exportees(self, disjoncteur):
+        observer_disjoncteur(disjoncteur)
+        for _ in range(4):
+            await self._appeler(disjoncteur, _echec)
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/metrics")
+        assert 'orientation_disjoncteur_etat{amont="test"} 2.0' in response.text
+        assert 'orientation_disjoncteur_transitions_total{amont="test",etat="ouvert"} 1.0' in response.text
+
+
+class TestReplisAmont:
+    """Dernière réponse valide servie pendant une panne"""
+
+    @staticmethod
+    def _http(etat):
+        def handler(request):
+            if etat["panne"]:
+                raise httpx.ConnectError("down")
+            if request.url.path.endswith("/INCONNU"):
+                return httpx.Response(404)
+            identifiant = request.url.path.rsplit("/", 1)[1]
+            return httpx.Response(200, json={"id": identifiant, "numero": identifiant, "statut": "MAL_ACHEMINE"})
+        return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    async def test_bagage_dernier_statut_connu(self):
+        etat = {"panne": False}
+        disjoncteur = Disjoncteur("bagages", appels_min=2)
+        client = BagageServiceClient("http://bagages", client=self._http(etat), disjoncteur=disjoncteur)
+        await client.get_bagage_status("BAG1")
+
+        etat["panne"] = True
+        for _ in range(3):
+            bagage = await client.get_bagage_status("BAG1")
+        inconnu = await client.get_bagage_status("BAG2")
+        await client.close()
+
+        assert disjoncteur.etat == OUVERT
+        assert bagage["statut"] == "MAL_ACHEMINE"
+        assert inconnu["statut"] == "ENREGISTRE"
+
+    async def test_vol_404_seulement_si_inexistant(self):
+        etat = {"panne": False}
+        client = VolServiceClient("http://vols", client=self._http(etat))
+
+        with pytest.raises(HTTPException) as introuvable:
+            await client.get_vol_info("INCONNU")
+        etat["panne"] = True
+        with pytest.raises(HTTPException) as panne:
+            await client.get_vol_info("AF1234")
+        await client.close()
+
+        assert introuvable.value.status_code == 404
+        assert panne.value.status_code == 503
+        # Un 404 n'est pas une panne du service
+        assert client.disjoncteur._echecs == 1
+
+    async def test_vol_dernieres_informations_sauf_invalidation(self):
+        etat = {"panne": False}
+        client = VolServiceClient("http://vols", client=self._http(etat), cache_ttl_s=0)
+        await client.get_vol_info("AF1234")
+
+        etat["panne"] = True
+        assert (await client.get_vol_info("AF1234"))["numero"] == "AF1234"
+        client.invalider("AF1234")
+        with pytest.raises(HTTPException) as exc:
+            await client.get_vol_info("AF1234")
+        await client.close()
+
+        assert exc.value.status_code == 503
@@ -0,0 +1,51 @@
+from services.orientation.core.config import Settings
+from services.orientation.core.decision_engine import DecisionEngine
+from services.orientation.core.index_inverse import IndexInverse, dependances_noeud, dependances_orientation
+
+
+class TestIndexInverse:
+    """Index dépendance -> abonnements"""
+
+    def test_reindexation_incrementale(self):
+        index = IndexInverse()
+        index.indexer("P1", [("vol", "AF1"), ("porte", "G20"), ("zone", "G")])
+        index.indexer("P2", [("vol", "AF1"), ("porte", "G21"), ("zone", "G")])
+
+        assert index.concernes([("zone", "G")]) == {"P1", "P2"}
+        assert index.concernes([("porte", "G20"), ("porte", "C5")]) == {"P1"}
+
+        # Changement de porte de P1: seules ses entrées porte et zone bougent
+        index.indexer("P1", [("vol", "AF1"), ("porte", "C5"), ("zone", "C")])
+        assert index.concernes([("porte", "G20")]) == set()
+        assert index.concernes([("zone", "C")]) == {"P1"}
+        assert index.concernes([("vol", "AF1")]) == {"P1", "P2"}
+
+    def test_retrait(self):
+        index = IndexInverse()
+        index.indexer("P1", [("vol", "AF1"), ("zone", "G")])
+        index.retirer("P1")
+        index.retirer("P1")
+
+        assert len(index) == 0
+        assert index.statistiques() == {"cles": 0, "dependances": 0, "entrees": 0}
+
+
+class TestDependancesOrientation:
+    """Entrées dont dépend une orientation"""
+
+    def test_controles_candidats_et_zones(self):
+        engine = DecisionEngine(Settings())
+
+        depuis_entree = dependances_orientation(engine, "AF1234", "BAG1", "entree", {"porte_actuelle": "B3"})
+        a_la_porte = dependances_orientation(engine, "AF1234", "BAG1", "porte", {"porte_actuelle": "B3"})
+
+        assert {("controle", "A"), ("controle", "B"), ("porte", "B3"), ("zone", "B")} <= depuis_entree
+        assert not any(type_ == "controle" for type_, _ in a_la_porte)
+
+    def test_noeuds(self):
+        engine = DecisionEngine(Settings())
+
+        assert dependances_noeud(engine, "securite-C") == [("controle", "C")]
+        assert dependances_noeud(engine, "porte-G20") == [("zone", "G"), ("porte", "G20")]
+        assert dependances_noeud(engine, "zone-F") == [("zone", "F")]
+        assert dependances_noeud(engine, "entree") == []
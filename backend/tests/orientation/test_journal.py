@@ -0,0 +1,113 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from services.orientation.core.config import Settings
+from services.orientation.core.decision_engine import DecisionEngine
+from services.orientation.journal import JournalOrientations
+from services.orientation.models.orientation import NiveauUrgence, OrientationLog
+from services.orientation.pipeline import calculer_orientation
+
+
+def _reponse(engine: DecisionEngine):
+    vol_data = {
+        "numero": "AF1234",
+        "heure_depart": (datetime.now() + timedelta(hours=2)).isoformat(),
+        "porte_originale": "G20",
+        "porte_actuelle": "G22"
+    }
+    return calculer_orientation(
+        engine, "AF1234", "entree", {"niveau_alerte": "faible", "impact": {}}, {"statut": "EN_SOUTE"}, vol_data
+    )
+
+
+class TestJournalOrientations:
+    """Tests de l'écriture groupée du journal des orientations"""
+
+    @pytest_asyncio.fixture
+    async def base(self):
+        moteur = create_async_engine("sqlite+aiosqlite://")
+        async with moteur.begin() as connexion:
+            await connexion.run_sync(OrientationLog.__table__.create)
+        yield moteur
+        await moteur.dispose()
+
+    @pytest.fixture
+    def reponse(self):
+        return _reponse(DecisionEngine(Settings()))
+
+    def _journal(self, base, **reglages) -> JournalOrientations:
+        settings = Settings(**{"JOURNAL_DELAI_S": 0.05, **reglages})
+        return JournalOrientations(settings, async_sessionmaker(base, expire_on_commit=False))
+
+    @staticmethod
+    async def _compter(base) -> int:
+        async with base.connect() as connexion:
+            return (await connexion.execute(select(func.count()).select_from(OrientationLog))).scalar_one()
+
+    async def _enregistrer(self, journal, reponse, n, statut="EN_SOUTE"):
+        for i in range(n):
+            journal.enregistrer("AF1234", f"BAG{i:06d}", "entree", reponse, {"impact": {"retard_moyen": 5}}, {"statut": statut})
+
+    @pytest.mark.asyncio
+    async def test_ecriture_par_lots(self, base, reponse):
+        journal = self._journal(base, JOURNAL_LOT_MAX=10)
+        journal.demarrer()
+        await self._enregistrer(journal, reponse, 25)
+        await asyncio.sleep(0.2)
+
+        assert await self._compter(base) == 25
+        assert journal.lots == 3
+        await journal.fermer()
+
+    @pytest.mark.asyncio
+    async def test_contenu_des_lignes(self, base, reponse):
+        journal = self._journal(base)
+        journal.demarrer()
+        await self._enregistrer(journal, reponse, 1, statut="STATUT_INCONNU")
+        await journal.fermer()
+
+        async with base.connect() as connexion:
+            ligne = (await connexion.execute(select(OrientationLog.__table__))).one()._mapping
+        assert ligne["niveau_urgence"] == NiveauUrgence(reponse.situation.niveau_urgence)
+        assert ligne["statut_bagage"] is None
+        assert ligne["temps_disponible"] == reponse.situation.temps_disponible
+        assert ligne["impact_meteo"] == {"retard_moyen": 5}
+        assert len(ligne["instructions"]) == len(reponse.instructions)
+        assert ligne["parcours"][-1]["zone"] == "G"
+
+    @pytest.mark.asyncio
+    async def test_file_pleine_abandonne(self, base, reponse):
+        # Écrivain non démarré: la file se remplit
+        journal = self._journal(base, JOURNAL_FILE_MAX=5)
+        await self._enregistrer(journal, reponse, 8)
+
+        assert journal.abandonnees == 3
+        assert journal.statistiques()["en_attente"] == 5
+
+    @pytest.mark.asyncio
+    async def test_vidange_a_l_arret(self, base, reponse):
+        journal = self._journal(base, JOURNAL_LOT_MAX=4, JOURNAL_DELAI_S=60)
+        journal.demarrer()
+        await self._enregistrer(journal, reponse, 10)
+        await asyncio.sleep(0)
+        await journal.fermer()
+
+        assert await self._compter(base) == 10
+        assert journal.ecrites == 10
+
+    @pytest.mark.asyncio
+    async def test_echec_ecriture_compte(self, reponse):
+        moteur = create_async_engine("sqlite+aiosqlite://")  # Table absente
+        journal = self._journal(moteur)
+        journal.demarrer()
+        await self._enregistrer(journal, reponse, 3)
+        await journal.fermer()
+        await moteur.dispose()
+
+        assert journal.perdues == 3
+        assert journal.ecrites == 0
@@ -0,0 +1,118 @@
+import itertools
+import pytest
+from datetime import datetime, timedelta
+
+from services.orientation.core.config import Settings
+from services.orientation.core.decision_engine import DecisionEngine
+from services.orientation.core.moteur_vectoriel import ManifesteVectoriel, NIVEAUX_URGENCE
+from services.orientation.utils import generer_alertes, generer_instructions
+
+
+def _vol(numero, minutes, porte_originale="A1", porte_actuelle="A1"):
+    # +30s: pas de changement de minute entre chemin scalaire et vectoriel
+    depart = None if minutes is None else (datetime.now() + timedelta(minutes=minutes, seconds=30)).isoformat()
+    return {
+        "numero": numero, "heure_depart": depart,
+        "porte_originale": porte_originale, "porte_actuelle": porte_actuelle, "terminal": "2"
+    }
+
+
+class TestManifesteVectoriel:
+    """Le mode vectoriel doit donner les mêmes résultats que le chemin scalaire"""
+
+    @pytest.fixture
+    def engine(self):
+        return DecisionEngine(Settings())
+
+    @pytest.fixture
+    def vols(self):
+        return {
+            "AF0010": _vol("AF0010", 10),
+            "AF0025": _vol("AF0025", 25, "C1", "G24"),
+            "AF0040": _vol("AF0040", 40),
+            "AF0050": _vol("AF0050", 50, "B2", "F10"),
+            "AF0075": _vol("AF0075", 75),
+            "AF0120": _vol("AF0120", 120, "C5", "C5"),
+            "AF0999": _vol("AF0999", None),
+            "AF0000": _vol("AF0000", -20),
+        }
+
+    @staticmethod
+    def _passagers(vols):
+        statuts = ["EN_SOUTE", "MAL_ACHEMINE", "EN_VERIFICATION", "ENREGISTRE"]
+        positions = [None, "entree", "securite", "zone_embarquement", "porte"]
+        passagers, bagages = [], {}
+        for k, (numero_vol, statut, position) in enumerate(itertools.product(vols, statuts, positions)):
+            id_bagage = f"BAG{k:05d}"
+            passagers.append((numero_vol, id_bagage, position))
+            bagages[id_bagage] = {"id": id_bagage, "statut": statut}
+        return passagers, bagages
+
+    @pytest.mark.parametrize("niveau_alerte", ["faible", "moyen", "eleve", "critique"])
+    def test_identique_au_chemin_scalaire(self, engine, vols, niveau_alerte):
+        meteo_data = {"niveau_alerte": niveau_alerte, "impact": {"conditions": ["Orage"]}}
+        passagers, bagages = self._passagers(vols)
+        manifeste = ManifesteVectoriel(engine, passagers)
+        manifeste.definir_bagages(bagages)
+
+        resultat = manifeste.evaluer(meteo_data, vols)
+
+        assert len(resultat["orientations"]) == len(passagers)
+        for i, (numero_vol, id_bagage, position) in enumerate(passagers):
+            situation = engine.analyser_situation(meteo_data, bagages[id_bagage], vols[numero_vol])
+            orientation = resultat["orientations"][i]
+            assert orientation["situation"] == situation
+            assert orientation["instructions"] == generer_instructions(
+                engine, situation, position, vols[numero_vol], bagages[id_bagage]
+            )
+            assert orientation["alertes"] == generer_alertes(situation, meteo_data, vols[numero_vol])
+            assert NIVEAUX_URGENCE[resultat["niveau_urgence"][i]] == situation["niveau_urgence"]
+            assert resultat["temps_disponible"][i] == situation["temps_disponible"]
+
+    def test_seuls_les_changements_sont_materialises(self, engine, vols):
+        meteo_data = {"niveau_alerte": "faible", "impact": {}}
+        passagers, bagages = self._passagers(vols)
+        manifeste = ManifesteVectoriel(engine, passagers)
+        manifeste.definir_bagages(bagages)
+        manifeste.evaluer(meteo_data, vols)
+
+        assert manifeste.evaluer(meteo_data, vols)["orientations"] == {}
+
+        # Changement de porte d'un vol et bagage retrouvé problématique pour un passager
+        vols = dict(vols, AF0120=_vol("AF0120", 120, "C5", "A3"))
+        manifeste.mettre_a_jour_bagage("BAG00000", {"statut": "MAL_ACHEMINE"})
+        resultat = manifeste.evaluer(meteo_data, vols)
+
+        modifies = {i for i, p in enumerate(passagers) if p[0] == "AF0120" or p[1] == "BAG00000"}
+        assert set(resultat["modifies"].tolist()) == modifies
+        assert resultat["orientations"][0]["situation"]["probleme_bagage"] is True
+
+    def test_passage_sous_le_seuil_critique(self, engine):
+        vols = {"AF1234": _vol("AF1234", 31)}
+        manifeste = ManifesteVectoriel(engine, [("AF1234", "BAG00001", "entree")])
+        meteo_data = {"niveau_alerte": "faible", "impact": {}}
+        maintenant = datetime.now().astimezone()
+
+        avant = manifeste.evaluer(meteo_data, vols, maintenant)
+        apres = manifeste.evaluer(meteo_data, vols, maintenant + timedelta(minutes=2))
+
+        assert NIVEAUX_URGENCE[avant["niveau_urgence"][0]] == "eleve"
+        assert apres["orientations"][0]["situation"]["niveau_urgence"] == "critique"
+
+    def test_valeurs_reprises_dans_la_sortie(self, engine):
+        vols = {"AF1234": _vol("AF1234", 20), "AF0120": _vol("AF0120", 120)}
+        passagers = [("AF1234", "BAG00001", "entree"), ("AF0120", "BAG00002", "entree")]
+        manifeste = ManifesteVectoriel(engine, passagers)
+        manifeste.definir_bagages({"BAG00002": {"statut": "MAL_ACHEMINE"}})
+        meteo_data = {"niveau_alerte": "faible", "impact": {}}
+        maintenant = datetime.now().astimezone()
+        manifeste.evaluer(meteo_data, vols, maintenant)
+
+        # Même urgence, mais "Temps limité: X minutes" et statut du bagage changent
+        manifeste.mettre_a_jour_bagage("BAG00002", {"statut": "EN_VERIFICATION"})
+        resultat = manifeste.evaluer(meteo_data, vols, maintenant + timedelta(minutes=1))
+
+        assert resultat["modifies"].tolist() == [0, 1]
+        alerte_temps = resultat["orientations"][0]["alertes"][-1]["message"]
+        assert alerte_temps == f"Temps limité: {resultat['temps_disponible'][0]} minutes avant le départ!"
+        assert "EN_VERIFICATION" in resultat["orientations"][1]["instructions"][0]["description"]
@@ -0,0 +1,74 @@
+from services.orientation.core.occupation_zones import OccupationZones, zone_de_position
+from services.orientation.core.topologie import FICHIER_DEFAUT, Topologie
+
+
+class Horloge:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+class TestOccupationZones:
+    """Tests du comptage par zone sur fenêtre glissante"""
+
+    def _occupation(self):
+        horloge = Horloge()
+        return OccupationZones(fenetre_s=600, granularite_s=60, horloge=horloge), horloge
+
+    def test_deplacement_compte_une_fois(self):
+        occupation, horloge = self._occupation()
+        occupation.observer("P1", "securite")
+        horloge.t = 120
+        occupation.observer("P1", "G")
+        occupation.observer("P2", "G")
+
+        assert occupation.instantane() == {"G": 2}
+
+    def test_sortie_de_fenetre(self):
+        occupation, horloge = self._occupation()
+        occupation.observer("P1", "A")
+        horloge.t = 300
+        occupation.observer("P2", "A")
+
+        horloge.t = 610  # P1 vu il y a plus de 10 minutes
+        assert occupation.instantane() == {"A": 1}
+        assert len(occupation) == 1
+
+        # Revu avant l'expiration: l'observation est prolongée
+        occupation.observer("P2", "A")
+        horloge.t = 1150
+        assert occupation.instantane() == {"A": 1}
+        horloge.t = 5000
+        assert occupation.instantane() == {}
+        assert len(occupation) == 0
+
+    def test_passager_sorti(self):
+        occupation, _ = self._occupation()
+        occupation.observer("P1", "C")
+        occupation.observer("P1", None)
+
+        assert occupation.instantane() == {}
+        assert occupation.evenements == 2
+
+    def test_zone_de_position(self):
+        topologie = Topologie.depuis_fichier(FICHIER_DEFAUT)
+
+        assert zone_de_position(topologie, "porte", "F10") == "F"
+        assert zone_de_position(topologie, "zone_embarquement", "G22") == "G"
+        assert zone_de_position(topologie, "securite", "G22") == "securite"
+        assert zone_de_position(topologie, None, "G22") is None
+
+    def test_comptes_par_vol(self):
+        occupation, horloge = self._occupation()
+        occupation.observer("P1", "securite", "AF1")
+        occupation.observer("P2", "G", "AF1")
+        occupation.observer("P1", "G")  # Positionnement: vol déjà connu
+        occupation.observer("P3", "G", "AF2")
+        assert occupation.par_vol == {"AF1": {"G": 2}, "AF2": {"G": 1}}
+
+        occupation.observer("P3", None)
+        horloge.t = 700
+        assert occupation.instantane() == {}
+        assert occupation.par_vol == {}
@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 import pytest_asyncio
 from datetime import datetime, timedelta
@@ -16,6 +17,61 @@ async def client():
         yield c
 
 
+@pytest.fixture
+def admin():
+    """Requêtes authentifiées comme administrateur"""
+    from types import SimpleNamespace
+    from services.auth.core.roles import UserRole
+    from services.auth.dependencies.user import get_current_user
+
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(role=UserRole.ADMIN)
+    yield
+    app.dependency_overrides.pop(get_current_user, None)
+
+
+@pytest_asyncio.fixture
+async def amont():
+    import httpx
+    from collections import Counter
+    from services.orientation.dependencies.services import (
+        get_meteo_client, get_bagage_client, get_vol_client
+    )
+    from services.orientation.services.meteo_client import MeteoServiceClient
+    from services.orientation.services.baggage_client import BagageServiceClient
+    from services.orientation.services.vol_client import VolServiceClient
+
+    appels = Counter()
+    depart = (datetime.now() + timedelta(hours=2)).isoformat()
+
+    def handler(request):
+        chemin = request.url.path
+        appels[chemin.rsplit("/", 1)[0]] += 1
+        if chemin.startswith("/api/meteo"):
+            return httpx.Response(200, json={"niveau_alerte": "faible", "impact": {}})
+        if chemin.startswith("/api/bag/"):
+            return httpx.Response(200, json={"id": chemin.rsplit("/", 1)[1], "statut": "EN_SOUTE"})
+        return httpx.Response(200, json={
+            "numero": chemin.rsplit("/", 1)[1], "heure_depart": depart,
+            "porte_originale": "A1", "porte_actuelle": "A1", "terminal": "2"
+        })
+
+    def http():
+        return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    clients = (
+        MeteoServiceClient("http://meteo", client=http()),
+        BagageServiceClient("http://bagages", client=http()),
+        VolServiceClient("http://vols", client=http())
+    )
+    app.dependency_overrides[get_meteo_client] = lambda: clients[0]
+    app.dependency_overrides[get_bagage_client] = lambda: clients[1]
+    app.dependency_overrides[get_vol_client] = lambda: clients[2]
+    yield appels
+    app.dependency_overrides.clear()
+    for c in clients:
+        await c.close()
+
+
 class TestOrientationAPI:
     """Tests pour l'API d'orientation"""
 
@@ -220,3 +276,458 @@ class TestDecisionEngine:
         position = "entree"
         parcours = engine.generer_parcours_jitb(situation, vol_data, position)
         assert not any("Zone d'Attente" in etape.get("nom", "") for etape in parcours)
+
+    def test_analyse_vol_partagee_entre_passagers(self, engine):
+        meteo_data = {"niveau_alerte": "moyen", "impact": {}}
+        vol_data = {"numero": "AF1234",
+                    "heure_depart": (datetime.now() + timedelta(hours=2)).isoformat(),
+                    "porte_originale": "G24",
+                    "porte_actuelle": "F12"}
+
+        s1 = engine.analyser_situation(meteo_data, {"statut": "EN_SOUTE"}, vol_data)
+        s2 = engine.analyser_situation(meteo_data, {"statut": "MAL_ACHEMINE"}, vol_data)
+
+        assert engine.analyser_vol(meteo_data, vol_data) is engine.analyser_vol(meteo_data, dict(vol_data))
+        assert s1["niveau_urgence"] == "moyen"
+        assert s2["niveau_urgence"] == "eleve"
+        assert s1["changement_porte"] and s2["changement_porte"]
+        assert s1["recommandations"] is not s2["recommandations"]
+
+    def test_analyse_vol_recalculee_si_porte_change(self, engine):
+        meteo_data = {"niveau_alerte": "faible", "impact": {}}
+        vol_data = {"numero": "AF1234",
+                    "heure_depart": (datetime.now() + timedelta(hours=2)).isoformat(),
+                    "porte_originale": "A1",
+                    "porte_actuelle": "A1"}
+
+        avant = engine.analyser_situation(meteo_data, {"statut": "EN_SOUTE"}, vol_data)
+        apres = engine.analyser_situation(meteo_data, {"statut": "EN_SOUTE"}, {**vol_data, "porte_actuelle": "C5"})
+
+        assert avant["changement_porte"] is False
+        assert apres["changement_porte"] is True
+
+
+class TestAdministration:
+    """Tests des routes d'administration"""
+
+    @pytest.mark.asyncio
+    async def test_evenement_vol_reserve_aux_administrateurs(self, client):
+        from types import SimpleNamespace
+        from services.auth.core.roles import UserRole
+        from services.auth.dependencies.user import get_current_user
+        from services.orientation.dependencies.services import get_vol_client
+
+        evenement = {"type": "CHANGEMENT_PORTE", "porte_actuelle": "Z99"}
+        anonyme = await client.post("/api/orientation/admin/vols/AF1234/evenements", json=evenement)
+        app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(role=UserRole.PASSAGER)
+        try:
+            passager = await client.post("/api/orientation/admin/vols/AF1234/evenements", json=evenement)
+        finally:
+            app.dependency_overrides.pop(get_current_user, None)
+
+        assert anonyme.status_code == 401
+        assert passager.status_code == 403
+        assert get_vol_client().cache.get("AF1234") is None
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("chemin, corps", [
+        ("/api/orientation/admin/topologie/aretes", {"depart": "zone-C", "arrivee": "porte-C5", "minutes": None}),
+        ("/api/orientation/admin/controles/C/releves", {"arrivees": 500, "passages": 0}),
+        ("/api/orientation/admin/bagages/BAG12345/evenements", None),
+        ("/api/orientation/admin/topologie/recharger", None),
+        ("/api/orientation/admin/zones/positions", [{"id_passager": "P1", "zone": "A"}]),
+    ])
+    async def test_ecritures_refusees_sans_authentification(self, client, chemin, corps):
+        response = await client.post(chemin, json=corps)
+
+        assert response.status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_evenement_vol_invalide_le_cache(self, client, admin):
+        from services.orientation.dependencies.services import get_vol_client
+
+        get_vol_client().cache.set("AF1234", {"numero": "AF1234", "porte_actuelle": "A1"})
+
+        response = await client.post(
+            "/api/orientation/admin/vols/af1234/evenements",
+            json={"type": "CHANGEMENT_PORTE", "porte_actuelle": "F10"}
+        )
+
+        assert response.status_code == 200
+        assert response.json()["invalide"] is True
+        # Le vol est remis en cache avec la porte portée par l'événement
+        assert get_vol_client().cache.get("AF1234") == {"numero": "AF1234", "porte_actuelle": "F10"}
+        get_vol_client().invalider("AF1234")
+
+    @pytest.mark.asyncio
+    async def test_evenement_vol_sans_valeurs(self, client, admin):
+        from services.orientation.dependencies.services import get_vol_client
+
+        get_vol_client().cache.set("AF1234", {"numero": "AF1234", "porte_actuelle": "A1"})
+
+        response = await client.post("/api/orientation/admin/vols/AF1234/evenements", json={"type": "RETARD"})
+
+        assert response.status_code == 200
+        assert get_vol_client().cache.get("AF1234") is None
+
+    @pytest.mark.asyncio
+    async def test_statistiques_cache(self, client, admin):
+        response = await client.get("/api/orientation/admin/cache")
+        assert response.status_code == 200
+        assert "hits" in response.json()["vols"]
+
+    @pytest.mark.asyncio
+    async def test_releve_controle(self, client, admin):
+        from services.orientation.dependencies.services import get_decision_engine
+
+        engine = DecisionEngine(Settings())
+        app.dependency_overrides[get_decision_engine] = lambda: engine
+        try:
+            response = await client.post(
+                "/api/orientation/admin/controles/c/releves",
+                json={"arrivees": 40, "passages": 10, "files_ouvertes": 2, "file_attente": 30}
+            )
+            inconnu = await client.post("/api/orientation/admin/controles/Z/releves", json={})
+            attentes = (await client.get("/api/orientation/admin/controles")).json()
+        finally:
+            app.dependency_overrides.pop(get_decision_engine, None)
+
+        assert response.status_code == 200
+        assert inconnu.status_code == 404
+        assert attentes["C"]["en_direct"] is True
+        assert attentes["A"] == {"attente_min": 15, "en_direct": False}
+
+    @pytest.mark.asyncio
+    async def test_couloir_inconnu(self, client, admin):
+        from services.orientation.dependencies.services import get_decision_engine
+
+        engine = DecisionEngine(Settings())
+        app.dependency_overrides[get_decision_engine] = lambda: engine
+        try:
+            response = await client.post(
+                "/api/orientation/admin/topologie/aretes",
+                json=[{"depart": "zone-G", "arrivee": "porte-G24"}, {"depart": "entree", "arrivee": "porte-G24", "minutes": 1}]
+            )
+        finally:
+            app.dependency_overrides.pop(get_decision_engine, None)
+
+        assert response.status_code == 404
+        # Lot refusé en bloc: le couloir existant n'a pas été fermé
+        assert engine.parcours.temps("entree", "porte-G24") is not None
+
+
+class TestOrientationBatch:
+    """Tests de l'orientation par lot"""
+
+    @staticmethod
+    def _passagers():
+        return [
+            {"numero_vol": vol, "id_bagage": f"BAG{vol}{i:03d}", "position_estimee": "entree"}
+            for vol in ("AF1234", "KL5678")
+            for i in range(30)
+        ]
+
+    @pytest.mark.asyncio
+    async def test_batch_dedoublonne_les_appels(self, client, amont):
+        response = await client.post("/api/orientation/batch", json={"passagers": self._passagers()})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 60
+        assert data["erreurs"] == 0
+        assert [r["index"] for r in data["resultats"]] == list(range(60))
+        assert amont["/api/meteo"] == 1
+        assert amont["/api/vol"] == 2
+        assert amont["/api/bag"] == 60
+
+    @pytest.mark.asyncio
+    async def test_batch_ndjson(self, client, amont):
+        import json
+
+        response = await client.post(
+            "/api/orientation/batch",
+            json={"passagers": self._passagers()[:5]},
+            headers={"Accept": "application/x-ndjson"}
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lignes = [json.loads(l) for l in response.text.splitlines()]
+        assert len(lignes) == 5
+        assert all(l["orientation"]["success"] for l in lignes)
+
+    @pytest.mark.asyncio
+    async def test_batch_position_invalide(self, client, amont):
+        passagers = self._passagers()[:2]
+        passagers[1]["position_estimee"] = "parking"
+
+        response = await client.post("/api/orientation/batch", json={"passagers": passagers})
+
+        data = response.json()
+        assert data["erreurs"] == 1
+        assert data["resultats"][1]["status_code"] == 400
+
+    @pytest.mark.asyncio
+    async def test_batch_numero_vol_invalide(self, client, amont):
+        passagers = self._passagers()[:3]
+        passagers[1]["numero_vol"] = "AF 12!"
+        passagers[2]["numero_vol"] = "AF1"
+
+        response = await client.post("/api/orientation/batch", json={"passagers": passagers})
+
+        # Les numéros mal formés n'échouent que leur ligne, pas tout le lot
+        assert response.status_code == 200
+        data = response.json()
+        assert data["erreurs"] == 2
+        assert data["resultats"][0]["orientation"]["success"]
+        assert [r["status_code"] for r in data["resultats"][1:]] == [400, 400]
+        assert data["resultats"][1]["erreur"] == "Numéro de vol invalide"
+        assert data["resultats"][1]["numero_vol"] == "AF 12!"
+
+
+class FauxJournal:
+    def __init__(self):
+        self.lignes = []
+
+    def enregistrer(self, numero_vol, id_bagage, position_estimee, reponse, meteo_data, bagage_data):
+        self.lignes.append((numero_vol, id_bagage, position_estimee, reponse.situation.niveau_urgence))
+        return True
+
+
+class TestJournalisation:
+    """Toutes les orientations servies sont journalisées"""
+
+    @pytest.fixture
+    def journal(self):
+        from services.orientation.dependencies.services import get_journal
+
+        journal = FauxJournal()
+        app.dependency_overrides[get_journal] = lambda: journal
+        return journal
+
+    @pytest.mark.asyncio
+    async def test_get_et_post(self, client, amont, journal):
+        await client.get("/api/orientation/AF1234/BAG123456?position_estimee=entree")
+        response = await client.post(
+            "/api/orientation/",
+            json={"numero_vol": "AF1234", "id_bagage": "BAG654321", "position_estimee": "securite"}
+        )
+
+        assert response.status_code == 200
+        assert journal.lignes == [
+            ("AF1234", "BAG123456", "entree", "faible"),
+            ("AF1234", "BAG654321", "securite", "faible")
+        ]
+
+    @pytest.mark.asyncio
+    async def test_lot(self, client, amont, journal):
+        passagers = TestOrientationBatch._passagers()[:3]
+        passagers[2]["position_estimee"] = "parking"
+
+        await client.post("/api/orientation/batch", json={"passagers": passagers})
+
+        # Le passager en erreur n'a pas d'orientation à journaliser
+        assert sorted(ligne[1] for ligne in journal.lignes) == ["BAGAF1234000", "BAGAF1234001"]
+
+
+class TestCacheHTTP:
+    """ETag, If-None-Match et Cache-Control des orientations"""
+
+    URL = "/api/orientation/AF1234/BAG123456?position_estimee=entree"
+
+    @pytest.mark.asyncio
+    async def test_etag_et_max_age(self, client, amont):
+        response = await client.get(self.URL)
+
+        assert response.status_code == 200
+        assert response.headers["etag"].startswith('"')
+        # Départ dans moins de 2 h, urgence faible
+        assert response.headers["cache-control"] == "max-age=60"
+
+    @pytest.mark.asyncio
+    async def test_304_si_inchange(self, client, amont):
+        premiere = await client.get(self.URL)
+        etag = premiere.headers["etag"]
+
+        response = await client.get(self.URL, headers={"If-None-Match": f'"autre", W/{etag}'})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    @pytest.mark.asyncio
+    async def test_200_si_etag_different(self, client, amont):
+        response = await client.get(self.URL, headers={"If-None-Match": '"perime"'})
+
+        assert response.status_code == 200
+        assert response.json()["success"] is True
+
+    def test_duree_selon_urgence(self):
+        from services.orientation.pipeline import duree_cache_s
+        from services.orientation.schemas.orientation import OrientationResponse
+
+        settings = Settings()
+
+        def reponse(niveau, temps):
+            return OrientationResponse(
+                success=True, numero_vol="AF1234", timestamp=datetime.now(),
+                situation={
+                    "type_trajet": "normal", "niveau_urgence": niveau, "probleme_bagage": False,
+                    "perturbation_meteo": False, "changement_porte": False,
+                    "temps_disponible": temps, "recommandations": []
+                },
+                instructions=[], alertes=[], parcours=[]
+            )
+
+        assert duree_cache_s(settings, reponse("faible", 240)) == settings.CACHE_HTTP_MAX_AGE_LONG_S
+        assert duree_cache_s(settings, reponse("faible", 120)) == settings.CACHE_HTTP_MAX_AGE_S["faible"]
+        assert duree_cache_s(settings, reponse("critique", 20)) == settings.CACHE_HTTP_MAX_AGE_S["critique"]
+        # Perturbation météo: fraîcheur courte même avec du temps
+        assert duree_cache_s(settings, reponse("moyen", 240)) == settings.CACHE_HTTP_MAX_AGE_S["moyen"]
+
+
+class TestOccupationZones:
+    """Occupation des zones alimentée par les orientations et les positions"""
+
+    @pytest.fixture
+    def occupation(self):
+        from services.orientation.core.occupation_zones import OccupationZones
+        from services.orientation.dependencies.services import get_occupation_zones
+
+        occupation = OccupationZones()
+        app.dependency_overrides[get_occupation_zones] = lambda: occupation
+        yield occupation
+        app.dependency_overrides.pop(get_occupation_zones, None)
+
+    @pytest.mark.asyncio
+    async def test_orientation_compte_le_passager(self, client, admin, amont, occupation):
+        await client.get("/api/orientation/AF1234/BAG12345?position_estimee=zone_embarquement")
+        await client.get("/api/orientation/AF1234/BAG67890?position_estimee=securite")
+        await client.get("/api/orientation/AF1234/BAG00001")  # Position inconnue: non comptée
+
+        response = await client.get("/api/orientation/admin/zones/occupation")
+        zones = response.json()["zones"]
+
+        assert zones["A"] == {"occupation": 1, "capacite": 500, "taux": 0.002}
+        assert zones["securite"]["occupation"] == 1
+        assert zones["G"]["occupation"] == 0
+
+    @pytest.mark.asyncio
+    async def test_evenements_de_positionnement(self, client, admin, occupation):
+        positions = [{"id_passager": f"P{k}", "zone": "G"} for k in range(11)]
+        await client.post("/api/orientation/admin/zones/positions", json=positions)
+        await client.post("/api/orientation/admin/zones/positions", json=[
+            {"id_passager": "P0", "zone": "F"}, {"id_passager": "P1", "zone": None}
+        ])
+        inconnue = await client.post("/api/orientation/admin/zones/positions", json=[{"id_passager": "P2", "zone": "Z"}])
+
+        response = await client.get("/api/orientation/admin/zones/occupation")
+        zones = response.json()["zones"]
+
+        assert inconnue.status_code == 404
+        assert zones["G"] == {"occupation": 9, "capacite": 550, "taux": 0.016}
+        assert zones["F"]["occupation"] == 1
+        assert response.json()["passagers"] == 10
+
+    @pytest.mark.asyncio
+    async def test_prevision_de_saturation(self, client, admin, amont, occupation):
+        from services.orientation.core.config import Settings
+        from services.orientation.dependencies.services import get_decision_engine, get_prevision
+        from services.orientation.prevision import PrevisionTerminal
+
+        indisponible = await client.get("/api/orientation/admin/zones/prevision")
+        prevision = PrevisionTerminal(Settings(), get_decision_engine(), occupation)
+        app.dependency_overrides[get_prevision] = lambda: prevision
+        try:
+            await client.get("/api/orientation/AF1234/BAG12345?position_estimee=zone_embarquement")
+            prevision.calculer()
+            response = await client.get("/api/orientation/admin/zones/prevision")
+        finally:
+            app.dependency_overrides.pop(get_prevision, None)
+
+        assert indisponible.status_code == 503
+        assert list(prevision.programme) == ["AF1234"]
+        corps = response.json()
+        assert corps["horizons_min"] == [15, 30, 45, 60]
+        assert corps["zones"]["A"] == [1.0, 1.0, 1.0, 1.0]
+        assert corps["alertes"] == []
+
+
+class TestCoalescenceOrientations:
+    """Orientations identiques simultanées"""
+
+    @pytest.mark.asyncio
+    async def test_requetes_identiques_partagees(self, client, admin, amont):
+        from services.orientation.core.coalescence import Coalescence
+        from services.orientation.dependencies.services import get_coalescence_orientations
+
+        coalescence = Coalescence("orientation")
+        app.dependency_overrides[get_coalescence_orientations] = lambda: coalescence
+        url = "/api/orientation/AF1234/BAG12345?position_estimee=entree"
+        reponses = await asyncio.gather(*[client.get(url) for _ in range(5)])
+        statistiques = (await client.get("/api/orientation/admin/cache")).json()["orientations"]
+
+        assert all(r.status_code == 200 for r in reponses)
+        assert len({r.headers["etag"] for r in reponses}) == 1
+        assert amont["/api/bag"] == 1
+        assert statistiques == {"en_cours": 0, "calculs": 1, "partages": 4}
+
+
+class TestMetriques:
+    """Durées par étape et niveaux d'urgence exposés sur /metrics"""
+
+    @pytest.mark.asyncio
+    async def test_etapes_et_urgences(self, client, amont):
+        from prometheus_client import REGISTRY
+
+        def compte(etape):
+            return REGISTRY.get_sample_value("orientation_etape_duree_secondes_count", {"etape": etape}) or 0
+
+        etapes = ["validation", "amont_meteo", "amont_bagages", "amont_vols", "situation", "parcours", "serialisation"]
+        avant = {etape: compte(etape) for etape in etapes}
+        faibles = REGISTRY.get_sample_value("orientation_urgence_total", {"niveau": "faible"}) or 0
+
+        response = await client.get("/api/orientation/AF1234/BAG654321?position_estimee=entree")
+        texte = (await client.get("/metrics")).text
+
+        assert response.status_code == 200
+        assert all(compte(etape) == avant[etape] + 1 for etape in etapes)
+        assert REGISTRY.get_sample_value("orientation_urgence_total", {"niveau": "faible"}) == faibles + 1
+        assert 'orientation_etape_duree_secondes_bucket{etape="parcours",le="2.5e-05"}' in texte
+
+
+class TestAdmission:
+    """Délestage des orientations en surcharge"""
+
+    URL = "/api/orientation/AF1234/BAG123456?position_estimee=entree"
+
+    @staticmethod
+    def _saturer():
+        from services.orientation.core.admission import ControleAdmission
+        from services.orientation.dependencies.services import get_admission
+
+        # Aucune place ni file: toute requête est délestée
+        app.dependency_overrides[get_admission] = lambda: ControleAdmission(0, 0, (0.0, 0.0, 0.0))
+
+    @pytest.mark.asyncio
+    async def test_503_si_vol_inconnu(self, client, amont):
+        self._saturer()
+        response = await client.get(self.URL)
+
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "5"
+        assert amont["/api/vol"] == 0
+
+    @pytest.mark.asyncio
+    async def test_reponse_degradee_sans_appel_amont(self, client, amont):
+        assert (await client.get(self.URL)).status_code == 200
+        appels = sum(amont.values())
+
+        self._saturer()
+        response = await client.get(self.URL)
+
+        assert response.status_code == 200
+        assert response.headers["x-orientation-degradee"] == "1"
+        assert response.headers["cache-control"] == "max-age=5"
+        assert response.json()["numero_vol"] == "AF1234"
+        assert sum(amont.values()) == appels
@@ -0,0 +1,161 @@
+import math
+import random
+import pytest
+
+from services.orientation.core.config import Settings
+from services.orientation.core.decision_engine import DecisionEngine
+from services.orientation.core.path_optimizer import GrapheTerminal, OptimiseurParcours
+
+
+@pytest.fixture
+def graphe():
+    """
+    entree --2-- sec --3-- hub --1-- porte
+                  \\________10________/
+    """
+    g = GrapheTerminal()
+    g.ajouter_noeud("entree", "entree", (0, 0))
+    g.ajouter_noeud("sec", "securite", (0, 100))
+    g.ajouter_noeud("hub", "couloir", (0, 200))
+    g.ajouter_noeud("porte", "porte", (0, 300), zone="A")
+    g.ajouter_arete("entree", "sec", 2)
+    g.ajouter_arete("sec", "hub", 3)
+    g.ajouter_arete("hub", "porte", 1)
+    g.ajouter_arete("sec", "porte", 10)
+    return g
+
+
+class TestOptimiseurParcours:
+    """Tests du routage dans le graphe du terminal"""
+
+    def test_plus_court_chemin(self, graphe):
+        optimiseur = OptimiseurParcours(graphe)
+
+        assert optimiseur.temps("entree", "porte") == 6
+        assert optimiseur.chemin("entree", "porte") == ["entree", "sec", "hub", "porte"]
+
+    def test_chemin_depuis_noeud_non_source(self, graphe):
+        # "hub" est un couloir: pas de table propre, on utilise celle de l'autre extrémité
+        optimiseur = OptimiseurParcours(graphe)
+
+        assert optimiseur.temps("hub", "entree") == 5
+        assert optimiseur.chemin("hub", "entree") == ["hub", "sec", "entree"]
+
+    def test_noeud_inconnu(self, graphe):
+        optimiseur = OptimiseurParcours(graphe)
+
+        assert optimiseur.temps("entree", "porte-Z9") is None
+        assert optimiseur.chemin("entree", "porte-Z9") == []
+
+    def test_duree_deduite_des_coordonnees(self):
+        g = GrapheTerminal()
+        g.ajouter_noeud("a", "entree", (0, 0))
+        g.ajouter_noeud("b", "porte", (300, 400))
+        g.ajouter_arete("a", "b")
+
+        # 500 m à 75 m/min
+        assert OptimiseurParcours(g).temps("a", "b") == pytest.approx(500 / 75)
+
+
+class TestParcoursJITB:
+    """Tests du parcours généré à partir du graphe"""
+
+    @pytest.fixture
+    def engine(self):
+        return DecisionEngine(Settings())
+
+    def test_parcours_avec_coordonnees(self, engine):
+        situation = {"niveau_urgence": "faible", "temps_disponible": 120}
+        parcours = engine.generer_parcours_jitb(situation, {"porte_actuelle": "G24"}, "entree")
+
+        assert all(etape["coordonnees"] is not None for etape in parcours)
+        assert parcours[-1]["zone"] == "G"
+        # Sécurité: attente + marche entrée → contrôle
+        marche = engine.parcours.temps("entree", "securite-C")
+        assert parcours[0]["temps_estime"] == engine.controles_securite["C"]["temps_moyen"] + math.ceil(marche)
+
+    def test_porte_inconnue_valeurs_par_defaut(self, engine):
+        situation = {"niveau_urgence": "critique", "temps_disponible": 25}
+        parcours = engine.generer_parcours_jitb(situation, {"porte_actuelle": "Z9"}, "porte")
+
+        assert parcours[-1]["temps_estime"] == 15
+        assert parcours[-1]["coordonnees"] is None
+
+
+def _grille(cote, graine=0):
+    """Graphe en grille avec des poids aléatoires"""
+    aleatoire = random.Random(graine)
+    g = GrapheTerminal()
+    for x in range(cote):
+        for y in range(cote):
+            g.ajouter_noeud(f"{x}-{y}", "porte", (x, y))
+    for x in range(cote):
+        for y in range(cote):
+            if x + 1 < cote:
+                g.ajouter_arete(f"{x}-{y}", f"{x + 1}-{y}", aleatoire.uniform(1, 5))
+            if y + 1 < cote:
+                g.ajouter_arete(f"{x}-{y}", f"{x}-{y + 1}", aleatoire.uniform(1, 5))
+    return g
+
+
+class TestReroutageIncremental:
+    """La réparation incrémentale doit donner les mêmes distances qu'un recalcul complet"""
+
+    def test_mises_a_jour_aleatoires(self):
+        aleatoire = random.Random(42)
+        graphe = _grille(12)
+        sources = [f"{aleatoire.randrange(12)}-{aleatoire.randrange(12)}" for _ in range(10)]
+        optimiseur = OptimiseurParcours(graphe, sources=sources)
+        aretes = [(i, j) for i, v in enumerate(graphe.voisins) for j in v if i < j]
+
+        for _ in range(200):
+            i, j = aleatoire.choice(aretes)
+            poids = aleatoire.choice([math.inf, aleatoire.uniform(0.5, 10)])
+            optimiseur.mettre_a_jour_arete(graphe.noeuds[i], graphe.noeuds[j], poids)
+
+        incremental = [list(d) for d in optimiseur.distances]
+        optimiseur.recalculer()
+        assert incremental == [list(d) for d in optimiseur.distances]
+
+    def test_chemins_coherents_apres_fermeture(self, graphe):
+        optimiseur = OptimiseurParcours(graphe)
+        optimiseur.mettre_a_jour_arete("hub", "porte", math.inf)
+
+        assert optimiseur.temps("entree", "porte") == 12
+        assert optimiseur.chemin("entree", "porte") == ["entree", "sec", "porte"]
+
+    def test_congestion_meteo(self):
+        engine = DecisionEngine(Settings())
+        avant = engine.parcours.temps("entree", "porte-G24")
+
+        engine.appliquer_meteo({"impact": {"secteurs_congestionnes": ["G"]}})
+        pendant = engine.parcours.temps("entree", "porte-G24")
+        engine.appliquer_meteo({"impact": {"secteurs_congestionnes": []}})
+
+        assert pendant > avant
+        assert engine.parcours.temps("entree", "porte-G24") == pytest.approx(avant)
+
+    def test_fermeture_operateur_conservee_sous_congestion(self):
+        engine = DecisionEngine(Settings())
+        parcours = engine.parcours
+        parcours.mettre_a_jour_arete("zone-G", "porte-G24", math.inf)
+
+        engine.appliquer_meteo({"impact": {"secteurs_congestionnes": ["A"]}})
+        engine.appliquer_meteo({"impact": {"secteurs_congestionnes": ["G"]}})
+        assert parcours.temps("entree", "porte-G24") is None
+
+        # Réouverture pendant la congestion: le facteur s'applique à la valeur de l'opérateur
+        parcours.mettre_a_jour_arete("zone-G", "porte-G24", 2.0)
+        i, j = parcours.graphe.index["zone-G"], parcours.graphe.index["porte-G24"]
+        assert parcours.graphe.voisins[i][j] == pytest.approx(2.0 * engine.settings.CONGESTION_FACTEUR_MARCHE)
+        engine.appliquer_meteo({"impact": {"secteurs_congestionnes": []}})
+        assert parcours.graphe.voisins[i][j] == 2.0
+
+    def test_couloir_inconnu_refuse(self, graphe):
+        optimiseur = OptimiseurParcours(graphe)
+        version = optimiseur.version
+
+        with pytest.raises(ValueError):
+            optimiseur.mettre_a_jour_arete("entree", "porte", 1.0)
+        assert optimiseur.version == version
+        assert not optimiseur.connait_arete("entree", "porte")
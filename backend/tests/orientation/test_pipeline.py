@@ -0,0 +1,81 @@
+import asyncio
+import time
+import pytest
+from fastapi import HTTPException
+from unittest.mock import AsyncMock
+
+from services.orientation.core.config import Settings
+from services.orientation.pipeline import collecter_donnees
+
+
+def _lent(delai, valeur):
+    async def _appel(*args, **kwargs):
+        await asyncio.sleep(delai)
+        return valeur
+    return _appel
+
+
+@pytest.fixture
+def settings():
+    return Settings(
+        BUDGET_ORIENTATION_S=0.5,
+        TIMEOUT_METEO_S=0.2,
+        TIMEOUT_BAGAGE_S=0.2,
+        TIMEOUT_VOL_S=0.3
+    )
+
+
+@pytest.fixture
+def clients():
+    meteo, bagage, vol = AsyncMock(), AsyncMock(), AsyncMock()
+    meteo.get_meteo_summary.side_effect = _lent(0.1, {"niveau_alerte": "moyen", "impact": {}})
+    bagage.get_bagage_status.side_effect = _lent(0.1, {"id": "BAG123456", "statut": "EN_SOUTE"})
+    vol.get_vol_info.side_effect = _lent(0.1, {"numero": "AF1234", "porte_actuelle": "A1"})
+    return meteo, bagage, vol
+
+
+class TestCollecteDonnees:
+    """Tests de la collecte parallèle des données amont"""
+
+    async def test_appels_en_parallele(self, settings, clients):
+        debut = time.perf_counter()
+        meteo, bagage, vol = await collecter_donnees(settings, *clients, "AF1234", "BAG123456")
+        duree = time.perf_counter() - debut
+
+        assert meteo["niveau_alerte"] == "moyen"
+        assert bagage["statut"] == "EN_SOUTE"
+        assert vol["numero"] == "AF1234"
+        # Trois appels de 100ms en parallèle, pas 300ms en série
+        assert duree < 0.25
+
+    async def test_meteo_hors_delai_valeur_par_defaut(self, settings, clients):
+        clients[0].get_meteo_summary.side_effect = _lent(5, {"niveau_alerte": "critique"})
+
+        debut = time.perf_counter()
+        meteo, bagage, _ = await collecter_donnees(settings, *clients, "AF1234", "BAG123456")
+
+        assert time.perf_counter() - debut < 0.4
+        assert meteo["niveau_alerte"] == "faible"
+        assert bagage["statut"] == "EN_SOUTE"
+
+    async def test_bagage_en_erreur_valeur_par_defaut(self, settings, clients):
+        clients[1].get_bagage_status.side_effect = RuntimeError("boom")
+
+        _, bagage, _ = await collecter_donnees(settings, *clients, "AF1234", "BAG123456")
+
+        assert bagage["id"] == "BAG123456"
+        assert bagage["statut"] == "ENREGISTRE"
+
+    async def test_vol_hors_delai_leve_504(self, settings, clients):
+        clients[2].get_vol_info.side_effect = _lent(5, {})
+
+        with pytest.raises(HTTPException) as exc:
+            await collecter_donnees(settings, *clients, "AF1234", "BAG123456")
+        assert exc.value.status_code == 504
+
+    async def test_vol_introuvable_propage(self, settings, clients):
+        clients[2].get_vol_info.side_effect = HTTPException(status_code=404, detail="Vol AF1234 non trouvé")
+
+        with pytest.raises(HTTPException) as exc:
+            await collecter_donnees(settings, *clients, "AF1234", "BAG123456")
+        assert exc.value.status_code == 404
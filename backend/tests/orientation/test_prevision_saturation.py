@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+
+from services.orientation.core.config import Settings
+from services.orientation.core.decision_engine import DecisionEngine
+from services.orientation.core.occupation_zones import OccupationZones
+from services.orientation.core.prevision_saturation import PrevisionSaturation, sorties_programmees
+from services.orientation.prevision import PrevisionTerminal
+
+
+class Horloge:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+class TestPrevisionSaturation:
+    """Lissage de Holt vectorisé et départs programmés"""
+
+    def test_tendance_projetee(self):
+        modele = PrevisionSaturation(["A", "B"], [100, 100], amortissement=1.0, alpha=1.0, beta=1.0)
+        for k in range(5):
+            modele.mettre_a_jour(np.array([10.0 + 2 * k, 50.0]))
+
+        prevision = modele.prevoir()
+
+        # A gagne 2 passagers par minute, B est stable
+        np.testing.assert_allclose(prevision[0], [48, 78, 108, 138])
+        np.testing.assert_allclose(prevision[1], [50, 50, 50, 50])
+        assert [a["zone"] for a in modele.alertes(prevision)] == ["A"]
+        assert modele.alertes(prevision)[0]["horizon_min"] == 45
+
+    def test_tendance_amortie(self):
+        modele = PrevisionSaturation(["A"], [100], alpha=1.0, beta=1.0, amortissement=0.9)
+        modele.mettre_a_jour(np.array([0.0]))
+        modele.mettre_a_jour(np.array([10.0]))
+
+        prevision = modele.prevoir()[0]
+
+        # La pente s'essouffle: la projection converge vers 10 + 9 x 10 = 100
+        assert prevision[0] < 10 + 15 * 9
+        assert np.all(np.diff(prevision) > 0)
+        assert prevision[-1] < 100
+
+    def test_sorties_cumulees(self):
+        sorties = sorties_programmees(
+            2,
+            np.array([15.0, 30.0, 45.0, 60.0]),
+            np.array([0, 0, 1, 1]),
+            np.array([10.0, 40.0, 30.0, 90.0]),
+            np.array([20.0, 5.0, 7.0, 100.0])
+        )
+
+        np.testing.assert_allclose(sorties, [[20, 20, 25, 25], [0, 7, 7, 7]])
+
+    def test_depart_evite_l_alerte(self):
+        modele = PrevisionSaturation(["A"], [100], seuil=0.9)
+        modele.mettre_a_jour(np.array([95.0]))
+
+        assert modele.alertes(modele.prevoir())
+        sorties = sorties_programmees(1, modele.horizons_min, np.array([0]), np.array([5.0]), np.array([60.0]))
+        assert modele.alertes(modele.prevoir(sorties)) == []
+
+
+class TestPrevisionTerminal:
+    """Prévision alimentée par l'occupation et le programme des vols"""
+
+    @pytest.fixture
+    def prevision(self):
+        horloge = Horloge()
+        occupation = OccupationZones(horloge=horloge)
+        return PrevisionTerminal(Settings(PREVISION_SEUIL=0.1), DecisionEngine(Settings()), occupation, horloge=horloge)
+
+    def test_alerte_et_depart(self, prevision):
+        for k in range(60):
+            prevision.occupation.observer(f"P{k}", "G", "AF1234")
+        prevision.noter_vol("AF1234", "G21", 20 * 60)
+
+        alertes = prevision.calculer()
+        etat = prevision.etat()
+
+        assert [a["zone"] for a in alertes] == ["G"]
+        # Les 60 passagers de l'AF1234 auront quitté la zone G à 30 minutes
+        assert etat["zones"]["G"] == [60.0, 0.0, 0.0, 0.0]
+        assert etat["alertes"][0]["horizon_min"] == 15
+
+    def test_vols_partis_retires(self, prevision):
+        prevision.noter_vol("AF1234", "G21", 20 * 60)
+        prevision.noter_vol("AF5678", "A3", 90 * 60)
+        prevision._horloge.t = 30 * 60
+
+        prevision.calculer()
+
+        assert list(prevision.programme) == ["AF5678"]
+        assert prevision.alertes == []
+
+    def test_capacites_rechargees_a_chaud(self, prevision):
+        for k in range(60):
+            prevision.occupation.observer(f"P{k}", "G", "AF1234")
+        assert [a["zone"] for a in prevision.calculer()] == ["G"]
+        modele = prevision.modele
+
+        # Rechargement de la topologie: mêmes zones, capacité de G relevée
+        topologie = prevision.decision_engine.topologie
+        topologie.zones = {zone: dict(config) for zone, config in topologie.zones.items()}
+        topologie.zones["G"]["capacite"] = 10000
+
+        assert prevision.calculer() == []
+        assert prevision.modele is modele
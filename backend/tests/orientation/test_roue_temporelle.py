@@ -0,0 +1,94 @@
+import asyncio
+import random
+
+import pytest
+
+from services.orientation.core.roue_temporelle import RoueTemporelle
+
+
+class Horloge:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+class TestRoueTemporelle:
+    """Tests de la roue temporelle hiérarchique"""
+
+    @pytest.fixture
+    def horloge(self):
+        return Horloge()
+
+    @pytest.fixture
+    def roue(self, horloge):
+        # Horizon de 4**3 = 64 ticks
+        return RoueTemporelle(granularite_s=1.0, cases=4, niveaux=3, horloge=horloge)
+
+    def _jusqu_a_vide(self, roue, horloge, pas=1.0):
+        declenches = {}
+        while len(roue):
+            horloge.t += pas
+            for cle, _ in roue.avancer():
+                declenches[cle] = horloge.t
+        return declenches
+
+    def test_declenchement_a_chaque_niveau(self, roue, horloge):
+        delais = {"immediat": 0, "niveau0": 3, "niveau1": 10.5, "niveau2": 50, "hors_horizon": 200}
+        for cle, delai in delais.items():
+            roue.planifier(cle, delai, cle)
+
+        declenches = self._jusqu_a_vide(roue, horloge)
+
+        for cle, delai in delais.items():
+            assert delai <= declenches[cle] <= delai + 1
+
+    def test_annuler_et_replanifier(self, roue, horloge):
+        roue.planifier("a", 30)
+        roue.planifier("b", 30)
+        assert roue.annuler("a")
+        assert not roue.annuler("a")
+        roue.planifier("b", 5)  # Remplace l'échéance précédente
+
+        declenches = self._jusqu_a_vide(roue, horloge)
+
+        assert declenches == {"b": 5.0}
+        assert roue.declenches == 1
+
+    def test_lot_des_minuteurs_echus(self, roue, horloge):
+        for k in range(100):
+            roue.planifier(k, 20 + k % 3, k)
+        horloge.t = 30
+
+        lot = roue.avancer()
+
+        assert sorted(cle for cle, _ in lot) == list(range(100))
+        assert len(roue) == 0
+
+    def test_jamais_en_avance(self, roue, horloge):
+        aleatoire = random.Random(4)
+        echeances = {}
+        for k in range(2000):
+            echeances[k] = aleatoire.uniform(0, 300)
+            roue.planifier(k, echeances[k])
+        for k in range(0, 2000, 3):
+            echeances[k] = aleatoire.uniform(0, 300)
+            roue.planifier(k, echeances[k])
+
+        declenches = self._jusqu_a_vide(roue, horloge, pas=0.7)
+
+        assert declenches.keys() == echeances.keys()
+        assert all(echeances[k] <= t < echeances[k] + 1.7 for k, t in declenches.items())
+
+    async def test_boucle_asyncio(self):
+        roue = RoueTemporelle(granularite_s=0.01)
+        lots = []
+        roue.demarrer(lots.append)
+        for k in range(10):
+            roue.planifier(k, 0.02, k)
+        await asyncio.sleep(0.1)
+        await roue.fermer()
+
+        assert sum(len(lot) for lot in lots) == 10
+        assert len(lots) <= 2
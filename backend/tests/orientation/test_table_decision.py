@@ -0,0 +1,92 @@
+import itertools
+import pytest
+from pydantic import ValidationError
+from datetime import datetime, timedelta
+
+from services.orientation.core.config import Settings
+from services.orientation.core.decision_engine import DecisionEngine
+from services.orientation.schemas.orientation import AlerteSchema, InstructionSchema, SituationSchema
+from services.orientation.utils import generer_alertes, generer_instructions
+
+
+def _vol(minutes, porte_originale, porte_actuelle):
+    # +30s: pas de changement de minute entre les deux chemins
+    depart = None if minutes is None else (datetime.now() + timedelta(minutes=minutes, seconds=30)).isoformat()
+    return {
+        "numero": "AF1234", "heure_depart": depart, "terminal": "2",
+        "porte_originale": porte_originale, "porte_actuelle": porte_actuelle
+    }
+
+
+class TestTableDecision:
+    """La table de décision doit reproduire les règles scalaires"""
+
+    @pytest.fixture
+    def engine(self):
+        return DecisionEngine(Settings())
+
+    def test_table_precompilee(self, engine):
+        # 3 classes bagage x 3 météo x 4 tranches x 2 positions x 5 zones
+        assert len(engine.table) == 360
+
+    @pytest.mark.parametrize("niveau_alerte", ["faible", "moyen", "eleve", "critique"])
+    def test_identique_au_chemin_scalaire(self, engine, niveau_alerte):
+        meteo_data = {"niveau_alerte": niveau_alerte, "impact": {"conditions": ["Orage", "Vent"]}}
+        statuts = ["EN_SOUTE", "MAL_ACHEMINE", "EN_VERIFICATION"]
+        minutes = [-5, 10, 29, 30, 31, 45, 46, 59, 60, 61, 120, None]
+        positions = [None, "entree", "securite", "zone_embarquement", "porte"]
+        portes = [("A1", "A1"), ("C1", "G24"), ("F10", "F10"), ("Z9", "Z9")]
+
+        for statut, duree, position, (originale, actuelle) in itertools.product(statuts, minutes, positions, portes):
+            bagage_data = {"statut": statut}
+            vol_data = _vol(duree, originale, actuelle)
+
+            situation, instructions, alertes = engine.table.evaluer(meteo_data, bagage_data, vol_data, position)
+
+            attendu = engine.analyser_situation(meteo_data, bagage_data, vol_data)
+            contexte = (statut, duree, position, actuelle)
+            assert situation.model_dump() == SituationSchema(**attendu).model_dump(), contexte
+            assert [i.model_dump() for i in instructions] == [
+                InstructionSchema(**i).model_dump()
+                for i in generer_instructions(engine, attendu, position, vol_data, bagage_data)
+            ], contexte
+            assert [a.model_dump() for a in alertes] == [
+                AlerteSchema(**a).model_dump() for a in generer_alertes(attendu, meteo_data, vol_data)
+            ], contexte
+
+    def test_controle_suit_les_attentes_en_direct(self):
+        engine = DecisionEngine(Settings())
+        vol_data = _vol(120, "C5", "C5")
+        meteo_data = {"niveau_alerte": "faible", "impact": {}}
+
+        _, avant, _ = engine.table.evaluer(meteo_data, {"statut": "EN_SOUTE"}, vol_data, "entree")
+        # 100 passagers en file sur une seule file ouverte
+        engine.attente_controles.enregistrer("C", files_ouvertes=1, file_attente=100)
+        _, apres, _ = engine.table.evaluer(meteo_data, {"statut": "EN_SOUTE"}, vol_data, "entree")
+
+        assert avant[0].destination == "Contrôle de Sécurité C"
+        assert apres[0].destination == "Contrôle de Sécurité B"
+
+    def test_controle_revient_au_temps_moyen_apres_expiration(self):
+        engine = DecisionEngine(Settings())
+        horloge = [0.0]
+        engine.attente_controles._horloge = lambda: horloge[0]
+        vol_data = _vol(120, "C5", "C5")
+        meteo_data = {"niveau_alerte": "faible", "impact": {}}
+
+        engine.attente_controles.enregistrer("C", files_ouvertes=1, file_attente=1)
+        _, en_direct, _ = engine.table.evaluer(meteo_data, {"statut": "EN_SOUTE"}, vol_data, "entree")
+        # Relevé sorti de la fenêtre: retour au temps moyen (10 min) du contrôle C
+        horloge[0] = engine.attente_controles.fenetre_s + 1
+        _, perime, _ = engine.table.evaluer(meteo_data, {"statut": "EN_SOUTE"}, vol_data, "entree")
+
+        assert en_direct[0].description.startswith("Temps d'attente estimé: 1 minutes")
+        assert perime[0].description.startswith("Temps d'attente estimé: 10 minutes")
+        assert perime[0].temps_estime == 15
+
+    def test_instances_partagees_figees(self, engine):
+        vol_data = _vol(120, "C5", "C5")
+        _, instructions, _ = engine.table.evaluer({"niveau_alerte": "faible", "impact": {}}, {"statut": "EN_SOUTE"}, vol_data, "entree")
+
+        with pytest.raises(ValidationError):
+            instructions[0].description = "modifiée"
@@ -0,0 +1,141 @@
+import json
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from services.auth.core.roles import UserRole
+from services.auth.dependencies.user import get_current_user
+from services.orientation.core.config import Settings
+from services.orientation.core.decision_engine import DecisionEngine
+from services.orientation.core.topologie import FICHIER_DEFAUT, RegistreTopologie, Topologie
+from services.orientation.dependencies.services import get_registre_topologie
+from services.orientation.main import app
+
+
+def _plan():
+    with open(FICHIER_DEFAUT, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _vol(porte):
+    return {
+        "numero": "AF1234",
+        "heure_depart": (datetime.now() + timedelta(hours=2)).isoformat(),
+        "porte_originale": porte,
+        "porte_actuelle": porte
+    }
+
+
+class TestTopologie:
+    """Index précalculés de la topologie"""
+
+    @pytest.fixture
+    def topologie(self):
+        return Topologie(_plan())
+
+    def test_index_portes(self, topologie):
+        assert topologie.zone_porte("F10") == "F"
+        assert topologie.zone_porte("G24") == "G"
+        # Porte hors plan: préfixe alphabétique
+        assert topologie.zone_porte("F99") == "F"
+        assert topologie.zone_porte("TB12") == "TB"
+
+    def test_index_controles_et_attentes(self, topologie):
+        assert [c for c, _ in topologie.controles_zone("F")] == ["C"]
+        assert [c for c, _ in topologie.controles_zone("B")] == ["A", "B"]
+        assert len(topologie.controles_zone("Z")) == 3
+        assert topologie.zone_attente("F")["id"] == "cafe-f"
+        assert topologie.zone_attente("Z")["id"] == "lounge-c"
+        assert topologie.coordonnees["securite-C"] == (450.0, 150.0)
+
+    @pytest.mark.parametrize("modification", [
+        lambda d: d["zones"]["G"]["portes"].append("F10"),
+        lambda d: d["controles"]["A"]["zone_desservie"].append("Z"),
+        lambda d: d["couloirs"].append(["G", "H"]),
+        lambda d: d.update(zone_attente_defaut="Z"),
+        lambda d: d["controles"]["B"].pop("temps_moyen")
+    ])
+    def test_plan_invalide_rejete(self, tmp_path, modification):
+        donnees = _plan()
+        modification(donnees)
+        chemin = tmp_path / "topologie.json"
+        chemin.write_text(json.dumps(donnees), encoding="utf-8")
+
+        with pytest.raises(ValueError):
+            Topologie.depuis_fichier(chemin)
+
+    def test_porte_a_deux_chiffres(self):
+        """Une porte F10 n'est plus rattachée à une zone « F » par hasard"""
+        donnees = _plan()
+        donnees["zones"]["G"]["portes"].append("F30")
+        engine = DecisionEngine(Settings(), Topologie(donnees))
+
+        parcours = engine.generer_parcours_jitb({"temps_disponible": 120, "niveau_urgence": "faible"}, _vol("F30"), "entree")
+        assert parcours[-1]["zone"] == "G"
+        assert parcours[1]["zone"] == "restaurant-g"
+
+
+class TestRechargement:
+    """Rechargement à chaud de la topologie"""
+
+    @pytest.fixture
+    def fichier(self, tmp_path):
+        chemin = tmp_path / "topologie.json"
+        chemin.write_text(json.dumps(_plan()), encoding="utf-8")
+        return chemin
+
+    def test_bascule_du_moteur(self, fichier):
+        registre = RegistreTopologie(str(fichier))
+        engine = DecisionEngine(Settings(), registre.courante)
+        registre.observateurs.append(engine.appliquer_topologie)
+        version = engine.parcours.version
+        situation = {"temps_disponible": 120, "niveau_urgence": "faible"}
+        assert engine.choisir_meilleur_controle(situation, _vol("G21"))["id"] == "C"
+
+        donnees = _plan()
+        donnees["version"] = "cdg-2"
+        donnees["zones"]["H"] = {"capacite": 200, "coordonnees": [1000, 450], "portes": ["H1", "H2"]}
+        donnees["couloirs"].append(["G", "H"])
+        donnees["controles"]["D"] = {
+            "temps_moyen": 5, "position": "Terminal 3", "zone_desservie": ["G", "H"], "coordonnees": [900, 150]
+        }
+        fichier.write_text(json.dumps(donnees), encoding="utf-8")
+        registre.recharger()
+
+        assert engine.topologie.version == "cdg-2"
+        assert engine.parcours.version > version
+        assert engine.parcours.temps("entree", "porte-H1") is not None
+        assert engine.choisir_meilleur_controle(situation, _vol("G21"))["id"] == "D"
+        _, instructions, _ = engine.table.evaluer({"niveau_alerte": "faible"}, {"statut": "EN_SOUTE"}, _vol("H2"), "entree")
+        assert instructions[0].destination == "Contrôle de Sécurité D"
+
+    def test_plan_invalide_conserve_l_ancien(self, fichier):
+        registre = RegistreTopologie(str(fichier))
+        engine = DecisionEngine(Settings(), registre.courante)
+        registre.observateurs.append(engine.appliquer_topologie)
+        avant = engine.topologie
+
+        fichier.write_text("{ pas du json", encoding="utf-8")
+        with pytest.raises(ValueError):
+            registre.recharger()
+
+        assert registre.courante is avant
+        assert engine.topologie is avant
+
+    async def test_endpoint_rechargement(self, fichier):
+        registre = RegistreTopologie(str(fichier))
+        app.dependency_overrides[get_registre_topologie] = lambda: registre
+        app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(role=UserRole.ADMIN)
+        try:
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                ok = await client.post("/api/orientation/admin/topologie/recharger")
+                fichier.write_text(json.dumps({"zones": {}}), encoding="utf-8")
+                invalide = await client.post("/api/orientation/admin/topologie/recharger")
+        finally:
+            app.dependency_overrides.clear()
+
+        assert ok.status_code == 200
+        assert ok.json() == {"version": "cdg-1", "zones": 5, "portes": 23, "controles": 3}
+        assert invalide.status_code == 400